@@ -0,0 +1,125 @@
+"""Benchmark do tempo de importação das páginas (partida a frio do aplicativo).
+
+Para cada página (e ``main.py``) executa, num interpretador novo, só as importações
+de nível de módulo do arquivo e mede o tempo gasto e quais dependências pesadas
+(moviepy, mysql.connector, elevenlabs, pptx, docx, openpyxl...) foram carregadas.
+É o custo pago ao abrir a página pela primeira vez num contêiner recém-iniciado,
+antes de qualquer botão ser clicado. Também mede a importação isolada de cada
+dependência pesada, como referência. Importações de pacotes que não estão instalados
+(ex.: ``streamlit`` num ambiente só de benchmark) são ignoradas e ficam registradas no
+resultado; sem o ``streamlit``, um módulo vazio ocupa o lugar dele para que os módulos
+de ``utils`` que o importam (``sessao``, ``diagnostico``) ainda possam ser medidos. Uma
+página que falhar mesmo assim tem o erro registrado e as demais seguem.
+
+Uso:
+    python benchmarks/bench_inicializacao.py --repeticoes 5
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Sem custo de importação relevante para as páginas e ausente em ambientes só de benchmark
+SIMULADOS = ("streamlit",)
+PESADOS = ("moviepy", "mysql", "elevenlabs", "pptx", "docx", "openpyxl", "numpy", "PIL", "imageio_ffmpeg", "lxml", "requests")
+
+MEDIR = """
+import json, sys, time, types
+sys.path.insert(0, {raiz!r})
+for nome in {simulados!r}:
+    sys.modules[nome] = types.ModuleType(nome)
+inicio = time.perf_counter()
+{importacoes}
+tempo = time.perf_counter() - inicio
+print(json.dumps({{"tempo": tempo, "pesados": sorted({{m for m in {pesados!r} if m in sys.modules}})}}))
+"""
+
+
+def instalado(modulo):
+    return importlib.util.find_spec(modulo.split(".")[0]) is not None
+
+
+def importacoes_do_arquivo(caminho):
+    """Código-fonte das importações de nível de módulo de ``caminho`` e os pacotes
+    ignorados por não estarem instalados."""
+    with open(caminho, encoding="utf-8") as arquivo:
+        arvore = ast.parse(arquivo.read())
+    linhas = []
+    ignorados = set()
+    for no in arvore.body:
+        if isinstance(no, (ast.Import, ast.ImportFrom)):
+            modulos = [alias.name for alias in no.names] if isinstance(no, ast.Import) else [no.module or ""]
+            faltando = {modulo for modulo in modulos if not instalado(modulo)}
+            if faltando:
+                ignorados |= faltando
+                continue
+            linhas.append(ast.unparse(no))
+    return "\n".join(linhas) or "pass", sorted(ignorados)
+
+
+def medir(importacoes, repeticoes):
+    tempos = []
+    pesados = []
+    for _ in range(repeticoes):
+        simulados = [modulo for modulo in SIMULADOS if not instalado(modulo)]
+        codigo = MEDIR.format(raiz=RAIZ, importacoes=importacoes, pesados=PESADOS, simulados=simulados)
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+        if saida.returncode != 0:
+            return {"erro": (saida.stderr.strip().splitlines() or [f"código de saída {saida.returncode}"])[-1]}
+        dados = json.loads(saida.stdout.strip().splitlines()[-1])
+        tempos.append(dados["tempo"])
+        pesados = dados["pesados"]
+    return {"tempo_ms": round(statistics.median(tempos) * 1000, 1), "pesados": pesados}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por página (vale a mediana)")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    paginas_dir = os.path.join(RAIZ, "pages")
+    arquivos = ["main.py"] + [os.path.join("pages", nome) for nome in sorted(os.listdir(paginas_dir)) if nome.endswith(".py")]
+
+    paginas = {}
+    for arquivo in arquivos:
+        importacoes, ignorados = importacoes_do_arquivo(os.path.join(RAIZ, arquivo))
+        resultado = medir(importacoes, args.repeticoes)
+        resultado["ignorados"] = ignorados
+        paginas[arquivo] = resultado
+        if "erro" in resultado:
+            print(f"{arquivo}: erro - {resultado['erro']}", file=sys.stderr)
+        else:
+            print(f"{arquivo}: {resultado['tempo_ms']:.0f} ms - pesados: {', '.join(resultado['pesados']) or 'nenhum'}"
+                  + (f" (não instalados: {', '.join(ignorados)})" if ignorados else ""), file=sys.stderr)
+
+    dependencias = {}
+    for modulo in ("moviepy.editor", "mysql.connector", "elevenlabs", "pptx", "docx", "openpyxl", "PIL.Image", "numpy"):
+        if not instalado(modulo):
+            continue
+        dependencias[modulo] = medir(f"import {modulo}", args.repeticoes).get("tempo_ms")
+        print(f"  import {modulo}: {dependencias[modulo]} ms", file=sys.stderr)
+
+    relatorio = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "paginas": paginas,
+        "dependencias": dependencias,
+    }
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"inicializacao_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark da divisão do texto em partes de narração (``utils.segmentacao``).
+
+Gera aulas sintéticas em português e compara o caminho anterior (``dividir_texto`` da
+conversão com 100 caracteres seguido do ``dividir_texto`` da página de áudios com 200,
+parágrafo por parágrafo) com o novo (sentenças agrupadas por slide até o limite de
+caracteres por requisição). Para cada aula informa partes (= requisições de TTS),
+maior parte em caracteres, partes acima do limite e tempo de processamento. Também
+mede um parágrafo único muito longo e sem ponto final (ex.: tópicos de um slide), onde
+a concatenação repetida de strings das versões anteriores fica quadrática.
+
+Uso:
+    python benchmarks/bench_segmentacao.py --slides 30 100 --limite 200 400 800
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from utils.segmentacao import dividir_sentencas, empacotar, dividir_texto
+
+PALAVRAS = ("administração pública princípio legalidade servidor contrato licitação processo direito "
+            "constitucional competência União Estados Municípios ato administrativo poder controle "
+            "responsabilidade civil Estado lei complementar orçamento receita despesa").split()
+TRECHOS = ("conforme o art. 37 da Constituição Federal", "segundo o Sr. Hely Lopes Meirelles",
+           "nos termos do § 2º", "Obs.: ver a Lei nº. 8.112", "de acordo com J.J. Gomes Canotilho")
+
+
+def dividir_texto_conversao_anterior(texto, limite_caracteres, delimitador):
+    """Versão anterior da página de conversão (PPTX → DOCX), para comparação."""
+    partes = []
+    parte_atual = ""
+    for palavra in texto.split():
+        if len(parte_atual + ' ' + palavra) > limite_caracteres and parte_atual.endswith(delimitador):
+            partes.append(parte_atual)
+            parte_atual = palavra
+        else:
+            if parte_atual:
+                parte_atual += ' '
+            parte_atual += palavra
+    if parte_atual:
+        partes.append(parte_atual)
+    return partes
+
+
+def dividir_texto_audios_anterior(texto, limite, separador='.'):
+    """Versão anterior da página de áudios, para comparação."""
+    partes = []
+    parte_atual = ""
+    for palavra in texto.split():
+        if len(parte_atual + ' ' + palavra) <= limite:
+            parte_atual += ' ' + palavra
+        else:
+            if parte_atual.endswith(separador):
+                partes.append(parte_atual)
+                parte_atual = palavra
+            else:
+                parte_atual += ' ' + palavra
+    if parte_atual:
+        partes.append(parte_atual)
+    return partes
+
+
+def gerar_sentenca(aleatorio):
+    palavras = [aleatorio.choice(PALAVRAS) for _ in range(aleatorio.randint(6, 40))]
+    if aleatorio.random() < 0.3:
+        palavras.insert(aleatorio.randrange(len(palavras)), aleatorio.choice(TRECHOS))
+    if aleatorio.random() < 0.3:
+        palavras.insert(aleatorio.randrange(1, len(palavras)), "e,")
+    return " ".join(palavras).capitalize() + aleatorio.choice(".....?!")
+
+
+def gerar_aula(slides, semente=42):
+    """Lista de slides; cada slide é uma lista de textos (caixas de texto do PPTX)."""
+    aleatorio = random.Random(semente)
+    return [[" ".join(gerar_sentenca(aleatorio) for _ in range(aleatorio.randint(1, 8)))
+             for _ in range(aleatorio.randint(1, 4))]
+            for _ in range(slides)]
+
+
+def medir(partes, limite, inicio):
+    return {
+        "partes": len(partes),
+        "maior_parte": max((len(p.strip()) for p in partes), default=0),
+        "acima_do_limite": sum(len(p.strip()) > limite for p in partes),
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 2),
+    }
+
+
+def caminho_anterior(aula):
+    inicio = time.perf_counter()
+    partes = []
+    for caixas in aula:
+        for caixa in caixas:
+            for paragrafo in dividir_texto_conversao_anterior(caixa, 100, '.'):
+                partes.extend(p for p in dividir_texto_audios_anterior(paragrafo, 200, '.') if p.strip() and p.strip() != '.')
+    return medir(partes, 200, inicio)
+
+
+def caminho_novo(aula, limite):
+    inicio = time.perf_counter()
+    partes = []
+    for caixas in aula:
+        sentencas = []
+        for caixa in caixas:
+            for paragrafo in dividir_texto(caixa, 100):
+                sentencas.extend(dividir_sentencas(paragrafo))
+        partes.extend(empacotar(sentencas, limite))
+    return medir(partes, limite, inicio)
+
+
+def paragrafo_longo(caracteres, semente=7):
+    aleatorio = random.Random(semente)
+    texto = []
+    tamanho = 0
+    while tamanho < caracteres:
+        texto.append(gerar_sentenca(aleatorio))
+        tamanho += len(texto[-1]) + 1
+    # Sem pontuação final, as versões anteriores nunca fecham a parte atual
+    texto = " ".join(texto).translate(str.maketrans("", "", ".?!"))
+    resultado = {"caracteres": len(texto)}
+    inicio = time.perf_counter()
+    dividir_texto_audios_anterior(texto, 200)
+    resultado["anterior_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+    inicio = time.perf_counter()
+    dividir_texto(texto, 200)
+    resultado["novo_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, nargs="+", default=[30, 100, 300])
+    parser.add_argument("--limite", type=int, nargs="+", default=[200, 400, 800], help="Caracteres por requisição")
+    parser.add_argument("--paragrafo-longo", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--saida", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    for slides in args.slides:
+        aula = gerar_aula(slides)
+        anterior = caminho_anterior(aula)
+        print(f"{slides} slides - anterior: {anterior['partes']} partes, maior {anterior['maior_parte']} "
+              f"caracteres, {anterior['acima_do_limite']} acima de 200", file=sys.stderr)
+        resultado = {"slides": slides, "anterior": anterior, "novo": {}}
+        for limite in args.limite:
+            novo = caminho_novo(aula, limite)
+            print(f"  novo ({limite}): {novo['partes']} partes ({novo['partes'] / anterior['partes']:.0%}), "
+                  f"maior {novo['maior_parte']} caracteres", file=sys.stderr)
+            resultado["novo"][limite] = novo
+        resultados.append(resultado)
+
+    longos = []
+    for caracteres in args.paragrafo_longo:
+        longo = paragrafo_longo(caracteres)
+        print(f"Parágrafo de {longo['caracteres']} caracteres: anterior {longo['anterior_ms']:.0f} ms, "
+              f"novo {longo['novo_ms']:.0f} ms", file=sys.stderr)
+        longos.append(longo)
+
+    relatorio = {"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "aulas": resultados, "paragrafo_longo": longos}
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"segmentacao_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
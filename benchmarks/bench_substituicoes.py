@@ -0,0 +1,116 @@
+"""Benchmark das substituições de pronúncia (``utils.substituicoes``).
+
+Compara o laço anterior (um ``str.replace`` por regra, em sequência) com o
+``Substituidor`` compilado, sobre apresentações sintéticas grandes. As regras são as
+de ``substituicoes.json`` mais ``--regras-extras`` regras artificiais, para medir como
+o custo cresce com o tamanho do dicionário. Também conta quantos textos saem
+diferentes entre as duas versões (trocas dentro de outras palavras e texto já
+substituído sendo reprocessado pelo laço anterior).
+
+Uso:
+    python benchmarks/bench_substituicoes.py --slides 500 2000 --regras-extras 0 100 500 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from utils.substituicoes import Substituidor, carregar_regras
+
+PALAVRAS = ("a o de da do que em para com por uma os as no na ao pelo servidor público ato lei processo direito "
+            "administração contrato licitação princípio constitucional competência União Estados controle poder").split()
+# Termos afetados pelas regras (ou parecidos com eles), misturados ao texto comum
+TERMOS = ("CFO LOAS Dart. Habeas corpus habeas data art. Art. nº n.º § CF LOA Hely Di Pietro Obs.: obs. J.J.").split()
+
+
+def aplicar_substituicoes_anterior(texto, substituicoes):
+    """Versão anterior das páginas, para comparação."""
+    for palavra_antiga, palavra_nova in substituicoes:
+        texto = texto.replace(palavra_antiga, palavra_nova)
+    return texto
+
+
+def gerar_textos(slides, semente=42):
+    """Textos de uma apresentação: título e algumas caixas de texto por slide."""
+    aleatorio = random.Random(semente)
+    textos = []
+    for _ in range(slides):
+        for _ in range(aleatorio.randint(2, 5)):
+            textos.append(" ".join(aleatorio.choice(TERMOS) if aleatorio.random() < 0.04 else aleatorio.choice(PALAVRAS)
+                                   for _ in range(aleatorio.randint(5, 80))))
+    return textos
+
+
+def regras_extras(quantidade, semente=7):
+    aleatorio = random.Random(semente)
+    letras = "abcdefghijklmnopqrstuvwxyz"
+    return [{"de": "".join(aleatorio.choice(letras) for _ in range(aleatorio.randint(4, 10))), "para": f"termo {n}"}
+            for n in range(quantidade)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--regras-extras", type=int, nargs="+", default=[0, 100, 500, 2000])
+    parser.add_argument("--saida", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    regras_base = carregar_regras()
+    resultados = []
+    for extras in args.regras_extras:
+        regras = regras_base + regras_extras(extras)
+        # O laço anterior não tinha regras sem diferenciar maiúsculas: usa o texto da regra como está
+        pares = [(regra["de"], regra["para"]) for regra in regras]
+        inicio = time.perf_counter()
+        substituidor = Substituidor(regras)
+        compilacao_ms = (time.perf_counter() - inicio) * 1000
+        for slides in args.slides:
+            textos = gerar_textos(slides)
+            caracteres = sum(len(t) for t in textos)
+
+            inicio = time.perf_counter()
+            anteriores = [aplicar_substituicoes_anterior(t, pares) for t in textos]
+            tempo_anterior = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            novos = [substituidor.aplicar(t) for t in textos]
+            tempo_novo = time.perf_counter() - inicio
+
+            resultado = {
+                "slides": slides,
+                "textos": len(textos),
+                "caracteres": caracteres,
+                "regras": len(regras),
+                "anterior_ms": round(tempo_anterior * 1000, 2),
+                "novo_ms": round(tempo_novo * 1000, 2),
+                "compilacao_ms": round(compilacao_ms, 2),
+                "textos_diferentes": sum(a != n for a, n in zip(anteriores, novos)),
+            }
+            print(f"{slides} slides, {len(regras)} regras: anterior {resultado['anterior_ms']:.0f} ms, "
+                  f"novo {resultado['novo_ms']:.0f} ms (+{resultado['compilacao_ms']:.1f} ms de compilação), "
+                  f"{resultado['textos_diferentes']} de {len(textos)} textos diferentes", file=sys.stderr)
+            resultados.append(resultado)
+
+    exemplo = "Conforme o Art. 5º da CF, o nº 3; Obs.: ver a LOAS e o CFO."
+    relatorio = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "exemplo": {"texto": exemplo,
+                    "anterior": aplicar_substituicoes_anterior(exemplo, [(r["de"], r["para"]) for r in regras_base]),
+                    "novo": Substituidor(regras_base).aplicar(exemplo)},
+        "resultados": resultados,
+    }
+    print(f"Exemplo:\n  anterior: {relatorio['exemplo']['anterior']}\n  novo:     {relatorio['exemplo']['novo']}", file=sys.stderr)
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"substituicoes_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark do motor de narração (``utils.tts``) com um serviço de voz simulado.
+
+Usa o ``TTSFalso`` (latência configurável e respostas 429 aleatórias) para comparar o
+tempo de uma aula com diferentes números de requisições simultâneas, sem gastar
+créditos da ElevenLabs.
+
+Uso:
+    python benchmarks/bench_tts.py --partes 300 --paralelismo 1 2 4 8 --latencia 0.8
+    python benchmarks/bench_tts.py --partes 100 --taxa-429 0.05 --requisicoes-por-segundo 5
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from utils.tts import TTSFalso, LimitadorTaxa, gerar_partes, nome_arquivo_parte
+
+
+def executar_caso(partes, paralelismo, args):
+    backend = TTSFalso(args.latencia, args.variacao, args.taxa_429, semente=42)
+    limitador = LimitadorTaxa(args.requisicoes_por_segundo) if args.requisicoes_por_segundo else None
+    with tempfile.TemporaryDirectory(prefix="bench_tts_") as temp:
+        lista = [{"slide": n // 3 + 1, "parte": n % 3 + 1, "texto": f"Parte {n} da aula.",
+                  "arquivo": os.path.join(temp, nome_arquivo_parte(n // 3 + 1, n % 3 + 1))}
+                 for n in range(partes)]
+        inicio = time.perf_counter()
+        gerar_partes(lista, backend, paralelismo=paralelismo, limitador=limitador)
+        tempo_total = time.perf_counter() - inicio
+    return {
+        "partes": partes,
+        "paralelismo": paralelismo,
+        "tempo_total": round(tempo_total, 3),
+        "partes_por_segundo": round(partes / tempo_total, 2),
+        "chamadas": backend.chamadas,
+        "respostas_429": backend.respostas_429,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partes", type=int, default=300)
+    parser.add_argument("--paralelismo", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latencia", type=float, default=0.8, help="Latência média de cada requisição (s)")
+    parser.add_argument("--variacao", type=float, default=0.3)
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="Probabilidade de resposta 429")
+    parser.add_argument("--requisicoes-por-segundo", type=float, default=0, help="0 desativa o limitador")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    for paralelismo in args.paralelismo:
+        print(f"Executando {args.partes} partes com {paralelismo} requisições simultâneas...", file=sys.stderr)
+        resultado = executar_caso(args.partes, paralelismo, args)
+        print(f"  {resultado['tempo_total']:.1f}s, {resultado['partes_por_segundo']:.1f} partes/s, "
+              f"{resultado['respostas_429']} respostas 429", file=sys.stderr)
+        resultados.append(resultado)
+
+    relatorio = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "paralelismo")},
+        "resultados": resultados,
+    }
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"tts_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark da geração de vídeo com aulas sintéticas, fora do Streamlit.
+
+Gera aulas artificiais (imagens simples e narrações MP3 com tom ou silêncio), executa
+``utils.render.renderizar_video`` e registra tempo total, pico de memória (RSS),
+tamanho do vídeo, tempo por slide e tempo de cada etapa. Cada caso roda num processo
+separado para que o pico de memória de um não contamine o outro.
+
+Uso:
+    python benchmarks/bench_video.py --slides 10 50 200 --partes 3 --modo segmentos
+    python benchmarks/bench_video.py --slides 10 --modo moviepy segmentos --workers 4
+
+Os resultados são gravados em JSON (por padrão em ``benchmarks/resultados/``) para
+comparar execuções ao longo do tempo.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def gerar_aula(destino, slides, partes, resolucao, semente=42):
+    """Cria ``slides`` imagens e até ``partes`` MP3 por slide; devolve (imagens, {nome: caminho})."""
+    import imageio_ffmpeg
+    from PIL import Image, ImageDraw
+
+    aleatorio = random.Random(semente)
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    os.makedirs(destino, exist_ok=True)
+    imagens = []
+    audios = {}
+    for slide in range(1, slides + 1):
+        imagem = Image.new("RGB", resolucao, tuple(aleatorio.randrange(256) for _ in range(3)))
+        ImageDraw.Draw(imagem).text((40, 40), f"Slide {slide}", fill="white")
+        caminho = os.path.join(destino, f"slide_{slide:04d}.png")
+        imagem.save(caminho)
+        imagens.append(caminho)
+
+        for parte in range(1, aleatorio.randint(1, partes) + 1):
+            duracao = round(aleatorio.uniform(2.0, 12.0), 2)
+            # Alterna narrações com tom e narrações silenciosas
+            fonte = f"sine=frequency={aleatorio.randrange(200, 800)}:duration={duracao}" if parte % 2 else f"anullsrc=r=44100:cl=mono:d={duracao}"
+            nome = f"{slide}.{parte}_narracao_slide.mp3"
+            subprocess.run(
+                [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi", "-i", fonte,
+                 "-ac", "1", "-ar", "44100", "-b:a", "128k", os.path.join(destino, nome)],
+                check=True
+            )
+            audios[nome] = os.path.join(destino, nome)
+    return imagens, audios
+
+
+def executar_caso(caso):
+    """Executa um caso no processo atual e devolve as métricas."""
+    from utils.render import renderizar_video
+
+    with tempfile.TemporaryDirectory(prefix="bench_video_") as temp:
+        imagens, audios = gerar_aula(os.path.join(temp, "aula"), caso["slides"], caso["partes"], tuple(caso["resolucao"]))
+        saida = os.path.join(temp, "saida", "aula.mp4")
+        os.makedirs(os.path.dirname(saida))
+        inicio = time.perf_counter()
+        resumo = renderizar_video(
+            imagens, audios, saida, os.path.join(temp, "trabalho"), os.path.join(temp, "cache"),
+            resolucao=tuple(caso["resolucao"]), usar_segmentos=caso["modo"] == "segmentos",
+            workers=caso["workers"]
+        )
+        tempo_total = time.perf_counter() - inicio
+        tamanho_saida = os.path.getsize(saida)
+
+    # ru_maxrss está em KiB no Linux; para filhos vale o maior processo filho (ffmpeg, pool)
+    pico_proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pico_filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        **caso,
+        "tempo_total": round(tempo_total, 3),
+        "tempo_por_slide": round(tempo_total / caso["slides"], 4),
+        "duracao_video": round(resumo["duracao"], 3),
+        "tempo_por_segundo_de_video": round(tempo_total / resumo["duracao"], 4) if resumo["duracao"] else None,
+        "pico_rss_mb": round(pico_proprio / 1024, 1),
+        "pico_rss_filhos_mb": round(pico_filhos / 1024, 1),
+        "tamanho_saida_mb": round(tamanho_saida / 1024 / 1024, 2),
+        "etapas": resumo["tempos"]["etapas"],
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--partes", type=int, default=3, help="Máximo de partes de narração por slide")
+    parser.add_argument("--modo", nargs="+", choices=["segmentos", "moviepy"], default=["segmentos"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resolucao", default="1280x720")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados")
+    parser.add_argument("--caso", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.caso:
+        print(json.dumps(executar_caso(json.loads(args.caso))))
+        return
+
+    resolucao = [int(valor) for valor in args.resolucao.split("x")]
+    resultados = []
+    for modo in args.modo:
+        for slides in args.slides:
+            caso = {"slides": slides, "partes": args.partes, "modo": modo, "workers": args.workers, "resolucao": resolucao}
+            print(f"Executando {modo} com {slides} slides...", file=sys.stderr)
+            processo = subprocess.run([sys.executable, os.path.abspath(__file__), "--caso", json.dumps(caso)],
+                                      capture_output=True, text=True)
+            if processo.returncode != 0:
+                print(processo.stderr, file=sys.stderr)
+                resultados.append({**caso, "erro": processo.stderr[-2000:]})
+                continue
+            resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+            print(f"  {resultado['tempo_total']:.1f}s, {resultado['tempo_por_slide']:.3f}s/slide, "
+                  f"pico {resultado['pico_rss_mb']:.0f} MB", file=sys.stderr)
+            resultados.append(resultado)
+
+    relatorio = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "resultados": resultados,
+    }
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"video_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
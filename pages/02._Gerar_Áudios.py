@@ -1,75 +1,112 @@
 import streamlit as st
-from docx import Document
-import io
 import os
-import zipfile
 import shutil
-from elevenlabs import generate, Voice, VoiceSettings, set_api_key, RateLimitError
-import docx
-
-# Funções definidas anteriormente
-def dividir_texto(texto, limite, separador='.'):
-    partes = []
-    parte_atual = ""
-
-    for palavra in texto.split():
-        if len(parte_atual + ' ' + palavra) <= limite:
-            parte_atual += ' ' + palavra
-        else:
-            if parte_atual.endswith(separador):
-                partes.append(parte_atual)
-                parte_atual = palavra
-            else:
-                parte_atual += ' ' + palavra
-    if parte_atual:
-        partes.append(parte_atual)
-
-    return partes
+import time
+from utils.biblioteca_narracao import indexar_narracoes, versao_pasta
+from utils.exportacao import exportar_zip
+from utils.cache_tts import CacheTTS
+from utils.diagnostico import barra_diagnostico, executar_com_perfil
+from utils.documento_narracao import hash_documento, ler_documento
+from utils.espacos import CotaExcedida, espacos_padrao
+from utils.manifesto_narracao import ManifestoNarracao, CONCLUIDA
+from utils.tts import ElevenLabsTTS, LimitadorTaxa, CreditosEsgotados, gerar_partes, partes_narracao
+from utils.sessao import id_sessao
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def carregar_documento(documento_hash, limite_caracteres, _dados):
+    """DOCX interpretado uma vez por arquivo enviado (``_dados`` fica fora da chave do cache)."""
+    return ler_documento(_dados, limite_caracteres)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def carregar_biblioteca(audio_dir, indice_path, versao):
+    """Metadados da pasta de áudios; ``versao`` invalida o cache quando a pasta muda."""
+    return indexar_narracoes(audio_dir, indice_path)
+
+
+def exibir_biblioteca(audio_dir, cache_dir):
+    """Lista paginada das narrações; só o áudio escolhido para ouvir é carregado."""
+    if st.button("Atualizar Pasta"):
+        carregar_biblioteca.clear()
+    os.makedirs(cache_dir, exist_ok=True)
+    itens = carregar_biblioteca(audio_dir, os.path.join(cache_dir, "indice_duracoes.json"), versao_pasta(audio_dir))
+    if not itens:
+        st.write("Nenhum áudio criado ainda.")
+        return
+
+    col_filtro, col_tamanho, col_pagina = st.columns(3)
+    slides = sorted({item["slide"] for item in itens if item["slide"] is not None})
+    slide = col_filtro.selectbox("Slide", ["Todos"] + slides)
+    if slide != "Todos":
+        itens = [item for item in itens if item["slide"] == slide]
+    por_pagina = col_tamanho.selectbox("Itens por página", [10, 25, 50, 100])
+    paginas = max(1, -(-len(itens) // por_pagina))
+    pagina = col_pagina.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1)
+
+    duracao_total = sum(item["duracao"] or 0 for item in itens)
+    st.caption(f"{len(itens)} arquivos - {duracao_total / 60:.1f} min de narração - "
+               f"{sum(item['tamanho'] for item in itens) / 1024 / 1024:.1f} MB")
+
+    for item in itens[(pagina - 1) * por_pagina:pagina * por_pagina]:
+        col_nome, col_info, col_ouvir, col_excluir = st.columns([4, 3, 1, 1])
+        col_nome.write(item["arquivo"])
+        duracao = f"{item['duracao']:.1f}s" if item["duracao"] is not None else "duração desconhecida"
+        col_info.write(f"{duracao} - {item['tamanho'] / 1024:.0f} KB - {time.strftime('%d/%m %H:%M', time.localtime(item['mtime']))}")
+        if col_ouvir.button("▶", key=f"ouvir_{item['arquivo']}", help="Ouvir"):
+            st.session_state["narracao_aberta"] = item["arquivo"]
+        if col_excluir.button("🗑", key=f"excluir_{item['arquivo']}", help=f"Excluir {item['arquivo']}"):
+            if os.path.exists(item["caminho"]):
+                os.remove(item["caminho"])
+            st.rerun()
+        if st.session_state.get("narracao_aberta") == item["arquivo"] and os.path.exists(item["caminho"]):
+            st.audio(item["caminho"], format="audio/mp3")
+
 
 # Função principal do Streamlit
-def streamlit_app():
+def streamlit_app(perfilar=False):
     st.title("Gerador de Narração")
 
     # Campos para chave da API e voice_id
     api_key = st.text_input("Chave da API ElevenLabs", type="password")
     voice_id = st.text_input("Voice ID")
+    col_paralelo, col_taxa = st.columns(2)
+    paralelismo = col_paralelo.number_input("Requisições simultâneas", min_value=1, max_value=10, value=3,
+                                            help="Partes enviadas ao mesmo tempo para a ElevenLabs. Respeite o limite de concorrência do seu plano.")
+    requisicoes_por_segundo = col_taxa.number_input("Requisições por segundo", min_value=0.5, max_value=20.0, value=2.0, step=0.5)
+    limite_caracteres = st.number_input("Caracteres por requisição", min_value=100, max_value=5000, value=400, step=50,
+                                        help="As sentenças de cada slide são agrupadas em partes de até este tamanho: menos requisições por aula.")
+    limite_cache_mb = st.number_input("Limite do cache de narrações (MB)", min_value=50, value=1024, step=50,
+                                      help="Frases já narradas com a mesma voz são reaproveitadas do cache, sem gastar créditos.")
 
     # Upload do documento Word
     doc_file = st.file_uploader("Escolha o arquivo DOCX", type="docx")
-    doc = docx.Document(doc_file)
-    texto_arquivo = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-    st.text_area("Texto do Arquivo", texto_arquivo, height=300)
-
-    # Diretório temporário para os arquivos de áudio
-    audio_dir = "audio_narracao"
-    if not os.path.exists(audio_dir):
-        os.makedirs(audio_dir)
+    documento = None
+    if doc_file is not None:
+        dados = doc_file.getvalue()
+        documento = carregar_documento(hash_documento(dados), int(limite_caracteres), dados)
+        st.text_area("Texto do Arquivo", documento["texto"], height=300)
+
+    # Áudios, manifestos e exportações ficam no espaço de trabalho da sessão: aulas de
+    # usuários diferentes não sobrescrevem os arquivos umas das outras
+    espacos = espacos_padrao()
+    sessao = id_sessao()
+    audio_dir = espacos.espaco(sessao, "audio_narracao")
+    # Cache das narrações compartilhado entre documentos (endereçado pelo texto e pela voz)
+    cache_dir = "cache_narracao"
+    # Um manifesto por documento permite retomar uma geração interrompida
+    manifestos_dir = espacos.espaco(sessao, "manifestos_narracao")
+    exportacoes_dir = espacos.espaco(sessao, "exportacoes")
 
 
     
 
     if doc_file is not None and api_key and voice_id:
-        # Ler o arquivo DOCX da memória
-        doc_memory = io.BytesIO(doc_file.getvalue())
-        doc = Document(doc_memory)
-        set_api_key(api_key)
-
         with st.expander("Visualizar arquivos criados"):
-        # Botão para atualizar a lista de arquivos
-            refresh_button = st.button("Atualizar Pasta")
-
-            if refresh_button or 'refresh' not in st.session_state:
-                st.session_state['refresh'] = True
-
-            if st.session_state['refresh']:
-                if os.path.exists(audio_dir):
-                    for file in os.listdir(audio_dir):
-                        audio_path = os.path.join(audio_dir, file)
-                        with open(audio_path, "rb") as audio_file:
-                            st.audio(audio_file.read(), format="audio/mp3")
-                        if st.button(f"Excluir {file}"):
-                            os.remove(audio_path)
-                            st.session_state['refresh'] = False  # Requer atualização
+            exibir_biblioteca(audio_dir, cache_dir)
+        st.caption(f"Espaço usado nesta sessão: {espacos.uso(sessao) / 1024 / 1024:.0f} MB de "
+                   f"{espacos.limite_bytes / 1024 / 1024:.0f} MB. Arquivos sem uso são apagados "
+                   f"automaticamente após {espacos.ttl / 3600:.0f} h.")
 
         start_button = st.button("Iniciar Criação dos Áudios")
 
@@ -78,24 +115,28 @@ def streamlit_app():
         # Coloca o botão de download do ZIP na primeira coluna
         with col1:
             if st.button("📥 Baixar narrações em ZIP"):
-                zip_memory = io.BytesIO()
-                with zipfile.ZipFile(zip_memory, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file in os.listdir(audio_dir):
-                        zipf.write(os.path.join(audio_dir, file), file)
-                zip_memory.seek(0)
-                st.download_button(
-                    label="Baixar ZIP",
-                    data=zip_memory,
-                    file_name="narrações.zip",
-                    mime="application/zip"
-                )
+                # ZIP gravado em disco sem recomprimir os MP3 e reaproveitado se a pasta não mudou
+                with st.spinner("Preparando ZIP..."):
+                    zip_path = exportar_zip(audio_dir, exportacoes_dir)
+                # O Streamlit não transmite arquivos do disco: o download_button lê o ZIP
+                # inteiro para a memória do servidor enquanto o botão estiver na tela
+                with open(zip_path, "rb") as zip_file:
+                    st.download_button(
+                        label="Baixar ZIP",
+                        data=zip_file,
+                        file_name="narrações.zip",
+                        mime="application/zip"
+                    )
+                st.caption(f"ZIP de {os.path.getsize(zip_path) / 1024 / 1024:.0f} MB: o download é servido a "
+                           f"partir da memória do servidor, não do disco.")
 
         # Coloca o botão para interromper a criação dos áudios na segunda coluna
         with col2:
             stop_button = st.button("🛑 Parar Criação dos Áudios")
 
             if stop_button:
-                st.warning("A criação dos áudios foi interrompida.")
+                st.warning("A criação dos áudios foi interrompida. As partes já geradas ficam registradas: "
+                           "clique em \"Iniciar Criação dos Áudios\" para continuar de onde parou.")
                 return  # Interrompe a execução do script
 
         # Coloca o botão para limpar a pasta na terceira coluna
@@ -103,47 +144,67 @@ def streamlit_app():
             if st.button("🧹 Limpar Pasta de Áudios e ZIP",type="primary"):
                 shutil.rmtree(audio_dir)
                 os.makedirs(audio_dir)
+                shutil.rmtree(exportacoes_dir, ignore_errors=True)
                 st.success("Pasta de áudios e arquivo ZIP limpos com sucesso.")
         
         try:
             if start_button:
-                # Processa o documento
-                with st.spinner("Gerando áudios..."):
-                    current_slide = 0
-                    file_count = 0
-                    for para in doc.paragraphs:
-                        text = para.text.strip()
-                        if text.startswith("SLIDE:"):
-                            current_slide = int(text.split(': ')[1])
-                            file_count = 0
-                        elif text and text != '.':
-                            partes = dividir_texto(text, 200, '.')
-                            for parte in partes:
-                                file_count += 1
-                                if parte.strip() and parte.strip() != '.':
-                                    arquivo_audio = f"{audio_dir}/{current_slide}.{file_count}_narracao_slide.mp3"
-                                    if not os.path.exists(arquivo_audio):
-                                        audio = generate(
-                                            text=parte,
-                                            voice=Voice(
-                                                voice_id=voice_id,
-                                                settings=VoiceSettings(stability=1.0, similarity_boost=0.70, style=0.0, use_speaker_boost=True)
-                                            ),
-                                            model="eleven_multilingual_v2"
-                                        )
-                                        with open(arquivo_audio, 'wb') as file:
-                                            file.write(audio)
-                                        st.audio(arquivo_audio, format="audio/mp3")
-                                        st.success(f"Texto criado para Slide {current_slide}, Parte {file_count}:\n\n{parte}")
-            
-                st.success("Todos os arquivos de áudio foram gerados com sucesso")
+                espacos.verificar_cota(sessao)
+                # Partes numeradas por slide, já agrupadas até ``limite_caracteres``. Partes já
+                # narradas vêm do cache; um arquivo antigo na mesma posição é substituído se o texto mudou.
+                partes_documento = partes_narracao(documento, audio_dir)
+
+                backend = ElevenLabsTTS(api_key, voice_id)
+                manifesto = ManifestoNarracao(manifestos_dir, documento["hash"], backend.assinatura())
+                pendentes = manifesto.planejar(partes_documento)
+                ja_concluidas = len(partes_documento) - len(pendentes)
+                if ja_concluidas:
+                    st.info(f"Retomando: {ja_concluidas} de {len(partes_documento)} partes já foram geradas anteriormente.")
+
+                barra = st.progress(0.0, text=f"Gerando {len(pendentes)} áudios...")
+                concluidas = [0]
+
+                def ao_concluir(parte):
+                    concluidas[0] += 1
+                    barra.progress(concluidas[0] / len(pendentes), text=f"{concluidas[0]} de {len(pendentes)} áudios gerados")
+                    if not parte["cache"]:
+                        st.audio(parte["arquivo"], format="audio/mp3")
+                        st.success(f"Texto criado para Slide {parte['slide']}, Parte {parte['parte']}:\n\n{parte['texto']}")
+
+                def ao_falhar(parte, erro):
+                    st.error(f"Falha no Slide {parte['slide']}, Parte {parte['parte']}: {erro}")
+
+                cache = CacheTTS(cache_dir, int(limite_cache_mb) * 1024 * 1024)
+                try:
+                    with executar_com_perfil(perfilar, espacos.espaco(sessao, "perfis"), "narracao"):
+                        gerar_partes(
+                            pendentes, backend, paralelismo=int(paralelismo),
+                            limitador=LimitadorTaxa(requisicoes_por_segundo), ao_concluir=ao_concluir, cache=cache,
+                            manifesto=manifesto, ao_falhar=ao_falhar
+                        )
+                    faltando = len(partes_documento) - manifesto.resumo()[CONCLUIDA]
+                    if faltando:
+                        st.warning(f"{faltando} partes falharam. Clique em \"Iniciar Criação dos Áudios\" para tentar novamente apenas essas partes.")
+                    else:
+                        st.success("Todos os arquivos de áudio foram gerados com sucesso")
+                finally:
+                    cache.aplicar_limite()
+                    resumo = cache.resumo()
+                    st.info(
+                        f"Cache de narrações: {resumo['hits']} partes reaproveitadas e {resumo['misses']} geradas "
+                        f"({resumo['taxa_acerto']:.0%} de acerto) - {resumo['caracteres_economizados']} caracteres "
+                        f"de créditos economizados."
+                    )
 
        
-        except RateLimitError as e:
-            st.error("Os créditos da API acabaram. É necessário trocar de conta ou aguardar a renovação dos créditos para continuar.")
+        except CotaExcedida as e:
+            st.error(str(e))
+        except CreditosEsgotados:
+            st.error("Os créditos da API acabaram. É necessário trocar de conta ou aguardar a renovação dos créditos para continuar. "
+                     "Ao informar a nova chave, a geração continua de onde parou.")
 
     
 
 if __name__ == "__main__":
-    streamlit_app()
+    streamlit_app(barra_diagnostico("gerar_audios"))
 
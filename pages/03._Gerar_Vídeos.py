@@ -1,51 +1,15 @@
 import os
-from moviepy.editor import (
-    AudioFileClip, ImageClip, concatenate_videoclips, concatenate_audioclips, CompositeAudioClip
-)
-from moviepy.audio.AudioClip import AudioArrayClip
-from PIL import Image
-import numpy as np
 import streamlit as st
-import io
 import time
-import re
+from utils.imagens import RESOLUCOES, MODOS
+from utils.fila_render import FilaRender, ATIVOS, CONCLUIDO, ERRO
+from utils.diagnostico import barra_diagnostico, exibir_perfil
+from utils.espacos import CotaExcedida, espacos_padrao
+from utils.indice_audios import descrever_problemas, indexar_audios, tem_erros, validar_indice
+from utils.sessao import id_sessao
 
-def pil_to_npimage(pil_image):
-    """Convert PIL Image to numpy array."""
-    return np.array(pil_image)
-
-def create_silent_audio_clip(duration, fps=44100):
-    """Create a silent audio clip with given duration and fps."""
-    silent_array = np.zeros((int(fps * duration), 2))
-    return AudioArrayClip(silent_array, fps=fps)
-
-def create_slide(slide_path, audio_paths, audio_delay, extra_duration, fade_duration=0.2, additional_silent_time=1):
-    """Create a video slide with given parameters."""
-    # Load the image and prepare the image clip
-    image_np = pil_to_npimage(Image.open(slide_path))
-    total_audio_duration = sum([AudioFileClip(audio).duration for audio in audio_paths])
-    slide_duration = total_audio_duration + audio_delay + extra_duration + additional_silent_time
-    slide_clip = ImageClip(image_np, duration=slide_duration)
-
-    # Create a silent audio clip for the delay
-    silent_clip = create_silent_audio_clip(audio_delay)
-
-    # Load audio clips, apply fade in and fade out
-    audio_clips = [silent_clip] + [
-        AudioFileClip(audio).audio_fadein(fade_duration).audio_fadeout(fade_duration) 
-        for audio in audio_paths
-    ]
-    combined_audio_clip = concatenate_audioclips(audio_clips)
-
-    # Set up the audio to start after the extra_duration
-    final_audio_clip = CompositeAudioClip([combined_audio_clip.set_start(extra_duration)])
-    slide_clip = slide_clip.set_audio(final_audio_clip)
-
-    return slide_clip
-
-def create_fade_transition(clip, fade_duration=0.5):
-    """Aplica um fade in e fade out no clipe dado."""
-    return clip.fadein(fade_duration).fadeout(fade_duration)
+# Quantidade de vídeos renderizados ao mesmo tempo no servidor
+MAX_TRABALHOS = int(os.environ.get("RENDER_MAX_TRABALHOS", "1"))
 
 def format_time(seconds):
     """Converte segundos em minutos e segundos."""
@@ -53,7 +17,50 @@ def format_time(seconds):
     secs = int(seconds % 60)
     return f"{mins} minuto(s) e {secs} segundo(s)"
 
-def streamlit_app():
+@st.cache_resource
+def obter_fila():
+    """Fila única por processo do Streamlit, compartilhada entre sessões e recarregamentos."""
+    espacos = espacos_padrao()
+    # Mesma cota e validade dos espaços de trabalho; a limpeza roda com a deles
+    fila = FilaRender(os.path.join(os.getcwd(), "videos"), max_trabalhos=MAX_TRABALHOS,
+                      ttl=espacos.ttl, limite_sessao=espacos.limite_bytes)
+    espacos.registrar_coleta(fila.coletar)
+    return fila
+
+def exibir_trabalhos(fila, sessao):
+    """Lista os trabalhos de renderização da sessão com status, progresso e download."""
+    st.subheader("Trabalhos de renderização")
+    trabalhos = fila.listar(sessao)
+    if not trabalhos:
+        st.write("Nenhum vídeo na fila.")
+        return False
+
+    for trabalho in trabalhos[:20]:
+        st.write(f"**{trabalho['nome']}** - {trabalho['status'].replace('_', ' ')}")
+        if trabalho["status"] in ATIVOS:
+            st.progress(trabalho["progresso"], text=trabalho["mensagem"])
+            if trabalho["iniciado_em"]:
+                st.caption(f"Tempo decorrido: {format_time(time.time() - trabalho['iniciado_em'])}")
+        elif trabalho["status"] == CONCLUIDO:
+            st.caption(f"Vídeo gerado em {format_time(trabalho['concluido_em'] - trabalho['iniciado_em'])}.")
+            resumo = trabalho.get("resumo") or {}
+            if "cache_hits" in resumo:
+                st.caption(f"Cache de segmentos: {resumo['cache_hits']} reaproveitado(s), {resumo['cache_misses']} renderizado(s).")
+            with st.expander("Tempo por etapa"):
+                st.table({"Etapa": list(trabalho["tempos"]), "Segundos": [f"{segundos:.2f}" for segundos in trabalho["tempos"].values()]})
+            if os.path.exists(trabalho["saida"]):
+                with open(trabalho["saida"], 'rb') as file:
+                    st.download_button("Baixar Vídeo Gerado", file, file_name=f"{trabalho['nome']}.mp4",
+                                       mime="video/mp4", key=f"baixar_{trabalho['id']}")
+        elif trabalho["status"] == ERRO:
+            st.error(trabalho["mensagem"])
+        perfil = trabalho.get("perfil")
+        if perfil and os.path.exists(perfil["caminho"]):
+            exibir_perfil(perfil["caminho"], perfil["texto"], trabalho["id"])
+        st.divider()
+    return any(trabalho["status"] in ATIVOS for trabalho in trabalhos)
+
+def streamlit_app(perfilar=False):
     """Streamlit app for generating slideshow videos."""
     st.title("Gerador de Vídeo")
 
@@ -61,85 +68,94 @@ def streamlit_app():
     uploaded_audios = st.file_uploader("Envie os áudios", type=['mp3'], accept_multiple_files=True)
 
     output_file_name = st.text_input("Nome do vídeo", "video_gerado")
-    persistent_dir = os.path.join(os.getcwd(), "videos")
-
-    if not os.path.exists(persistent_dir):
-        os.makedirs(persistent_dir)
+    sessao = id_sessao()
 
     # Permitir que o usuário especifique de qual slide começar
     slide_inicial = st.number_input("Número do primeiro slide", min_value=1, value=1)
 
+    col_resolucao, col_ajuste = st.columns(2)
+    with col_resolucao:
+        resolucao = RESOLUCOES[st.selectbox("Resolução do vídeo", list(RESOLUCOES))]
+    with col_ajuste:
+        modo_ajuste = st.radio(
+            "Ajuste das imagens", MODOS, horizontal=True,
+            help="letterbox mantém a proporção com barras pretas; fit estica a imagem para preencher o quadro."
+        )
+
+    modo_codificacao = st.radio(
+        "Modo de codificação",
+        ["Segmentos estáticos (rápido)", "MoviePy (composição completa)"],
+        help="Segmentos estáticos codifica cada slide direto no ffmpeg e une os trechos sem recodificar."
+    )
+    usar_segmentos = modo_codificacao.startswith("Segmentos")
+    if usar_segmentos:
+        workers = st.number_input(
+            "Processos paralelos", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1,
+            help="Quantidade de slides codificados ao mesmo tempo."
+        )
+        limite_cache_mb = st.number_input(
+            "Limite do cache de segmentos (MB)", min_value=100, value=2048, step=100,
+            help="Slides sem alteração reaproveitam o segmento já renderizado."
+        )
+
+    fila = obter_fila()
+
     if st.button("Criar Vídeo"):
+        # Narrações conferidas antes de entrar na fila: uma parte faltando ou repetida
+        # aparece agora, e não depois de minutos de codificação
+        problemas = None
         if uploaded_images and uploaded_audios:
-            with st.spinner("Gerando vídeo..."):
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                start_time = time.time()
-
-                audio_paths = {}
-                for audio in uploaded_audios:
-                    audio_path = os.path.join(persistent_dir, audio.name)
-                    audio_paths[audio.name] = audio_path
-                    with open(audio_path, 'wb') as file:
-                        file.write(audio.getbuffer())
-
-                video_clips = []
-                total_steps = len(uploaded_images)
-                for i, img in enumerate(uploaded_images, start=slide_inicial):
-                    with Image.open(io.BytesIO(img.getvalue())) as image:
-                        slide_path = os.path.join(persistent_dir, img.name)
-                        image.save(slide_path)
-                        print(i)
-
-                    slide_audio_paths = [path for name, path in audio_paths.items() if re.match(rf'{i}\.[0-9]+_narracao_slide\.mp3', name)]
-                    video_clips.append(create_slide(slide_path, slide_audio_paths, 0.3, 0.3))
-
-                    # Cálculo do progresso atualizado
-                    current_step = i - slide_inicial + 1
-                    elapsed_time = time.time() - start_time
-                    progress = current_step / total_steps
-                    progress = min(max(progress, 0.0), 1.0)  # Garantir que o progresso esteja entre 0.0 e 1.0
-                    progress_bar.progress(progress)
-                    status_text.text(f"Processing Slide {i}/{len(uploaded_images)} ({elapsed_time:.2f}s)")
-
-                # Atualiza o status com o tempo decorrido
-                elapsed_time = time.time() - start_time
-                formatted_time = format_time(elapsed_time)
-                status_text.text(f"Processando Slide {i+1}/{len(uploaded_images)} - Tempo decorrido: {formatted_time}")
-
-                # Processamento dos slides com transição otimizada
-                final_clips = []
-                fade_duration = 0.1  # Duracao do fade in e fade out
-
-                for clip in video_clips:
-                    faded_clip = create_fade_transition(clip, fade_duration)
-                    final_clips.append(faded_clip)
-
-                final_video = concatenate_videoclips(final_clips, method="compose")
- 
-                output_path = os.path.join(persistent_dir, f"{output_file_name}.mp4")
-                final_video.write_videofile(output_path, codec='libx264', audio_codec='aac', fps=24)
-
-                del video_clips
-                del final_video
-                total_time = time.time() - start_time
-                formatted_total_time = format_time(total_time)
-                status_text.text(f"Vídeo gerado com sucesso em {formatted_total_time}.")
-
-                progress_bar.empty()
-
-                with open(output_path, 'rb') as file:
-                    st.download_button("Baixar Vídeo Gerado", file, file_name=f"{output_file_name}.mp4", mime="video/mp4")
+            indice, fora_do_padrao = indexar_audios({audio.name: audio.name for audio in uploaded_audios})
+            problemas = validar_indice(indice, int(slide_inicial), int(slide_inicial) + len(uploaded_images) - 1, fora_do_padrao)
+            erros, avisos = descrever_problemas(problemas)
+            for mensagem in erros:
+                st.error(mensagem)
+            for mensagem in avisos:
+                st.warning(mensagem)
+
+        if problemas is not None and tem_erros(problemas):
+            st.error("Corrija os áudios enviados antes de criar o vídeo.")
+        elif uploaded_images and uploaded_audios:
+            # A renderização roda em segundo plano: a página pode ser recarregada sem perder o trabalho
+            parametros = dict(
+                slide_inicial=int(slide_inicial), resolucao=resolucao, modo_ajuste=modo_ajuste,
+                usar_segmentos=usar_segmentos, workers=int(workers) if usar_segmentos else 1,
+                limite_cache_mb=int(limite_cache_mb) if usar_segmentos else 2048
+            )
+            try:
+                fila.enviar(output_file_name, uploaded_images, uploaded_audios, parametros, sessao=sessao,
+                            perfilar=perfilar)
+                st.success("Vídeo enviado para a fila de renderização.")
+            except CotaExcedida as e:
+                st.error(str(e))
+        else:
+            st.warning("Envie as imagens dos slides e os áudios.")
+
+    col_atualizar, col_acompanhar = st.columns(2)
+    with col_atualizar:
+        st.button("Atualizar status")
+    with col_acompanhar:
+        acompanhar = st.checkbox("Acompanhar automaticamente", value=True)
+
+    ha_ativos = exibir_trabalhos(fila, sessao)
+    st.caption(f"Espaço usado pelos seus vídeos: {fila.uso(sessao) / 1024 / 1024:.0f} MB de "
+               f"{fila.limite_sessao / 1024 / 1024:.0f} MB. Vídeos finalizados são apagados "
+               f"automaticamente após {fila.ttl / 3600:.0f} h.")
 
     # Button to delete files
     if st.button("Apagar Arquivos"):
         try:
-            for file in os.listdir(persistent_dir):
-                os.remove(os.path.join(persistent_dir, file))
+            # Só os trabalhos desta sessão; os que estão na fila ou em execução são preservados.
+            # Os caches compartilhados (imagens, segmentos) têm limite próprio.
+            fila.limpar_finalizados(sessao)
             st.success("Arquivos apagados com sucesso.")
         except Exception as e:
             st.error(f"Erro ao apagar arquivos: {e}")
 
+    if acompanhar and ha_ativos:
+        time.sleep(2)
+        st.rerun()
+
 if __name__ == "__main__":
-    streamlit_app()
+    streamlit_app(barra_diagnostico("gerar_videos"))
 
@@ -0,0 +1,372 @@
+"""Geração das aulas sem interface: PPTX → DOCX → narração → MP4.
+
+Cada aula é uma pasta com a apresentação (``*.pptx``) e as imagens dos slides
+exportadas do PowerPoint em ``slides/``. As etapas gravam na própria pasta:
+
+    aula/aula.pptx                      entrada
+    aula/slides/Slide1.PNG ...          entrada (imagens dos slides, em ordem numérica)
+    aula/aula.docx                      etapa docx (pode ser revisado à mão)
+    aula/audio/N.M_narracao_slide.mp3   etapa narracao
+    aula/aula.mp4                       etapa video
+
+Os resultados passam de uma etapa para a seguinte em memória (bytes do DOCX,
+documento interpretado, lista de narrações), sem reler o que acabou de ser gravado.
+Etapas com a saída em dia são puladas: o DOCX mais novo que o PPTX e as regras de
+pronúncia, as narrações concluídas no manifesto e o MP4 mais novo que as imagens e os
+áudios usados da última vez (nomes, tamanhos e datas guardados em ``.pipeline/video.json``:
+um slide ou uma narração removidos também refazem o vídeo). Um DOCX revisado à mão depois da conversão, portanto, não é sobrescrito.
+
+A chave da ElevenLabs vem de ``ELEVENLABS_API_KEY`` e a voz de ``--voice-id`` (ou
+``ELEVENLABS_VOICE_ID``).
+
+Uso:
+    python pipeline.py cursos/*/ --aulas-paralelas 2
+    python pipeline.py cursos/direito_adm --de narracao --ate video --workers-video 4
+    python pipeline.py cursos/*/ --ate docx --forcar
+    python pipeline.py cursos/direito_adm --metricas metricas.prom --perfil pipeline.prof
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+
+from utils import metricas
+from utils.tempos import Cronometro
+
+ETAPAS = ("docx", "narracao", "video")
+EXECUTADA = "executada"
+EM_DIA = "em dia"
+ERRO = "erro"
+
+# Intervalo mínimo entre mensagens de andamento de uma mesma aula
+INTERVALO_AVISOS = 5.0
+
+
+def avisar(aula, mensagem):
+    print(f"[{aula}] {mensagem}", file=sys.stderr, flush=True)
+
+
+def ordem_natural(nome):
+    """Chave de ordenação com os números pelo valor ("Slide2" antes de "Slide10")."""
+    return [int(trecho) if trecho.isdigit() else trecho.lower() for trecho in re.split(r"(\d+)", nome)]
+
+
+def mtime(caminho):
+    try:
+        return os.stat(caminho).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def em_dia(saida, entradas):
+    """A saída existe e é mais nova que todas as entradas."""
+    gerado = mtime(saida)
+    return gerado is not None and all((mtime(entrada) or 0) <= gerado for entrada in entradas)
+
+
+def impressao_entradas(entradas):
+    """Resumo dos nomes, tamanhos e datas das entradas, na ordem recebida.
+
+    Muda quando uma entrada é alterada, incluída ou removida.
+    """
+    registros = []
+    for entrada in entradas:
+        try:
+            info = os.stat(entrada)
+            registros.append([os.path.basename(entrada), info.st_size, info.st_mtime_ns])
+        except FileNotFoundError:
+            registros.append([os.path.basename(entrada), None, None])
+    return hashlib.sha256(json.dumps(registros).encode("utf-8")).hexdigest()
+
+
+def video_em_dia(arquivos, entradas):
+    """O MP4 é mais novo que as entradas e foi gerado exatamente com elas."""
+    if not em_dia(arquivos["mp4"], entradas):
+        return False
+    try:
+        with open(os.path.join(arquivos["interno_dir"], "video.json"), encoding="utf-8") as arquivo:
+            return json.load(arquivo).get("entradas") == impressao_entradas(entradas)
+    except (FileNotFoundError, ValueError):
+        # Sem registro (vídeo de uma versão anterior): não há como saber o que foi usado
+        return False
+
+
+def registrar_video(arquivos, entradas):
+    """Guarda o resumo das entradas do MP4 recém-gerado, para ``video_em_dia``."""
+    os.makedirs(arquivos["interno_dir"], exist_ok=True)
+    caminho = os.path.join(arquivos["interno_dir"], "video.json")
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump({"entradas": impressao_entradas(entradas)}, arquivo)
+    os.replace(temporario, caminho)
+
+
+def arquivos_aula(aula_dir):
+    """Caminhos de entrada e saída da aula (o nome vem do PPTX ou da pasta)."""
+    pptx = sorted(nome for nome in os.listdir(aula_dir) if nome.lower().endswith(".pptx") and not nome.startswith("~$"))
+    nome = os.path.splitext(pptx[0])[0] if pptx else os.path.basename(os.path.normpath(aula_dir))
+    slides_dir = os.path.join(aula_dir, "slides")
+    slides = []
+    if os.path.isdir(slides_dir):
+        slides = [os.path.join(slides_dir, arquivo) for arquivo in sorted(os.listdir(slides_dir), key=ordem_natural)
+                  if arquivo.lower().endswith((".png", ".jpg", ".jpeg"))]
+    return {
+        "nome": nome,
+        "pptx": os.path.join(aula_dir, pptx[0]) if pptx else None,
+        "docx": os.path.join(aula_dir, f"{nome}.docx"),
+        "audio_dir": os.path.join(aula_dir, "audio"),
+        "slides": slides,
+        "mp4": os.path.join(aula_dir, f"{nome}.mp4"),
+        "interno_dir": os.path.join(aula_dir, ".pipeline"),
+    }
+
+
+def etapa_docx(arquivos, opcoes, resultado):
+    from utils.substituicoes import ARQUIVO_PADRAO
+
+    if arquivos["pptx"] is None:
+        raise FileNotFoundError("nenhum arquivo .pptx na pasta da aula")
+    if not opcoes["forcar"] and em_dia(arquivos["docx"], [arquivos["pptx"], ARQUIVO_PADRAO]):
+        return EM_DIA
+
+    # Importados só quando a etapa é executada: conferir uma aula em dia é imediato
+    from utils.conversao import converter_arquivo
+    from utils.tts import gravar_atomico
+    with open(arquivos["pptx"], "rb") as arquivo:
+        _, docx_bytes = converter_arquivo(arquivos["pptx"], arquivo.read(), opcoes["limite_paragrafo"])
+    gravar_atomico(arquivos["docx"], docx_bytes)
+    resultado["docx_bytes"] = docx_bytes
+    return EXECUTADA
+
+
+def etapa_narracao(arquivos, opcoes, resultado):
+    from utils.cache_tts import CacheTTS
+    from utils.documento_narracao import ler_documento
+    from utils.manifesto_narracao import ManifestoNarracao, CONCLUIDA
+    from utils.tts import ElevenLabsTTS, LimitadorTaxa, gerar_partes, ler_nome_parte, partes_narracao
+
+    docx_bytes = resultado.get("docx_bytes")
+    if docx_bytes is None:
+        with open(arquivos["docx"], "rb") as arquivo:
+            docx_bytes = arquivo.read()
+    documento = ler_documento(docx_bytes, opcoes["limite_caracteres"])
+    audio_dir = arquivos["audio_dir"]
+    os.makedirs(audio_dir, exist_ok=True)
+    partes = partes_narracao(documento, audio_dir)
+    resultado["audio_paths"] = {os.path.basename(parte["arquivo"]): parte["arquivo"] for parte in partes}
+
+    # Narrações de partes que não existem mais no documento não podem entrar no vídeo
+    for nome in os.listdir(audio_dir):
+        if ler_nome_parte(nome) and nome not in resultado["audio_paths"]:
+            os.remove(os.path.join(audio_dir, nome))
+
+    if not opcoes["voice_id"]:
+        raise ValueError("informe --voice-id (ou ELEVENLABS_VOICE_ID)")
+    backend = ElevenLabsTTS(opcoes["api_key"], opcoes["voice_id"])
+    manifesto = ManifestoNarracao(os.path.join(arquivos["interno_dir"], "manifestos"), documento["hash"], backend.assinatura())
+    pendentes = manifesto.planejar(partes)
+    if not pendentes:
+        return EM_DIA
+    if not opcoes["api_key"]:
+        raise ValueError(f"{len(pendentes)} partes a narrar: defina ELEVENLABS_API_KEY")
+
+    cache = CacheTTS(os.path.join(opcoes["cache_dir"], "narracao"), opcoes["limite_cache_mb"] * 1024 * 1024)
+    concluidas = [0]
+    ultimo_aviso = [0.0]
+
+    def ao_concluir(parte):
+        concluidas[0] += 1
+        if time.time() - ultimo_aviso[0] >= INTERVALO_AVISOS or concluidas[0] == len(pendentes):
+            ultimo_aviso[0] = time.time()
+            avisar(arquivos["nome"], f"narração: {concluidas[0]} de {len(pendentes)} partes")
+
+    def ao_falhar(parte, erro):
+        avisar(arquivos["nome"], f"narração: falha no slide {parte['slide']}, parte {parte['parte']}: {erro}")
+
+    try:
+        gerar_partes(pendentes, backend, paralelismo=opcoes["paralelismo_tts"],
+                     limitador=LimitadorTaxa(opcoes["requisicoes_por_segundo"]), ao_concluir=ao_concluir,
+                     cache=cache, manifesto=manifesto, ao_falhar=ao_falhar)
+    finally:
+        cache.aplicar_limite()
+    faltando = len(partes) - manifesto.resumo()[CONCLUIDA]
+    if faltando:
+        raise RuntimeError(f"{faltando} partes da narração falharam; execute novamente para tentar só essas partes")
+    return EXECUTADA
+
+
+def etapa_video(arquivos, opcoes, resultado):
+    audio_paths = resultado.get("audio_paths")
+    if audio_paths is None:
+        from utils.tts import ler_nome_parte
+        audio_dir = arquivos["audio_dir"]
+        audio_paths = {nome: os.path.join(audio_dir, nome) for nome in sorted(os.listdir(audio_dir)) if ler_nome_parte(nome)}
+    if not arquivos["slides"]:
+        raise FileNotFoundError("nenhuma imagem de slide em slides/")
+    entradas = arquivos["slides"] + list(audio_paths.values())
+    if not opcoes["forcar"] and video_em_dia(arquivos, entradas):
+        return EM_DIA
+
+    from utils.render import renderizar_video
+
+    # O MP4 é gerado numa pasta de trabalho e só então movido: um vídeo interrompido
+    # nunca fica com o nome final (e não pareceria em dia na próxima execução)
+    trabalho_dir = os.path.join(arquivos["interno_dir"], "video")
+    temporario = os.path.join(trabalho_dir, os.path.basename(arquivos["mp4"]))
+    ultimo_aviso = [0.0]
+
+    def progresso(fracao, mensagem):
+        if time.time() - ultimo_aviso[0] >= INTERVALO_AVISOS:
+            ultimo_aviso[0] = time.time()
+            avisar(arquivos["nome"], f"vídeo: {fracao:.0%} - {mensagem}")
+
+    try:
+        resultado["video"] = renderizar_video(
+            arquivos["slides"], audio_paths, temporario, os.path.join(trabalho_dir, "temp"),
+            os.path.join(opcoes["cache_dir"], "video"), resolucao=opcoes["resolucao"],
+            modo_ajuste=opcoes["modo_ajuste"], workers=opcoes["workers_video"], progresso=progresso
+        )
+        os.replace(temporario, arquivos["mp4"])
+        registrar_video(arquivos, entradas)
+    finally:
+        shutil.rmtree(trabalho_dir, ignore_errors=True)
+    return EXECUTADA
+
+
+FUNCOES_ETAPAS = {"docx": etapa_docx, "narracao": etapa_narracao, "video": etapa_video}
+
+
+def processar_aula(aula_dir, etapas, opcoes):
+    """Executa ``etapas`` (em ordem) numa aula; para na primeira que falhar."""
+    arquivos = arquivos_aula(aula_dir)
+    cronometro = Cronometro()
+    situacoes = {}
+    erro = None
+    resultado = {}
+    for etapa in etapas:
+        try:
+            with cronometro.etapa(etapa):
+                situacoes[etapa] = FUNCOES_ETAPAS[etapa](arquivos, opcoes, resultado)
+            metricas.observar("pipeline_etapa_segundos", cronometro.etapas[etapa], etapa=etapa, situacao=situacoes[etapa])
+            avisar(arquivos["nome"], f"{etapa}: {situacoes[etapa]} ({cronometro.etapas[etapa]:.1f}s)")
+        except Exception as e:
+            situacoes[etapa] = ERRO
+            metricas.observar("pipeline_etapa_segundos", cronometro.etapas[etapa], etapa=etapa, situacao=ERRO)
+            erro = f"{etapa}: {e}"
+            avisar(arquivos["nome"], f"{etapa}: erro - {e}")
+            if opcoes["detalhes"]:
+                traceback.print_exc()
+            break
+    return {"aula": aula_dir, "nome": arquivos["nome"], "situacoes": situacoes, "erro": erro, **cronometro.relatorio()}
+
+
+def _processar_aula_com_metricas(aula_dir, etapas, opcoes):
+    """``processar_aula`` num processo auxiliar, devolvendo também as métricas da aula."""
+    # Os processos são reaproveitados entre aulas: cada resultado leva só a sua medição
+    metricas.registro.zerar()
+    return processar_aula(aula_dir, etapas, opcoes), metricas.registro.instantaneo()
+
+
+def imprimir_resumo(resultados, etapas, duracao):
+    colunas = ["Aula"] + list(etapas) + ["Total"]
+    linhas = []
+    for r in resultados:
+        celulas = [r["nome"]]
+        for etapa in etapas:
+            situacao = r["situacoes"].get(etapa)
+            celulas.append(f"{r['etapas'][etapa]:.1f}s {situacao}" if etapa in r["etapas"] else "-")
+        celulas.append(f"{r['total']:.1f}s")
+        linhas.append(celulas)
+    larguras = [max(len(str(c)) for c in coluna) for coluna in zip(colunas, *linhas)]
+    for celulas in [colunas] + linhas:
+        print("  ".join(str(c).ljust(largura) for c, largura in zip(celulas, larguras)))
+    falhas = [r for r in resultados if r["erro"]]
+    print(f"\n{len(resultados)} aula(s) em {duracao:.1f}s - {len(falhas)} com erro")
+    for r in falhas:
+        print(f"  {r['nome']}: {r['erro']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("aulas", nargs="+", help="Pastas das aulas")
+    parser.add_argument("--de", choices=ETAPAS, default=ETAPAS[0], help="Primeira etapa")
+    parser.add_argument("--ate", choices=ETAPAS, default=ETAPAS[-1], help="Última etapa")
+    parser.add_argument("--forcar", action="store_true", help="Refaz o DOCX e o vídeo mesmo se estiverem em dia")
+    parser.add_argument("--aulas-paralelas", type=int, default=1, help="Aulas processadas ao mesmo tempo")
+    parser.add_argument("--limite-paragrafo", type=int, default=100, help="Caracteres por parágrafo no DOCX")
+    parser.add_argument("--limite-caracteres", type=int, default=400, help="Caracteres por requisição de narração")
+    parser.add_argument("--voice-id", default=os.environ.get("ELEVENLABS_VOICE_ID"))
+    parser.add_argument("--paralelismo-tts", type=int, default=3, help="Requisições simultâneas por aula")
+    parser.add_argument("--requisicoes-por-segundo", type=float, default=2.0)
+    parser.add_argument("--limite-cache-mb", type=int, default=1024, help="Limite do cache de narrações")
+    parser.add_argument("--resolucao", default="1920x1080", help="Resolução do vídeo (LARGURAxALTURA)")
+    parser.add_argument("--modo-ajuste", choices=("letterbox", "fit"), default="letterbox")
+    parser.add_argument("--workers-video", type=int, default=1, help="Processos de codificação por aula")
+    parser.add_argument("--cache-dir", default="cache_pipeline", help="Caches compartilhados entre as aulas")
+    parser.add_argument("--relatorio", help="Grava o resumo em JSON")
+    parser.add_argument("--metricas", help="Grava contadores e histogramas de latência (.prom: texto do Prometheus; senão JSON)")
+    parser.add_argument("--perfil", help="Grava o perfil da execução (cProfile, só o processo principal)")
+    parser.add_argument("--detalhes", action="store_true", help="Mostra o traceback dos erros")
+    args = parser.parse_args()
+
+    if ETAPAS.index(args.de) > ETAPAS.index(args.ate):
+        parser.error("--de precisa vir antes de --ate")
+    etapas = ETAPAS[ETAPAS.index(args.de):ETAPAS.index(args.ate) + 1]
+    largura, altura = (int(valor) for valor in args.resolucao.lower().split("x"))
+    opcoes = {
+        "forcar": args.forcar,
+        "limite_paragrafo": args.limite_paragrafo,
+        "limite_caracteres": args.limite_caracteres,
+        "api_key": os.environ.get("ELEVENLABS_API_KEY"),
+        "voice_id": args.voice_id,
+        "paralelismo_tts": args.paralelismo_tts,
+        "requisicoes_por_segundo": args.requisicoes_por_segundo,
+        "limite_cache_mb": args.limite_cache_mb,
+        "resolucao": (largura, altura),
+        "modo_ajuste": args.modo_ajuste,
+        "workers_video": args.workers_video,
+        "cache_dir": os.path.abspath(args.cache_dir),
+        "detalhes": args.detalhes,
+    }
+    aulas = [aula for aula in args.aulas if os.path.isdir(aula)]
+    for aula in sorted(set(args.aulas) - set(aulas)):
+        print(f"Ignorando {aula}: não é uma pasta", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ExitStack() as pilha:
+        if args.perfil:
+            pilha.enter_context(metricas.perfilar(args.perfil))
+        if args.aulas_paralelas <= 1 or len(aulas) <= 1:
+            for aula in aulas:
+                resultados.append(processar_aula(aula, etapas, opcoes))
+        else:
+            # Uma aula por processo; as etapas de cada aula continuam em sequência
+            with ProcessPoolExecutor(max_workers=args.aulas_paralelas) as executor:
+                futuros = [executor.submit(_processar_aula_com_metricas, aula, etapas, opcoes) for aula in aulas]
+                for futuro in as_completed(futuros):
+                    resultado, medicoes = futuro.result()
+                    resultados.append(resultado)
+                    metricas.registro.mesclar(medicoes)
+            resultados.sort(key=lambda r: aulas.index(r["aula"]))
+    duracao = time.perf_counter() - inicio
+
+    imprimir_resumo(resultados, etapas, duracao)
+    if args.metricas:
+        metricas.registro.salvar(args.metricas)
+    if args.relatorio:
+        with open(args.relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump({"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "etapas": list(etapas),
+                       "duracao": round(duracao, 3), "aulas": resultados}, arquivo, ensure_ascii=False, indent=2)
+    return 1 if any(r["erro"] for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import sys
+import types
+
+import pytest
+
+from utils import banco_questoes
+from utils.banco_questoes import ErroBanco, carregar_taxonomia, iterar_questoes
+
+
+class Cursor:
+    def __init__(self, banco, linhas):
+        self.banco = banco
+        self.linhas = list(linhas)
+        self.fechado = False
+
+    def execute(self, consulta, parametros=None):
+        if self.banco.falhar:
+            raise self.banco.Error("Lost connection to MySQL server")
+        self.banco.consultas.append(parametros)
+
+    def fetchall(self):
+        linhas, self.linhas = self.linhas, []
+        return linhas
+
+    def fetchmany(self, quantidade):
+        self.banco.lotes.append(quantidade)
+        linhas, self.linhas = self.linhas[:quantidade], self.linhas[quantidade:]
+        return linhas
+
+    def close(self):
+        self.fechado = True
+
+
+class Conexao:
+    def __init__(self, banco):
+        self.banco = banco
+
+    def cursor(self, buffered=None):
+        self.banco.cursores.append(Cursor(self.banco, self.banco.linhas))
+        return self.banco.cursores[-1]
+
+    def close(self):
+        self.banco.emprestadas -= 1
+
+
+class Pool:
+    def __init__(self, banco, **argumentos):
+        self.banco = banco
+        self.argumentos = argumentos
+        banco.pools.append(self)
+
+    def get_connection(self):
+        self.banco.emprestadas += 1
+        return Conexao(self.banco)
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    """Substitui o ``mysql.connector`` (não instalado nos testes) por um banco em memória."""
+    class Error(Exception):
+        pass
+
+    estado = types.SimpleNamespace(pools=[], cursores=[], consultas=[], lotes=[], linhas=[], emprestadas=0,
+                                   falhar=False, Error=Error)
+    pooling = types.SimpleNamespace(MySQLConnectionPool=lambda **argumentos: Pool(estado, **argumentos))
+    connector = types.SimpleNamespace(Error=Error, pooling=pooling)
+    monkeypatch.setitem(sys.modules, "mysql", types.SimpleNamespace(connector=connector))
+    monkeypatch.setitem(sys.modules, "mysql.connector", connector)
+    monkeypatch.setattr(banco_questoes, "_pools", {})
+    return estado
+
+
+def config(**extra):
+    return dict({"user": "u", "password": "p", "host": "localhost", "port": 3306, "database": "questoes"}, **extra)
+
+
+def test_pool_reaproveitado_por_configuracao(banco, monkeypatch):
+    monkeypatch.setenv("QUESTOES_DB_POOL", "100")
+    carregar_taxonomia(config())
+    carregar_taxonomia(config())
+    assert len(banco.pools) == 1
+    assert banco.pools[0].argumentos["pool_size"] == banco_questoes.TAMANHO_MAXIMO_POOL
+    carregar_taxonomia(config(host="outro"))
+    assert len(banco.pools) == 2
+    assert banco.emprestadas == 0
+
+
+def test_taxonomia_em_arvore(banco):
+    banco.linhas = [("Direito", None, None), ("Direito", "Constitucional", "Direitos"),
+                    ("Direito", "Constitucional", "Poderes"), ("Direito", "Administrativo", None), ("Português", None, None)]
+    assert carregar_taxonomia(config()) == {
+        "Direito": {"Constitucional": ["Direitos", "Poderes"], "Administrativo": []},
+        "Português": {},
+    }
+
+
+def test_questoes_lidas_em_lotes(banco):
+    banco.linhas = [(n, f"Questão {n}", "") for n in range(1, 8)]
+    assert [questao[0] for questao in iterar_questoes(config(), "Direito", "", "", lote=3)] == list(range(1, 8))
+    assert banco.lotes == [3, 3, 3, 3, 3]
+    assert banco.consultas == [("Direito", "Direito", "", "", "", "")]
+    assert banco.cursores[0].fechado
+    assert banco.emprestadas == 0
+
+
+def test_gerador_interrompido_esvazia_o_cursor_e_devolve_a_conexao(banco):
+    banco.linhas = [(n, "", "") for n in range(10)]
+    questoes = iterar_questoes(config(), "", "", "", lote=4)
+    next(questoes)
+    assert banco.emprestadas == 1
+    questoes.close()
+    assert banco.cursores[0].linhas == []
+    assert banco.cursores[0].fechado
+    assert banco.emprestadas == 0
+
+
+def test_erro_do_conector_vira_erro_banco(banco):
+    banco.falhar = True
+    with pytest.raises(ErroBanco, match="Lost connection"):
+        carregar_taxonomia(config())
+    assert banco.emprestadas == 0
@@ -0,0 +1,62 @@
+import os
+import shutil
+import subprocess
+
+import imageio_ffmpeg
+import pytest
+
+from utils import duracao_audio
+from utils.biblioteca_narracao import indexar_narracoes, versao_pasta
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi",
+         "-i", "sine=frequency=440:sample_rate=44100:duration=1.5", "-ac", "1", "-b:a", "64k",
+         str(audio_dir / "2.1_narracao_slide.mp3")],
+        check=True,
+    )
+    for nome in ("10.2_narracao_slide.mp3", "10.1_narracao_slide.mp3", "abertura.mp3"):
+        shutil.copyfile(audio_dir / "2.1_narracao_slide.mp3", audio_dir / nome)
+    # Gravação em andamento e arquivos que não são MP3 ficam de fora
+    (audio_dir / "3.1_narracao_slide.mp3.123.456.tmp").write_bytes(b"parcial")
+    (audio_dir / "notas.txt").write_text("texto")
+    return audio_dir
+
+
+def test_lista_em_ordem_de_slide_e_parte(pasta, tmp_path):
+    itens = indexar_narracoes(str(pasta), str(tmp_path / "indice.json"))
+    assert [item["arquivo"] for item in itens] == ["2.1_narracao_slide.mp3", "10.1_narracao_slide.mp3",
+                                                   "10.2_narracao_slide.mp3", "abertura.mp3"]
+    assert [(item["slide"], item["parte"]) for item in itens] == [(2, 1), (10, 1), (10, 2), (None, None)]
+    assert all(item["duracao"] == pytest.approx(1.5, abs=0.002) for item in itens)
+    assert itens[0]["tamanho"] == os.path.getsize(pasta / "2.1_narracao_slide.mp3")
+
+
+def test_duracoes_vem_do_indice_na_segunda_varredura(pasta, tmp_path, monkeypatch):
+    indice_path = str(tmp_path / "indice.json")
+    indexar_narracoes(str(pasta), indice_path)
+
+    def nao_deveria_ler(dados):
+        raise AssertionError("arquivo relido")
+
+    monkeypatch.setattr(duracao_audio, "duracao_mp3", nao_deveria_ler)
+    assert len(indexar_narracoes(str(pasta), indice_path)) == 4
+
+
+def test_arquivo_corrompido_fica_sem_duracao(pasta, tmp_path):
+    (pasta / "1.1_narracao_slide.mp3").write_bytes(b"\x00" * 100)
+    itens = indexar_narracoes(str(pasta), str(tmp_path / "indice.json"))
+    assert itens[0]["arquivo"] == "1.1_narracao_slide.mp3"
+    assert itens[0]["duracao"] is None
+
+
+def test_versao_muda_quando_a_pasta_muda(pasta):
+    # Data antiga: a remoção logo em seguida não pode cair no mesmo tique do relógio
+    os.utime(pasta, (0, 0))
+    antes = versao_pasta(str(pasta))
+    os.remove(pasta / "abertura.mp3")
+    assert versao_pasta(str(pasta)) != antes
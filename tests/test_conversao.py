@@ -0,0 +1,65 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+from pptx import Presentation
+
+from utils.conversao import AndamentoLote, converter_lote, nomes_unicos, zip_docx
+
+
+def apresentacao(*textos):
+    prs = Presentation()
+    for texto in textos:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = "Título"
+        slide.placeholders[1].text = texto
+    dados = io.BytesIO()
+    prs.save(dados)
+    return dados.getvalue()
+
+
+def texto_docx(dados):
+    return "\n".join(paragrafo.text for paragrafo in Document(io.BytesIO(dados)).paragraphs)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_nomes_repetidos_nao_se_sobrescrevem(workers):
+    arquivos = [("aula.pptx", apresentacao("Primeira aula.")),
+                ("aula.pptx", apresentacao("Segunda aula.", "Outro slide.")),
+                ("extra.pptx", apresentacao("Terceira."))]
+    andamento = {}
+
+    def ao_progredir(indice, nome, slide, total):
+        andamento[indice] = (nome, slide, total)
+
+    resultados = converter_lote(arquivos, 100, workers=workers, ao_progredir=ao_progredir)
+
+    assert [nome for nome, _ in resultados] == ["aula.pptx", "aula.pptx", "extra.pptx"]
+    assert "Primeira aula." in texto_docx(resultados[0][1])
+    assert "Segunda aula." in texto_docx(resultados[1][1])
+    assert "Terceira." in texto_docx(resultados[2][1])
+    assert andamento == {0: ("aula.pptx", 1, 1), 1: ("aula.pptx", 2, 2), 2: ("extra.pptx", 1, 1)}
+
+    with zipfile.ZipFile(zip_docx(resultados)) as zipf:
+        assert zipf.namelist() == ["aula.docx", "aula (2).docx", "extra.docx"]
+
+
+def test_nomes_unicos():
+    assert nomes_unicos(["a.docx", "A.docx", "a.docx", "b.docx"]) == ["a.docx", "A (2).docx", "a (3).docx", "b.docx"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_andamento_do_lote_chega_a_um(workers):
+    arquivos = [("a.pptx", apresentacao("Um.", "Dois.", "Três.")), ("b.pptx", apresentacao("Único."))]
+    andamento = AndamentoLote(len(arquivos))
+    fracoes = []
+
+    def ao_progredir(indice, nome, slide, total):
+        fracoes.append(andamento.registrar(indice, slide, total))
+
+    converter_lote(arquivos, 100, workers=workers, ao_progredir=ao_progredir)
+
+    assert len(fracoes) == 4
+    assert fracoes == sorted(fracoes)
+    assert fracoes[-1] == pytest.approx(1.0)
@@ -0,0 +1,40 @@
+import io
+
+from docx import Document
+
+from utils.documento_narracao import hash_documento, ler_documento
+from utils.tts import partes_narracao
+
+
+def docx(*paragrafos):
+    doc = Document()
+    for texto in paragrafos:
+        doc.add_paragraph(texto)
+    dados = io.BytesIO()
+    doc.save(dados)
+    return dados.getvalue()
+
+
+def test_partes_por_slide_ate_o_limite():
+    dados = docx("SLIDE: 1", "Introdução", "Primeira frase do slide. Segunda frase do slide.",
+                 "", "SLIDE: 2", "Outra frase.")
+    documento = ler_documento(dados, 40)
+    assert documento["hash"] == hash_documento(dados)
+    assert documento["slides"] == [
+        {"slide": 1, "partes": ["Introdução. Primeira frase do slide.", "Segunda frase do slide."]},
+        {"slide": 2, "partes": ["Outra frase."]},
+    ]
+    assert documento["texto"].splitlines()[:2] == ["SLIDE: 1", "Introdução"]
+
+
+def test_titulo_sem_pontuacao_ganha_pausa_e_pontuacao_existente_fica():
+    documento = ler_documento(docx("SLIDE: 3", "Direitos fundamentais", "Veja os incisos:", "O caput?"), 400)
+    assert documento["slides"] == [{"slide": 3, "partes": ["Direitos fundamentais. Veja os incisos: O caput?"]}]
+
+
+def test_partes_numeradas_com_o_arquivo_de_destino(tmp_path):
+    documento = ler_documento(docx("SLIDE: 7", "Um. Dois.", "SLIDE: 8", "Três."), 6)
+    partes = partes_narracao(documento, str(tmp_path))
+    assert [(parte["slide"], parte["parte"], parte["texto"]) for parte in partes] == [
+        (7, 1, "Um."), (7, 2, "Dois."), (8, 1, "Três.")]
+    assert partes[1]["arquivo"] == str(tmp_path / "7.2_narracao_slide.mp3")
@@ -0,0 +1,58 @@
+import os
+import zipfile
+
+from docx import Document
+
+from utils.documento_questoes import exportar_questoes
+from utils.exportacao import exportar_zip
+from utils.substituicoes import Substituidor
+
+
+def questoes(quantidade):
+    for n in range(1, quantidade + 1):
+        comentario = f"Resolução. **Gabarito Comentado:** Letra A na questão {n}." if n % 2 else "Sem gabarito."
+        yield n, f"Enunciado da questão {n} conforme a CF.", comentario
+
+
+def paragrafos(caminho):
+    return [paragrafo.text for paragrafo in Document(caminho).paragraphs]
+
+
+def test_arquivo_unico_com_slides_e_substituicoes(tmp_path):
+    trocar = Substituidor([{"de": "CF", "para": "Constituição Federal"}])
+    escritas = []
+    caminhos = exportar_questoes(questoes(2), str(tmp_path), trocar, "Direito", ao_progredir=escritas.append)
+    assert caminhos == [str(tmp_path / "questoes.docx")]
+    assert escritas == [1, 2]
+    assert paragrafos(caminhos[0]) == [
+        "SLIDE: 1\nQuestões Comentadas sobre Direito",
+        "SLIDE: 2\n", "Questão 1", "Enunciado da questão 1 conforme a Constituição Federal.",
+        "SLIDE: 3\n", "Letra A na questão 1.",
+        "SLIDE: 4\n", "Questão 2", "Enunciado da questão 2 conforme a Constituição Federal.",
+    ]
+
+
+def test_partes_recomecam_os_slides_e_continuam_a_numeracao(tmp_path):
+    caminhos = exportar_questoes(questoes(5), str(tmp_path), Substituidor([]), questoes_por_arquivo=2)
+    assert [os.path.basename(caminho) for caminho in caminhos] == [
+        "questoes_001.docx", "questoes_002.docx", "questoes_003.docx"]
+    terceira = paragrafos(caminhos[2])
+    assert terceira[:2] == ["SLIDE: 1\n", "Questão 5"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_zip_das_partes_e_reaproveitado(tmp_path):
+    pasta = tmp_path / "partes"
+    exportar_questoes(questoes(3), str(pasta), Substituidor([]), questoes_por_arquivo=1)
+    (pasta / "rascunho.txt").write_text("fora do zip")
+    destino_dir = str(tmp_path / "exportacoes")
+    zip_path = exportar_zip(str(pasta), destino_dir, prefixo="questoes", extensao=".docx")
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert zipf.namelist() == ["questoes_001.docx", "questoes_002.docx", "questoes_003.docx"]
+        assert {info.compress_type for info in zipf.infolist()} == {zipfile.ZIP_STORED}
+    assert exportar_zip(str(pasta), destino_dir, prefixo="questoes", extensao=".docx") == zip_path
+
+    (pasta / "questoes_003.docx").unlink()
+    novo = exportar_zip(str(pasta), destino_dir, prefixo="questoes", extensao=".docx")
+    assert novo != zip_path
+    assert [p.name for p in (tmp_path / "exportacoes").iterdir()] == [os.path.basename(novo)]
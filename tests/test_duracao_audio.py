@@ -0,0 +1,113 @@
+import os
+import shutil
+import subprocess
+
+import imageio_ffmpeg
+import pytest
+
+from utils import duracao_audio
+from utils.duracao_audio import IndiceDuracoes, duracao_mp3, inicio_audio, ler_cabecalho, quadros_declarados
+
+
+def gerar_mp3(caminho, segundos, *argumentos):
+    subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi",
+         "-i", f"sine=frequency=440:sample_rate=44100:duration={segundos}", "-ac", "1", *argumentos, str(caminho)],
+        check=True,
+    )
+    return str(caminho)
+
+
+def ler(caminho):
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+
+def test_cabecalho_de_quadro():
+    # MPEG-1 Layer III, 128 kbps, 44,1 kHz, estéreo: 417 bytes e 1152 amostras por quadro
+    tamanho, amostras, taxa, mono, versao = ler_cabecalho(bytes([0xFF, 0xFB, 0x90, 0x00]), 0)
+    assert (tamanho, amostras, taxa, mono, versao) == (417, 1152, 44100, False, 1)
+    assert ler_cabecalho(b"\x00\x00\x00\x00", 0) is None
+    assert ler_cabecalho(bytes([0xFF, 0xFB, 0xF0, 0x00]), 0) is None  # bitrate inválido
+
+
+def test_tag_id3_e_pulada():
+    cabecalho = b"ID3\x04\x00\x00" + bytes([0, 0, 1, 0])  # 128 bytes de tag
+    assert inicio_audio(cabecalho + b"\x00" * 128) == 138
+    assert inicio_audio(b"\xff\xfb\x90\x00") == 0
+
+
+@pytest.mark.parametrize("argumentos", [
+    ("-b:a", "64k"),  # CBR com cabeçalho Info e tag LAME (atraso/preenchimento)
+    ("-q:a", "4"),  # VBR com cabeçalho Xing
+    ("-b:a", "64k", "-write_xing", "0"),  # sem cabeçalho: percorre todos os quadros
+])
+def test_duracao_igual_a_do_ffmpeg(tmp_path, argumentos):
+    caminho = gerar_mp3(tmp_path / "parte.mp3", 2.5, *argumentos)
+    # Sem cabeçalho Xing não há como descontar o atraso do codificador: ~1 quadro a mais
+    tolerancia = 0.06 if "-write_xing" in argumentos else 0.002
+    assert duracao_mp3(ler(caminho)) == pytest.approx(2.5, abs=tolerancia)
+
+
+# MPEG-1 Layer III, 128 kbps, 44,1 kHz, mono: 417 bytes por quadro, informação lateral de 17 bytes
+CABECALHO_MONO = bytes([0xFF, 0xFB, 0x90, 0xC0])
+
+
+def quadro_com(deslocamento, conteudo):
+    quadro = bytearray(CABECALHO_MONO + bytes(413))
+    quadro[deslocamento:deslocamento + len(conteudo)] = conteudo
+    return bytes(quadro)
+
+
+def test_cabecalho_xing_com_tag_lame():
+    # Quadros, bytes, TOC e qualidade presentes: a tag LAME vem 120 bytes depois de "Xing"
+    xing = b"Xing" + (0x0F).to_bytes(4, "big") + (100).to_bytes(4, "big") + bytes(4 + 100 + 4)
+    lame = b"LAME3.100" + bytes(12) + ((576 << 12) | 1000).to_bytes(3, "big")
+    dados = quadro_com(4 + 17, xing + lame) + CABECALHO_MONO + bytes(413)
+    assert quadros_declarados(dados, 0, True, 1) == (100, 1576)
+    assert duracao_mp3(dados) == pytest.approx((100 * 1152 - 1576) / 44100)
+
+
+def test_cabecalho_info_sem_contagem_de_quadros_percorre_os_quadros():
+    dados = quadro_com(4 + 17, b"Info" + bytes(4)) + CABECALHO_MONO + bytes(413)
+    assert quadros_declarados(dados, 0, True, 1) is None
+    assert duracao_mp3(dados) == pytest.approx(2 * 1152 / 44100)
+
+
+def test_cabecalho_vbri():
+    dados = quadro_com(36, b"VBRI" + bytes(10) + (250).to_bytes(4, "big")) + CABECALHO_MONO + bytes(413)
+    assert duracao_mp3(dados) == pytest.approx(250 * 1152 / 44100)
+
+
+def test_dados_que_nao_sao_mp3():
+    assert duracao_mp3(b"RIFF" + b"\x00" * 100) is None
+
+
+def test_copia_reaproveita_a_duracao_pelo_conteudo(tmp_path, monkeypatch):
+    original = gerar_mp3(tmp_path / "1.1_narracao_slide.mp3", 1.0, "-b:a", "64k")
+    indice = IndiceDuracoes(str(tmp_path / "indice.json"))
+    assert indice.duracao(original) == pytest.approx(1.0, abs=0.002)
+    indice.salvar()
+
+    copia = str(tmp_path / "trabalho" / "1.1_narracao_slide.mp3")
+    os.makedirs(os.path.dirname(copia))
+    shutil.copyfile(original, copia)
+    monkeypatch.setattr(duracao_audio, "duracao_mp3", lambda dados: pytest.fail("cabeçalho lido de novo"))
+    indice = IndiceDuracoes(str(tmp_path / "indice.json"))
+    assert indice.duracao(copia) == pytest.approx(1.0, abs=0.002)
+
+
+def test_salvar_poda_arquivos_removidos(tmp_path):
+    primeiro = gerar_mp3(tmp_path / "a.mp3", 1.0, "-b:a", "64k")
+    segundo = gerar_mp3(tmp_path / "b.mp3", 2.0, "-b:a", "64k")
+    indice = IndiceDuracoes(str(tmp_path / "indice.json"))
+    indice.duracao(primeiro)
+    indice.duracao(segundo)
+    indice.salvar()
+
+    os.remove(segundo)
+    indice = IndiceDuracoes(str(tmp_path / "indice.json"))
+    indice.salvar()
+    indice = IndiceDuracoes(str(tmp_path / "indice.json"))
+    assert list(indice.arquivos) == [os.path.abspath(primeiro)]
+    assert len(indice.duracoes) == 1
@@ -0,0 +1,62 @@
+import io
+import os
+import time
+
+import pytest
+
+from utils.espacos import CotaExcedida, EspacosTrabalho, salvar_envio, tamanho_envio
+
+
+def test_espacos_das_sessoes_sao_separados(tmp_path):
+    espacos = EspacosTrabalho(str(tmp_path))
+    a = espacos.espaco("sessao_a", "audio")
+    b = espacos.espaco("sessao_b", "audio")
+    assert a != b
+    assert os.path.isdir(a) and os.path.isdir(b)
+    with pytest.raises(ValueError):
+        espacos.caminho("../outra")
+
+
+def test_cota_conta_os_arquivos_da_sessao(tmp_path):
+    espacos = EspacosTrabalho(str(tmp_path), limite_bytes=1000)
+    pasta = espacos.espaco("sessao", "audio", "sub")
+    with open(os.path.join(pasta, "1.1_narracao_slide.mp3"), "wb") as arquivo:
+        arquivo.write(b"x" * 600)
+    assert espacos.uso("sessao") == 600
+    espacos.verificar_cota("sessao", adicionais=400)
+    with pytest.raises(CotaExcedida):
+        espacos.verificar_cota("sessao", adicionais=401)
+    # As outras sessões não são afetadas
+    espacos.verificar_cota("outra", adicionais=1000)
+
+
+def test_coleta_apaga_so_os_espacos_vencidos(tmp_path):
+    espacos = EspacosTrabalho(str(tmp_path), ttl=3600)
+    antiga = espacos.espaco("antiga", "audio")
+    espacos.espaco("recente", "audio")
+    passado = time.time() - 7200
+    os.utime(os.path.join(os.path.dirname(antiga), ".ultimo_uso"), (passado, passado))
+    chamadas = []
+    espacos.registrar_coleta(lambda: chamadas.append(1))
+
+    assert espacos.coletar() == 1
+    assert sorted(os.listdir(tmp_path)) == ["recente"]
+    assert chamadas == [1]
+
+
+def test_uso_adia_a_coleta(tmp_path):
+    espacos = EspacosTrabalho(str(tmp_path), ttl=3600)
+    espacos.espaco("sessao")
+    assert espacos.coletar(agora=time.time() + 1800) == 0
+    assert espacos.coletar(agora=time.time() + 7200) == 1
+
+
+def test_envio_gravado_em_blocos(tmp_path):
+    envio = io.BytesIO(b"conteudo enviado")
+    envio.seek(4)
+    assert tamanho_envio(envio) == 16
+    assert envio.tell() == 4
+    destino = salvar_envio(envio, str(tmp_path / "slide.png"))
+    with open(destino, "rb") as arquivo:
+        assert arquivo.read() == b"conteudo enviado"
+    assert os.listdir(tmp_path) == ["slide.png"]
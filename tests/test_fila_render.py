@@ -0,0 +1,28 @@
+import io
+import sys
+import time
+
+from utils.fila_render import ATIVOS, ERRO, FilaRender
+
+
+class Envio(io.BytesIO):
+    def __init__(self, dados, name):
+        super().__init__(dados)
+        self.name = name
+
+
+def aguardar(fila, trabalho_id, limite=10):
+    fim = time.time() + limite
+    while fila.ler(trabalho_id)["status"] in ATIVOS and time.time() < fim:
+        time.sleep(0.05)
+    return fila.ler(trabalho_id)
+
+
+def test_falha_antes_da_renderizacao_marca_erro(tmp_path, monkeypatch):
+    # Importação do renderizador falhando: o trabalho não pode ficar "executando"
+    monkeypatch.setitem(sys.modules, "utils.render", None)
+    fila = FilaRender(str(tmp_path))
+    trabalho_id = fila.enviar("aula", [Envio(b"png", "1.png")], [Envio(b"mp3", "1.1_narracao_slide.mp3")], {})
+    estado = aguardar(fila, trabalho_id)
+    assert estado["status"] == ERRO
+    assert estado["concluido_em"] is not None
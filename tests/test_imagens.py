@@ -0,0 +1,33 @@
+import io
+import os
+
+from PIL import Image
+
+from utils.imagens import aplicar_limite_imagens, normalizar_slide
+
+
+def png(cor):
+    dados = io.BytesIO()
+    Image.new("RGB", (64, 36), cor).save(dados, format="PNG")
+    return dados.getvalue()
+
+
+def test_limite_remove_as_menos_usadas(tmp_path):
+    cache_dir = str(tmp_path)
+    caminhos = [normalizar_slide(png((n * 40, 0, 0)), cache_dir, (64, 36)) for n in range(4)]
+    for n, caminho in enumerate(caminhos):
+        os.utime(caminho, (1000 + n, 1000 + n))
+    # Um acerto renova a imagem mais antiga
+    assert normalizar_slide(png((0, 0, 0)), cache_dir, (64, 36)) == caminhos[0]
+    tamanho = os.path.getsize(caminhos[1])
+
+    removidas = aplicar_limite_imagens(cache_dir, 2 * tamanho, protegidas=[caminhos[1]])
+
+    assert removidas == 2
+    assert [os.path.exists(caminho) for caminho in caminhos] == [True, True, False, False]
+
+
+def test_limite_nao_remove_quando_cabe(tmp_path):
+    caminho = normalizar_slide(png((1, 2, 3)), str(tmp_path), (64, 36))
+    assert aplicar_limite_imagens(str(tmp_path), 10 * 1024 * 1024) == 0
+    assert os.path.exists(caminho)
@@ -0,0 +1,39 @@
+from utils.indice_audios import caminhos_slide, descrever_problemas, indexar_audios, tem_erros, validar_indice
+
+
+def mapa(*nomes):
+    return {nome: f"/audio/{nome}" for nome in nomes}
+
+
+def test_partes_em_ordem_numerica():
+    indice, fora_do_padrao = indexar_audios(mapa("10.10_narracao_slide.mp3", "10.2_narracao_slide.mp3",
+                                                 "10.1_narracao_slide.mp3", "capa.mp3"))
+    assert caminhos_slide(indice, 10) == ["/audio/10.1_narracao_slide.mp3", "/audio/10.2_narracao_slide.mp3",
+                                          "/audio/10.10_narracao_slide.mp3"]
+    assert caminhos_slide(indice, 3) == []
+    assert fora_do_padrao == ["capa.mp3"]
+
+
+def test_audios_orfaos_sao_apenas_aviso():
+    # Só os slides 2 e 3 renderizados, com a pasta de narrações da aula inteira
+    indice, fora_do_padrao = indexar_audios(mapa("1.1_narracao_slide.mp3", "2.1_narracao_slide.mp3",
+                                                 "4.1_narracao_slide.mp3", "capa.mp3"))
+    problemas = validar_indice(indice, 2, 3, fora_do_padrao)
+    assert problemas["orfaos"] == ["capa.mp3", "1.1_narracao_slide.mp3", "4.1_narracao_slide.mp3"]
+    assert problemas["sem_audio"] == [3]
+    assert not tem_erros(problemas)
+    erros, avisos = descrever_problemas(problemas)
+    assert erros == []
+    assert len(avisos) == 2
+
+
+def test_lacunas_e_repetidas_sao_erros():
+    indice, _ = indexar_audios({"1.1_narracao_slide.mp3": "a/1.1_narracao_slide.mp3",
+                                "outra/1.1_narracao_slide.mp3": "outra/1.1_narracao_slide.mp3",
+                                "2.1_narracao_slide.mp3": "2.1", "2.3_narracao_slide.mp3": "2.3"})
+    problemas = validar_indice(indice, 1, 2)
+    assert problemas["repetidas"] == {1: [1]}
+    assert problemas["lacunas"] == {2: [2]}
+    assert tem_erros(problemas)
+    erros, _ = descrever_problemas(problemas)
+    assert erros == ["Slide 2: faltam as partes 2", "Slide 1: partes repetidas 1"]
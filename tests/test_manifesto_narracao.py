@@ -0,0 +1,83 @@
+import pytest
+
+from utils import tts
+from utils.manifesto_narracao import CONCLUIDA, ERRO, PENDENTE, ManifestoNarracao
+from utils.tts import CreditosEsgotados, TTSFalso, gerar_partes
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    monkeypatch.setattr(tts, "espera_backoff", lambda tentativa: 0.0)
+
+
+class CreditosAcabamDepois(TTSFalso):
+    """Atende ``limite`` requisições e depois responde como se os créditos tivessem acabado."""
+
+    def __init__(self, limite):
+        super().__init__(latencia=0, variacao=0)
+        self.limite = limite
+
+    def gerar(self, texto):
+        if self.chamadas >= self.limite:
+            raise CreditosEsgotados("quota_exceeded")
+        return super().gerar(texto)
+
+
+def partes(pasta, textos):
+    return [{"slide": n, "parte": 1, "texto": texto, "arquivo": str(pasta / f"{n}.1_narracao_slide.mp3")}
+            for n, texto in enumerate(textos, start=1)]
+
+
+def test_retoma_de_onde_parou(tmp_path):
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    lote = partes(audio, [f"Slide {n}." for n in range(1, 6)])
+
+    manifesto = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"})
+    pendentes = manifesto.planejar(lote)
+    assert len(pendentes) == 5
+    with pytest.raises(CreditosEsgotados):
+        gerar_partes(pendentes, CreditosAcabamDepois(2), paralelismo=1, manifesto=manifesto)
+
+    # Nova execução (outro processo): só o que faltou é enviado
+    retomado = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"})
+    assert retomado.resumo()[CONCLUIDA] == 2
+    pendentes = retomado.planejar(lote)
+    assert [parte["slide"] for parte in pendentes] == [3, 4, 5]
+    backend = TTSFalso(latencia=0, variacao=0)
+    gerar_partes(pendentes, backend, manifesto=retomado)
+    assert backend.chamadas == 3
+    assert ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"}).resumo() == {CONCLUIDA: 5}
+
+
+def test_texto_alterado_ou_arquivo_apagado_volta_a_ficar_pendente(tmp_path):
+    lote = partes(tmp_path, ["Um.", "Dois.", "Três."])
+    manifesto = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"})
+    gerar_partes(manifesto.planejar(lote), TTSFalso(latencia=0, variacao=0), manifesto=manifesto)
+
+    lote[0]["texto"] = "Um, revisado."
+    (tmp_path / "3.1_narracao_slide.mp3").unlink()
+    pendentes = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"}).planejar(lote)
+    assert [parte["slide"] for parte in pendentes] == [1, 3]
+
+
+def test_outra_voz_refaz_tudo(tmp_path):
+    lote = partes(tmp_path, ["Um.", "Dois."])
+    manifesto = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "a"})
+    gerar_partes(manifesto.planejar(lote), TTSFalso(latencia=0, variacao=0), manifesto=manifesto)
+    assert len(ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "b"}).planejar(lote)) == 2
+
+
+def test_parte_com_erro_fica_registrada_e_e_refeita(tmp_path):
+    class Falha(TTSFalso):
+        def gerar(self, texto):
+            raise tts.ErroTransitorio("rede")
+
+    lote = partes(tmp_path, ["Um."])
+    manifesto = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"})
+    gerar_partes(manifesto.planejar(lote), Falha(latencia=0, variacao=0), manifesto=manifesto)
+    retomado = ManifestoNarracao(tmp_path / "manifestos", "doc", {"voice_id": "falso"})
+    assert retomado.partes["1.1"]["status"] == ERRO
+    assert retomado.partes["1.1"]["erro"] == "rede"
+    assert len(retomado.planejar(lote)) == 1
+    assert retomado.partes["1.1"]["status"] == PENDENTE
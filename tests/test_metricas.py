@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils.metricas import Registro
+
+
+def histograma(registro, nome, **rotulos):
+    for item in registro.instantaneo()["histogramas"]:
+        if item["nome"] == nome and item["rotulos"] == {chave: str(valor) for chave, valor in rotulos.items()}:
+            return item
+    return None
+
+
+def test_decorador_mede_cada_chamada_simultanea():
+    registro = Registro()
+
+    @registro.medir("espera")
+    def esperar(segundos):
+        time.sleep(segundos)
+
+    threads = [threading.Thread(target=esperar, args=(segundos,)) for segundos in (1.0, 0.0)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    item = histograma(registro, "espera_segundos")
+    assert item["total"] == 2
+    assert item["soma"] == pytest.approx(1.0, abs=0.2)
+
+
+def test_decorador_recursivo():
+    registro = Registro()
+
+    @registro.medir("recursiva")
+    def recursiva(n):
+        time.sleep(0.05)
+        if n:
+            recursiva(n - 1)
+
+    recursiva(2)
+    # Chamadas aninhadas: 0,15 + 0,10 + 0,05 segundos
+    assert histograma(registro, "recursiva_segundos")["soma"] == pytest.approx(0.30, abs=0.1)
+
+
+def test_falha_conta_erro_e_propaga():
+    registro = Registro()
+    with pytest.raises(ValueError):
+        with registro.medir("consulta", tabela="x"):
+            raise ValueError("falhou")
+    contadores = registro.instantaneo()["contadores"]
+    assert contadores == [{"nome": "consulta_erros_total", "rotulos": {"tabela": "x"}, "valor": 1}]
+    assert histograma(registro, "consulta_segundos", tabela="x")["total"] == 1
+
+
+def test_mesclar_soma_instantaneos():
+    origem = Registro()
+    origem.observar("x_segundos", 0.3)
+    origem.contar("y_total", 2, tipo="a")
+    destino = Registro()
+    destino.observar("x_segundos", 2.0)
+    destino.mesclar(json.loads(json.dumps(origem.instantaneo())))
+    destino.mesclar(origem.instantaneo())
+    item = histograma(destino, "x_segundos")
+    assert item["total"] == 3
+    assert item["soma"] == pytest.approx(2.6)
+    assert destino.instantaneo()["contadores"][0]["valor"] == 4
+
+
+def test_texto_prometheus_acumula_baldes():
+    registro = Registro(baldes=(0.1, 1))
+    for valor in (0.05, 0.5, 5):
+        registro.observar("latencia_segundos", valor, servico='a"b')
+    linhas = registro.texto_prometheus().splitlines()
+    assert linhas[0] == "# TYPE latencia_segundos histogram"
+    assert 'latencia_segundos_bucket{servico="a\\"b",le="0.1"} 1' in linhas
+    assert 'latencia_segundos_bucket{servico="a\\"b",le="1"} 2' in linhas
+    assert 'latencia_segundos_bucket{servico="a\\"b",le="+Inf"} 3' in linhas
+    assert 'latencia_segundos_count{servico="a\\"b"} 3' in linhas
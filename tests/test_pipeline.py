@@ -0,0 +1,45 @@
+import os
+
+from pipeline import arquivos_aula, registrar_video, video_em_dia
+
+
+def aula_com_video(tmp_path):
+    (tmp_path / "aula.pptx").write_bytes(b"pptx")
+    (tmp_path / "slides").mkdir()
+    (tmp_path / "audio").mkdir()
+    for n in (1, 2):
+        (tmp_path / "slides" / f"Slide{n}.PNG").write_bytes(b"png")
+        (tmp_path / "audio" / f"{n}.1_narracao_slide.mp3").write_bytes(b"mp3")
+    arquivos = arquivos_aula(str(tmp_path))
+    entradas = arquivos["slides"] + sorted(str(caminho) for caminho in (tmp_path / "audio").iterdir())
+    (tmp_path / "aula.mp4").write_bytes(b"mp4")
+    # O MP4 é o mais novo, como logo depois da renderização
+    futuro = os.stat(entradas[-1]).st_mtime + 10
+    os.utime(arquivos["mp4"], (futuro, futuro))
+    registrar_video(arquivos, entradas)
+    return arquivos, entradas
+
+
+def test_video_registrado_esta_em_dia(tmp_path):
+    arquivos, entradas = aula_com_video(tmp_path)
+    assert video_em_dia(arquivos, entradas)
+
+
+def test_entrada_removida_refaz_o_video(tmp_path):
+    arquivos, entradas = aula_com_video(tmp_path)
+    os.remove(entradas[-1])
+    assert not video_em_dia(arquivos, entradas[:-1])
+
+
+def test_entrada_trocada_refaz_o_video(tmp_path):
+    arquivos, entradas = aula_com_video(tmp_path)
+    with open(entradas[0], "wb") as arquivo:
+        arquivo.write(b"outra imagem")
+    os.utime(entradas[0], (0, 0))
+    assert not video_em_dia(arquivos, entradas)
+
+
+def test_video_sem_registro_nao_esta_em_dia(tmp_path):
+    arquivos, entradas = aula_com_video(tmp_path)
+    os.remove(os.path.join(arquivos["interno_dir"], "video.json"))
+    assert not video_em_dia(arquivos, entradas)
@@ -0,0 +1,84 @@
+import imageio_ffmpeg
+import pytest
+from PIL import Image
+
+from utils import cache_segmentos, render
+from utils.segmentos import quadros_segmento
+
+
+def slides(pasta, quantidade, cores=None):
+    caminhos = []
+    for n in range(1, quantidade + 1):
+        caminho = pasta / f"Slide{n}.png"
+        Image.new("RGB", (64, 36), cores[n - 1] if cores else (n * 40, 0, 0)).save(caminho)
+        caminhos.append(str(caminho))
+    return caminhos
+
+
+def test_falha_na_codificacao_libera_o_cache(tmp_path, monkeypatch):
+    def falhar(tarefas, workers, ao_concluir):
+        # O primeiro segmento termina e o segundo falha no meio, deixando o parcial
+        open(tarefas[0]["destino"], "wb").close()
+        ao_concluir(0, tarefas[0]["destino"], 1)
+        open(tarefas[1]["destino"], "wb").close()
+        raise RuntimeError("ffmpeg falhou")
+
+    monkeypatch.setattr(render, "renderizar_segmentos", falhar)
+    cache_dir = tmp_path / "cache"
+    with pytest.raises(RuntimeError):
+        render.renderizar_video(slides(tmp_path, 2), {}, str(tmp_path / "aula.mp4"), str(tmp_path / "trabalho"),
+                                str(cache_dir), resolucao=(64, 36))
+
+    assert not cache_segmentos._em_uso
+    assert not cache_segmentos._sufixos_ativos
+    assert not list((cache_dir / "cache_segmentos").glob("*.parcial.mp4"))
+    assert len(list((cache_dir / "cache_segmentos").glob("*.mp4"))) == 1
+
+
+def test_so_parciais_abandonados_sao_apagados(tmp_path):
+    cache = cache_segmentos.CacheSegmentos(str(tmp_path), limite_bytes=10)
+    abandonado = tmp_path / "abc.deadbeef.parcial.mp4"
+    abandonado.write_bytes(b"x" * 100)
+    ativo = cache_segmentos.CacheSegmentos(str(tmp_path), limite_bytes=10)
+    em_andamento = ativo.caminho_parcial("def")
+    with open(em_andamento, "wb") as arquivo:
+        arquivo.write(b"y" * 5)
+
+    cache.aplicar_limite(remover=False)
+    assert abandonado.exists()
+    cache.aplicar_limite()
+    assert not abandonado.exists()
+    assert (tmp_path / em_andamento).exists()
+
+    ativo.descartar_parciais()
+    cache.descartar_parciais()
+    assert not list(tmp_path.glob("*.parcial.mp4"))
+
+
+def test_slides_iguais_sao_codificados_uma_vez_e_reaproveitados(tmp_path, monkeypatch):
+    codificados = []
+    renderizar_segmentos = render.renderizar_segmentos
+
+    def contar(tarefas, workers, ao_concluir):
+        codificados.append(len(tarefas))
+        return renderizar_segmentos(tarefas, workers, ao_concluir)
+
+    monkeypatch.setattr(render, "renderizar_segmentos", contar)
+    # Slides 1 e 3 com a mesma imagem e a mesma duração (sem narração)
+    caminhos = slides(tmp_path, 3, cores=[(255, 0, 0), (0, 0, 255), (255, 0, 0)])
+    cache_dir = str(tmp_path / "cache")
+
+    def renderizar(nome):
+        saida = str(tmp_path / nome)
+        resumo = render.renderizar_video(caminhos, {}, saida, str(tmp_path / "trabalho"), cache_dir, resolucao=(64, 36))
+        return saida, resumo
+
+    saida, primeiro = renderizar("aula.mp4")
+    assert codificados == [2]
+    assert primeiro["slides_sem_audio"] == [1, 2, 3]
+    # O vídeo tem exatamente a duração da trilha da aula
+    assert imageio_ffmpeg.count_frames_and_secs(saida)[0] == quadros_segmento(primeiro["duracao"])
+
+    _, segundo = renderizar("de_novo.mp4")
+    assert codificados == [2, 0]
+    assert (segundo["cache_hits"], segundo["cache_misses"]) == (3, 0)
@@ -0,0 +1,67 @@
+import pytest
+
+from utils.segmentacao import dividir_sentencas, dividir_texto, empacotar
+
+
+def test_divide_nos_finais_de_sentenca():
+    assert dividir_sentencas("Primeira frase. Segunda? Terceira! Quarta") == [
+        "Primeira frase.", "Segunda?", "Terceira!", "Quarta"]
+
+
+@pytest.mark.parametrize("texto", [
+    "Conforme o art. 5 da Constituição.",
+    "O Sr. Souza e a Dra. Lima assinaram.",
+    "Veja a Obs.: o prazo é de dez dias.",
+    "Segundo J.J. Canotilho, a norma vale.",
+    "Segundo J. Silva, a norma vale.",
+    "Ver o processo nº. 123 do tribunal.",
+    "Conforme a Lei n. 8.112 e a p. 12 do manual.",
+    "Nos termos do art. 5º, c. Em caso de dúvida, consulte.",
+    "O Dr. J. R. Silva assinou.",
+])
+def test_abreviacoes_e_iniciais_nao_terminam_a_sentenca(texto):
+    assert dividir_sentencas(texto) == [texto]
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("O ato é. Depois vem a lei.", ["O ato é.", "Depois vem a lei."]),
+    ("A correta é a letra a. Em seguida, a b.", ["A correta é a letra a.", "Em seguida, a b."]),
+    ("A alternativa correta é a letra c. Em seguida, veja.", ["A alternativa correta é a letra c.", "Em seguida, veja."]),
+    ("Está no inciso V. Depois vem o VI.", ["Está no inciso V.", "Depois vem o VI."]),
+    ("Tome vitamina C. Depois descanse.", ["Tome vitamina C.", "Depois descanse."]),
+])
+def test_palavra_de_uma_letra_termina_a_sentenca(texto, esperado):
+    assert dividir_sentencas(texto) == esperado
+
+
+def test_ponto_seguido_de_minuscula_continua_a_sentenca():
+    assert dividir_sentencas("Vale o decreto. que regulamenta a lei. Fim.") == [
+        "Vale o decreto. que regulamenta a lei.", "Fim."]
+
+
+def test_aspas_e_parenteses_ficam_na_sentenca():
+    assert dividir_sentencas('Ele disse "basta." Depois (saiu.) Fim.') == ['Ele disse "basta."', "Depois (saiu.)", "Fim."]
+
+
+def test_ignora_trechos_sem_conteudo():
+    assert dividir_sentencas("  ... Texto.  ") == ["Texto."]
+
+
+def test_empacotar_agrupa_sem_passar_do_limite():
+    sentencas = ["Um dois três.", "Quatro cinco.", "Seis."]
+    assert empacotar(sentencas, 30) == ["Um dois três. Quatro cinco.", "Seis."]
+
+
+def test_sentenca_longa_e_quebrada_na_virgula():
+    texto = "Primeiro trecho bem longo da frase, segundo trecho também longo até o fim."
+    partes = dividir_texto(texto, 50)
+    assert partes == ["Primeiro trecho bem longo da frase,", "segundo trecho também longo até o fim."]
+
+
+def test_nenhuma_parte_passa_do_limite():
+    texto = " ".join(f"Sentença número {n} com algumas palavras, vírgulas e mais texto." for n in range(50))
+    texto += " " + "palavra" * 30
+    for limite in (20, 80, 400):
+        partes = dividir_texto(texto, limite)
+        assert all(len(parte) <= limite for parte in partes)
+        assert "".join(partes).replace(" ", "") == texto.replace(" ", "")
@@ -0,0 +1,32 @@
+import imageio_ffmpeg
+import pytest
+from PIL import Image
+
+from utils.segmentos import FPS, concatenar_segmentos, quadros_segmento, renderizar_segmento
+
+
+@pytest.fixture
+def slide(tmp_path):
+    caminho = tmp_path / "slide.png"
+    Image.new("RGB", (320, 180), (200, 30, 30)).save(caminho)
+    return str(caminho)
+
+
+def contar_quadros(caminho):
+    return imageio_ffmpeg.count_frames_and_secs(caminho)[0]
+
+
+@pytest.mark.parametrize("duracao", [175 / FPS, 199 / FPS, 250 / FPS, 101 / FPS, 7.29, 0.3])
+def test_segmento_tem_todos_os_quadros(slide, tmp_path, duracao):
+    destino = str(tmp_path / "segmento.mp4")
+    renderizar_segmento(slide, destino, (320, 180), duracao)
+    assert contar_quadros(destino) == quadros_segmento(duracao) == round(duracao * FPS)
+
+
+def test_concatenacao_soma_os_quadros(slide, tmp_path):
+    duracoes = [175 / FPS, 101 / FPS, 168 / FPS]
+    segmentos = []
+    for n, duracao in enumerate(duracoes):
+        segmentos.append(renderizar_segmento(slide, str(tmp_path / f"{n}.mp4"), (320, 180), duracao))
+    saida = concatenar_segmentos(segmentos, str(tmp_path / "aula.mp4"))
+    assert contar_quadros(saida) == 175 + 101 + 168
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from utils.substituicoes import ARQUIVO_PADRAO, Substituidor, carregar_regras
+
+# Os dois caminhos: busca direta (poucas regras) e a expressão regular compilada
+CAMINHOS = [{}, {"limite_busca_direta": 0}]
+
+
+def substituidor(regras, caminho):
+    return Substituidor(regras, **caminho)
+
+
+@pytest.fixture(params=CAMINHOS, ids=["direta", "regex"])
+def caminho(request):
+    return request.param
+
+
+def test_palavra_inteira(caminho):
+    trocar = substituidor([{"de": "CF", "para": "Constituição Federal"}, {"de": "LOA", "para": "lei"}], caminho)
+    assert trocar.aplicar("CF, CFO, LOAS e (CF)") == "Constituição Federal, CFO, LOAS e (Constituição Federal)"
+
+
+def test_trecho_substituido_nao_e_reprocessado(caminho):
+    trocar = substituidor([{"de": "a", "para": "b"}, {"de": "b", "para": "c"}], caminho)
+    assert trocar.aplicar("a b") == "b c"
+
+
+def test_ignorar_maiusculas(caminho):
+    trocar = substituidor([{"de": "art.", "para": "artigo", "ignorar_maiusculas": True}], caminho)
+    assert trocar.aplicar("art. 5, Art. 6, ART. 7 e Dart.") == "artigo 5, artigo 6, artigo 7 e Dart."
+
+
+def test_vale_a_mais_longa_entre_tipos_de_regra(caminho):
+    # A mais curta diferencia maiúsculas e a mais longa não: antes vencia a que vinha primeiro
+    regras = [{"de": "Obs.", "para": "curta"},
+              {"de": "obs.:", "para": "longa", "ignorar_maiusculas": True},
+              {"de": "Di", "para": "errado"},
+              {"de": "di pietro", "para": "Di piêtro", "ignorar_maiusculas": True}]
+    trocar = substituidor(regras, caminho)
+    assert trocar.aplicar("Obs.: Di Pietro. Obs. Di") == "longa Di piêtro. curta errado"
+
+
+def test_regra_mais_longa_que_falha_na_fronteira_cede_a_mais_curta(caminho):
+    trocar = substituidor([{"de": "habeas", "para": "habias"}, {"de": "habeas corpus", "para": "HC"}], caminho)
+    assert trocar.aplicar("habeas corpusx e habeas corpus") == "habias corpusx e HC"
+
+
+def test_empate_vale_a_que_diferencia_maiusculas(caminho):
+    regras = [{"de": "cf", "para": "qualquer", "ignorar_maiusculas": True}, {"de": "CF", "para": "exata"}]
+    trocar = substituidor(regras, caminho)
+    assert trocar.aplicar("CF Cf cf") == "exata qualquer qualquer"
+
+
+def test_regra_repetida_vale_a_ultima(caminho):
+    trocar = substituidor([{"de": "§", "para": "parágrafo"}, {"de": "§", "para": "parágrafo único"}], caminho)
+    assert trocar.aplicar("§1") == "parágrafo único1"
+
+
+def test_sem_palavra_inteira(caminho):
+    trocar = substituidor([{"de": "ção", "para": "ssão", "palavra_inteira": False}], caminho)
+    assert trocar.aplicar("ação e reação") == "assão e reassão"
+
+
+def test_caminhos_dao_o_mesmo_resultado():
+    regras = carregar_regras(ARQUIVO_PADRAO) + [
+        {"de": "Obs.", "para": "curta"}, {"de": "cf", "para": "cf minúsculo", "ignorar_maiusculas": True},
+        {"de": "a", "para": "b", "palavra_inteira": False}, {"de": "LOAS", "para": "assistência"},
+    ]
+    direta = Substituidor(regras)
+    compilada = Substituidor(regras, limite_busca_direta=0)
+    termos = ["CF", "cF", "CFO", "LOA", "LOAS", "Obs.:", "OBS.", "obs", "art.", "Dart.", "n.º", "nº", "§", "J.J.",
+              "habeas", "HABEAS", "corpus", "Hely", "Di Pietro", "casa", "(", ".", " ", "_x", "5"]
+    aleatorio = random.Random(3)
+    for _ in range(500):
+        texto = "".join(aleatorio.choice(termos) + aleatorio.choice(["", " ", ", ", "-"]) for _ in range(12))
+        assert direta.aplicar(texto) == compilada.aplicar(texto), texto
@@ -0,0 +1,59 @@
+import json
+import math
+import wave
+
+import numpy as np
+import pytest
+
+from utils.trilha_audio import CANAIS, TAXA_AMOSTRAGEM, aplicar_fades, gerar_trilha
+
+
+def narracao(caminho, segundos, amplitude=0.5):
+    """WAV estéreo com um tom de 440 Hz (o ffmpeg decodifica como faria com um MP3)."""
+    t = np.arange(int(segundos * TAXA_AMOSTRAGEM)) / TAXA_AMOSTRAGEM
+    onda = (amplitude * np.sin(2 * np.pi * 440 * t) * 32767).astype("<i2")
+    with wave.open(str(caminho), "wb") as arquivo:
+        arquivo.setnchannels(CANAIS)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(TAXA_AMOSTRAGEM)
+        arquivo.writeframes(np.repeat(onda[:, None], CANAIS, axis=1).tobytes())
+    return str(caminho)
+
+
+def ler_trilha(caminho):
+    with wave.open(caminho, "rb") as arquivo:
+        assert (arquivo.getnchannels(), arquivo.getframerate()) == (CANAIS, TAXA_AMOSTRAGEM)
+        return np.frombuffer(arquivo.readframes(arquivo.getnframes()), dtype="<i2").reshape(-1, CANAIS)
+
+
+def test_fades_lineares_nas_pontas():
+    amostras = aplicar_fades(np.ones((1000, CANAIS), dtype=np.float32), 0.01, taxa=10000)
+    assert amostras[0, 0] == 0.0
+    assert amostras[50, 0] == pytest.approx(0.5)
+    assert amostras[-1, 0] == 0.0
+    assert amostras[-51, 0] == pytest.approx(0.5)
+    assert np.all(amostras[100:900] == 1.0)
+
+
+def test_slides_em_quadros_inteiros_e_narracao_depois_do_atraso(tmp_path):
+    partes = [narracao(tmp_path / "1.1.wav", 0.5), narracao(tmp_path / "1.2.wav", 0.25)]
+    destino = str(tmp_path / "trilha.wav")
+    concluidos = []
+    tabela = gerar_trilha([(1, partes), (2, [])], destino, audio_delay=0.3, extra_duration=0.3, fade_duration=0.01,
+                          additional_silent_time=1, ao_concluir_slide=lambda numero, fim: concluidos.append(numero))
+
+    quadros_1 = math.ceil((0.75 + 1.6) * 24 - 1e-6)
+    quadros_2 = math.ceil(1.6 * 24 - 1e-6)
+    assert [item["slide"] for item in tabela] == concluidos == [1, 2]
+    assert tabela[0]["fim"] == tabela[1]["inicio"] == quadros_1 / 24
+    assert tabela[1]["fim"] == (quadros_1 + quadros_2) / 24
+    with open(tmp_path / "trilha.json", encoding="utf-8") as arquivo:
+        assert json.load(arquivo) == tabela
+
+    amostras = ler_trilha(destino)
+    assert len(amostras) == round(tabela[-1]["fim"] * TAXA_AMOSTRAGEM)
+    atraso = round(0.6 * TAXA_AMOSTRAGEM)
+    fim_narracao = atraso + round(0.75 * TAXA_AMOSTRAGEM)
+    assert not amostras[:atraso].any()
+    assert np.abs(amostras[atraso:fim_narracao]).max() > 0.4 * 32767
+    assert not amostras[fim_narracao:].any()
@@ -0,0 +1,169 @@
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+import requests
+
+from utils import tts
+from utils.cache_tts import CacheTTS
+from utils.tts import CreditosEsgotados, ElevenLabsTTS, LimitadorTaxa, TTSFalso, gerar_partes
+
+
+@pytest.fixture(autouse=True)
+def sem_espera(monkeypatch):
+    # Os reenvios não esperam: os testes medem o motor, não o backoff
+    monkeypatch.setattr(tts, "espera_backoff", lambda tentativa: 0.0)
+
+
+def partes(pasta, quantidade):
+    return [{"slide": n, "parte": 1, "texto": f"Texto do slide {n}.", "arquivo": str(pasta / f"{n}.1_narracao_slide.mp3")}
+            for n in range(1, quantidade + 1)]
+
+
+def test_limitador_libera_rajada_e_depois_segue_a_taxa():
+    limitador = LimitadorTaxa(taxa=4, capacidade=2)
+    inicio = time.monotonic()
+    limitador.aguardar()
+    limitador.aguardar()
+    assert time.monotonic() - inicio < 0.2
+    limitador.aguardar()
+    limitador.aguardar()
+    assert 0.45 <= time.monotonic() - inicio < 2.0
+
+
+def test_limitador_vale_entre_threads():
+    limitador = LimitadorTaxa(taxa=50, capacidade=1)
+    inicio = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limitador.aguardar() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 20 fichas com uma disponível no início: ao menos 19 intervalos de 1/50 s
+    assert time.monotonic() - inicio >= 19 / 50 - 0.02
+
+
+def test_pausa_segura_todas_as_requisicoes():
+    limitador = LimitadorTaxa(taxa=1000)
+    limitador.pausar(0.2)
+    inicio = time.monotonic()
+    limitador.aguardar()
+    assert time.monotonic() - inicio >= 0.19
+
+
+def test_gera_todas_as_partes(tmp_path):
+    backend = TTSFalso(latencia=0, variacao=0)
+    concluidas = gerar_partes(partes(tmp_path, 6), backend, paralelismo=3)
+    assert sorted(parte["slide"] for parte in concluidas) == [1, 2, 3, 4, 5, 6]
+    assert (tmp_path / "4.1_narracao_slide.mp3").read_bytes() == "MP3 falso: Texto do slide 4.".encode("utf-8")
+    assert backend.chamadas == 6
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_reenvia_apos_429_e_falhas_de_rede(tmp_path):
+    class FalhaDuasVezes(TTSFalso):
+        """Cada texto recebe um 429 e depois uma falha de rede antes de ser atendido."""
+
+        def __init__(self):
+            super().__init__(latencia=0, variacao=0)
+            self.tentativas = {}
+
+        def gerar(self, texto):
+            with self._trava:
+                tentativa = self.tentativas[texto] = self.tentativas.get(texto, 0) + 1
+            if tentativa == 1:
+                raise tts.ErroLimiteTaxa("429")
+            if tentativa == 2:
+                raise tts.ErroTransitorio("rede")
+            return super().gerar(texto)
+
+    backend = FalhaDuasVezes()
+    limitador = LimitadorTaxa(taxa=1000)
+    concluidas = gerar_partes(partes(tmp_path, 10), backend, paralelismo=4, limitador=limitador)
+    assert len(concluidas) == 10
+    assert set(backend.tentativas.values()) == {3}
+    assert limitador.pausado_ate > 0
+
+
+def test_parte_que_sempre_falha_nao_interrompe_as_outras(tmp_path):
+    class FalhaNoSlide2(TTSFalso):
+        def gerar(self, texto):
+            if "slide 2" in texto:
+                raise tts.ErroTransitorio("sempre falha")
+            return super().gerar(texto)
+
+    falhas = []
+    concluidas = gerar_partes(partes(tmp_path, 3), FalhaNoSlide2(latencia=0, variacao=0),
+                              ao_falhar=lambda parte, erro: falhas.append(parte["slide"]))
+    assert sorted(parte["slide"] for parte in concluidas) == [1, 3]
+    assert falhas == [2]
+    assert not (tmp_path / "2.1_narracao_slide.mp3").exists()
+
+
+def test_creditos_esgotados_encerram_a_execucao(tmp_path):
+    class SemCreditos(TTSFalso):
+        def gerar(self, texto):
+            raise CreditosEsgotados("quota_exceeded")
+
+    with pytest.raises(CreditosEsgotados):
+        gerar_partes(partes(tmp_path, 3), SemCreditos(latencia=0, variacao=0), paralelismo=1)
+
+
+def test_audio_removido_do_cache_depois_da_consulta_e_narrado_de_novo(tmp_path):
+    backend = TTSFalso(latencia=0, variacao=0)
+    cache = CacheTTS(str(tmp_path / "cache"), limite_bytes=10 ** 6)
+    gerar_partes(partes(tmp_path, 1), backend, cache=cache)
+    (tmp_path / "1.1_narracao_slide.mp3").unlink()
+
+    # Outra sessão aplica o limite entre ``obter`` e ``materializar``
+    obter = cache.obter
+
+    def obter_e_perder(chave, texto=""):
+        caminho = obter(chave, texto)
+        os.remove(caminho)
+        return caminho
+
+    cache.obter = obter_e_perder
+    concluidas = gerar_partes(partes(tmp_path, 1), backend, cache=cache)
+    assert [parte["cache"] for parte in concluidas] == [False]
+    assert backend.chamadas == 2
+    assert (tmp_path / "1.1_narracao_slide.mp3").read_bytes() == "MP3 falso: Texto do slide 1.".encode("utf-8")
+    assert cache.resumo()["hits"] == 0
+
+
+def cliente_elevenlabs(monkeypatch, erro):
+    """Substitui o pacote ``elevenlabs`` por um cliente que levanta ``erro`` a cada chamada."""
+    class APIError(Exception):
+        status = None
+
+    def generate(**kwargs):
+        raise erro
+
+    class RateLimitError(Exception):
+        pass
+
+    modulo = types.SimpleNamespace(generate=generate, Voice=lambda **kwargs: None, VoiceSettings=lambda **kwargs: None,
+                                   RateLimitError=RateLimitError, APIError=APIError)
+    monkeypatch.setitem(sys.modules, "elevenlabs", modulo)
+
+
+def erro_http(status):
+    resposta = requests.Response()
+    resposta.status_code = status
+    return requests.HTTPError(f"{status} Server Error", response=resposta)
+
+
+@pytest.mark.parametrize("status", [500, 502, 503])
+def test_erro_http_5xx_da_elevenlabs_e_reenviado(monkeypatch, status):
+    cliente_elevenlabs(monkeypatch, erro_http(status))
+    with pytest.raises(tts.ErroTransitorio):
+        ElevenLabsTTS("chave", "voz").gerar("Texto.")
+
+
+def test_erro_http_4xx_da_elevenlabs_nao_e_reenviado(monkeypatch):
+    cliente_elevenlabs(monkeypatch, erro_http(400))
+    with pytest.raises(requests.HTTPError):
+        ElevenLabsTTS("chave", "voz").gerar("Texto.")
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from utils import uso_cache
+from utils.uso_cache import UsoCache
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(uso_cache.fcntl is None, reason="trava entre processos exige fcntl")
+
+SEGURAR = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {raiz!r})
+    from utils.uso_cache import UsoCache
+    with UsoCache({cache_dir!r}):
+        print("pronto", flush=True)
+        sys.stdin.readline()
+""")
+
+
+def test_limpeza_espera_outro_processo_sair(tmp_path):
+    codigo = SEGURAR.format(raiz=RAIZ, cache_dir=str(tmp_path))
+    outro = subprocess.Popen([sys.executable, "-c", codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert outro.stdout.readline().strip() == "pronto"
+        with UsoCache(str(tmp_path)) as uso:
+            assert not uso.tentar_exclusivo()
+    finally:
+        outro.communicate("\n", timeout=10)
+    with UsoCache(str(tmp_path)) as uso:
+        assert uso.tentar_exclusivo()
+
+
+def test_trava_vale_entre_threads_do_mesmo_processo(tmp_path):
+    with UsoCache(str(tmp_path)):
+        with UsoCache(str(tmp_path)) as uso:
+            assert not uso.tentar_exclusivo()
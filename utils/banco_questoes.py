@@ -0,0 +1,165 @@
+"""Acesso ao banco de questões (MySQL).
+
+As conexões vêm de um pool por configuração, compartilhado pelas sessões do
+processo: cada consulta reaproveita uma conexão já aberta em vez de refazer o
+handshake TLS com o servidor. A árvore Matéria → Assunto → Tópico é lida numa única
+consulta; a página a guarda em cache e os filtros são montados a partir dela.
+
+A configuração pode ser trocada por variáveis de ambiente (``QUESTOES_DB_HOST``,
+``QUESTOES_DB_PORT``, ``QUESTOES_DB_USER``, ``QUESTOES_DB_PASSWORD``,
+``QUESTOES_DB_NAME`` e ``QUESTOES_DB_POOL``), por exemplo para apontar para um
+MySQL/MariaDB local.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import metricas
+
+# pool_size máximo aceito pelo mysql.connector
+TAMANHO_MAXIMO_POOL = 32
+
+CONSULTA_TAXONOMIA = """
+    SELECT M.Materia, A.Assunto, T.Topico
+    FROM Materias M
+    LEFT JOIN Questoes Q ON Q.MateriaID = M.MateriaID
+    LEFT JOIN Assuntos A ON Q.AssuntoID = A.AssuntoID
+    LEFT JOIN Topicos T ON Q.TopicoID = T.TopicoID
+    GROUP BY M.Materia, A.Assunto, T.Topico
+    ORDER BY M.Materia, A.Assunto, T.Topico
+"""
+
+CONSULTA_QUESTOES = """
+    SELECT Q.QuestaoID, Q.Questao, Q.Comentario
+    FROM Questoes Q
+    JOIN Materias M ON Q.MateriaID = M.MateriaID
+    JOIN Assuntos A ON Q.AssuntoID = A.AssuntoID
+    JOIN Topicos T ON Q.TopicoID = T.TopicoID
+    WHERE (%s = '' OR M.Materia = %s)
+    AND (%s = '' OR A.Assunto = %s)
+    AND (%s = '' OR T.Topico = %s)
+"""
+
+_pools = {}
+_trava = threading.Lock()
+
+
+class ErroBanco(Exception):
+    """Erro de conexão ou de consulta (envolve o ``mysql.connector.Error`` original)."""
+
+
+def config_padrao():
+    """Configuração de conexão, com os valores de produção como padrão."""
+    return {
+        'user': os.environ.get("QUESTOES_DB_USER", "admin"),
+        'password': os.environ.get("QUESTOES_DB_PASSWORD", "Eduardo13*"),
+        'host': os.environ.get("QUESTOES_DB_HOST", "institutoscheffelt.ckrs9teerzcf.sa-east-1.rds.amazonaws.com"),
+        'port': int(os.environ.get("QUESTOES_DB_PORT", "3306")),
+        'database': os.environ.get("QUESTOES_DB_NAME", "questoes"),
+        'raise_on_warnings': True,
+    }
+
+
+def _obter_pool(config):
+    """Pool (e semáforo com o mesmo tamanho) da configuração, criado no primeiro uso."""
+    # O mysql.connector só é carregado na primeira consulta, não ao abrir a página
+    from mysql.connector import pooling
+
+    chave = tuple(sorted((k, str(v)) for k, v in config.items()))
+    with _trava:
+        if chave not in _pools:
+            tamanho = min(int(os.environ.get("QUESTOES_DB_POOL", "4")), TAMANHO_MAXIMO_POOL)
+            nome = "questoes_" + hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()[:16]
+            pool = pooling.MySQLConnectionPool(pool_name=nome, pool_size=tamanho, pool_reset_session=True, **config)
+            # O pool levanta PoolError quando esgotado; o semáforo faz a sessão esperar a vez
+            _pools[chave] = (pool, threading.BoundedSemaphore(tamanho))
+        return _pools[chave]
+
+
+@contextmanager
+def conexao(config):
+    """Conexão emprestada do pool; ``close()`` a devolve ao pool em vez de encerrá-la."""
+    import mysql.connector
+
+    try:
+        pool, vagas = _obter_pool(config)
+        inicio = time.perf_counter()
+        with vagas:
+            # Espera por uma conexão livre (pool esgotado) e o empréstimo em si, separados
+            metricas.observar("mysql_espera_pool_segundos", time.perf_counter() - inicio)
+            with metricas.medir("mysql_conexao"):
+                cnx = pool.get_connection()
+            try:
+                yield cnx
+            finally:
+                cnx.close()
+    except mysql.connector.Error as e:
+        raise ErroBanco(str(e)) from e
+
+
+def carregar_taxonomia(config):
+    """``{matéria: {assunto: [tópicos]}}`` numa única consulta.
+
+    Todas as matérias aparecem; assuntos e tópicos só quando há questões com eles.
+    """
+    with conexao(config) as cnx:
+        cursor = cnx.cursor()
+        try:
+            with metricas.medir("mysql_consulta", consulta="taxonomia"):
+                cursor.execute(CONSULTA_TAXONOMIA)
+                linhas = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    arvore = {}
+    for materia, assunto, topico in linhas:
+        assuntos = arvore.setdefault(str(materia), {})
+        if assunto is None:
+            continue
+        topicos = assuntos.setdefault(str(assunto), [])
+        if topico is not None:
+            topicos.append(str(topico))
+    return arvore
+
+
+def contar_questoes(config, materia, assunto, topico):
+    """Quantidade de questões com os filtros informados ('' = todos)."""
+    with conexao(config) as cnx:
+        cursor = cnx.cursor()
+        try:
+            with metricas.medir("mysql_consulta", consulta="contagem"):
+                cursor.execute(f"SELECT COUNT(*) FROM ({CONSULTA_QUESTOES}) AS filtradas",
+                               (materia, materia, assunto, assunto, topico, topico))
+                return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+
+def iterar_questoes(config, materia, assunto, topico, lote=500):
+    """``(QuestaoID, Questao, Comentario)`` com os filtros informados ('' = todos), em lotes.
+
+    O cursor não é bufferizado: o servidor envia as linhas conforme são lidas e só um
+    lote fica em memória de cada vez. A conexão fica presa ao gerador até o fim.
+    """
+    with conexao(config) as cnx:
+        cursor = cnx.cursor(buffered=False)
+        try:
+            # Tempo até o primeiro lote; a leitura dos demais se mistura à montagem do documento
+            with metricas.medir("mysql_consulta", consulta="questoes"):
+                cursor.execute(CONSULTA_QUESTOES, (materia, materia, assunto, assunto, topico, topico))
+                linhas = cursor.fetchmany(lote)
+            while linhas:
+                metricas.contar("mysql_linhas_total", len(linhas), consulta="questoes")
+                yield from linhas
+                linhas = cursor.fetchmany(lote)
+        finally:
+            # Se o gerador foi interrompido, as linhas restantes precisam ser lidas antes de
+            # devolver a conexão ao pool
+            try:
+                while cursor.fetchmany(lote):
+                    pass
+            except Exception:
+                pass
+            cursor.close()
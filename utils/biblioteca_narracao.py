@@ -0,0 +1,37 @@
+"""Índice da pasta de narrações para a visualização na página de áudios.
+
+Os metadados de cada MP3 (slide, parte, duração, tamanho, data de modificação) vêm
+de uma única varredura da pasta; a duração é lida dos cabeçalhos e guardada no
+``IndiceDuracoes``, então só arquivos novos ou alterados são abertos. Os bytes do
+áudio não são lidos aqui: a página carrega apenas o item que o usuário escolhe ouvir.
+"""
+import os
+
+from utils.duracao_audio import IndiceDuracoes
+from utils.tts import ler_nome_parte
+
+
+def indexar_narracoes(audio_dir, indice_path):
+    """Lista os MP3 de ``audio_dir`` em ordem numérica de slide e parte."""
+    indice = IndiceDuracoes(indice_path)
+    itens = []
+    with os.scandir(audio_dir) as entradas:
+        for entrada in entradas:
+            # Ignora temporários de gravações em andamento
+            if not entrada.is_file() or not entrada.name.lower().endswith(".mp3"):
+                continue
+            info = entrada.stat()
+            slide, parte = ler_nome_parte(entrada.name) or (None, None)
+            try:
+                duracao = indice.duracao(entrada.path)
+            except (RuntimeError, OSError):
+                duracao = None  # Arquivo corrompido ou removido durante a varredura
+            itens.append({"arquivo": entrada.name, "caminho": entrada.path, "slide": slide, "parte": parte,
+                          "duracao": duracao, "tamanho": info.st_size, "mtime": info.st_mtime})
+    indice.salvar()
+    return sorted(itens, key=lambda item: (item["slide"] is None, item["slide"] or 0, item["parte"] or 0, item["arquivo"]))
+
+
+def versao_pasta(audio_dir):
+    """Muda sempre que um arquivo é criado, removido ou substituído na pasta (via rename)."""
+    return os.stat(audio_dir).st_mtime_ns
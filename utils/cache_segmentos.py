@@ -0,0 +1,187 @@
+"""Cache em disco dos segmentos de vídeo, endereçado pelo conteúdo das entradas de cada slide.
+
+A chave de um segmento é o hash da imagem do slide e dos parâmetros de tempo e
+codificação. Os áudios, ``audio_delay`` e ``extra_duration`` só afetam o vídeo pela
+duração do slide (calculada na trilha da aula), que faz parte da chave; o
+``fade_duration`` das narrações só altera a trilha. Se nada disso mudou, o MP4 já
+renderizado é reaproveitado. O cache tem limite de tamanho e remove
+primeiro os segmentos usados há mais tempo (LRU). Segmentos parciais de renderizações
+em andamento contam para o limite; os de renderizações interrompidas são apagados.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Alterar quando os parâmetros de codificação de renderizar_segmento mudarem
+VERSAO_CODIFICACAO = "4"
+PARAMETROS_CHAVE = ("tamanho", "duracao", "transition_duration", "fps")
+
+# Vários trabalhos da fila podem usar o cache ao mesmo tempo no mesmo processo:
+# o índice é mesclado sob trava e segmentos em uso por outro trabalho não são removidos.
+# Entre processos, a remoção é coordenada por utils.uso_cache.UsoCache.
+_trava = threading.Lock()
+_em_uso = Counter()
+# Sufixos dos parciais de instâncias ainda renderizando neste processo
+_sufixos_ativos = set()
+SUFIXO_PARCIAL = ".parcial.mp4"
+
+
+def hash_arquivo(caminho, bloco=1024 * 1024):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for parte in iter(lambda: arquivo.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+class CacheSegmentos:
+    def __init__(self, diretorio, limite_bytes):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.indice_path = os.path.join(diretorio, "indice.json")
+        self.hits = 0
+        self.misses = 0
+        self.usadas = set()
+        # Diferencia os arquivos parciais de trabalhos que renderizam o mesmo segmento
+        self.sufixo = uuid.uuid4().hex[:8]
+        with _trava:
+            _sufixos_ativos.add(self.sufixo)
+        os.makedirs(diretorio, exist_ok=True)
+        self.indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        try:
+            with open(self.indice_path, encoding="utf-8") as arquivo:
+                indice = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            return {}
+        # Descarta entradas cujo arquivo foi apagado fora do cache
+        return {chave: item for chave, item in indice.items() if os.path.exists(self.caminho(chave))}
+
+    def _usar(self, chave):
+        if chave not in self.usadas:
+            self.usadas.add(chave)
+            with _trava:
+                _em_uso[chave] += 1
+
+    def liberar(self):
+        """Marca os segmentos usados por esta instância como livres para remoção."""
+        with _trava:
+            for chave in self.usadas:
+                _em_uso[chave] -= 1
+                if _em_uso[chave] <= 0:
+                    del _em_uso[chave]
+        self.usadas.clear()
+
+    def _mesclar_indice(self):
+        """Incorpora entradas gravadas por outros trabalhos desde o carregamento."""
+        em_disco = self._carregar_indice()
+        em_disco.update(self.indice)
+        self.indice = em_disco
+
+    def salvar_indice(self):
+        temporario = f"{self.indice_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(self.indice, arquivo)
+        os.replace(temporario, self.indice_path)
+
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.mp4")
+
+    def caminho_parcial(self, chave):
+        """Destino usado durante a renderização, antes de o segmento entrar no cache."""
+        return os.path.join(self.diretorio, f"{chave}.{self.sufixo}{SUFIXO_PARCIAL}")
+
+    def _parciais(self):
+        """``(caminho, sufixo)`` de cada segmento parcial no diretório, de qualquer instância."""
+        parciais = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(SUFIXO_PARCIAL):
+                sufixo = nome[:-len(SUFIXO_PARCIAL)].rpartition(".")[2]
+                parciais.append((os.path.join(self.diretorio, nome), sufixo))
+        return parciais
+
+    def descartar_parciais(self):
+        """Apaga os segmentos parciais desta instância; chamado ao fim da renderização, com ou sem erro."""
+        for caminho, sufixo in self._parciais():
+            if sufixo == self.sufixo:
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+        with _trava:
+            _sufixos_ativos.discard(self.sufixo)
+
+    def chave(self, tarefa):
+        """Hash das entradas de um slide (argumentos de ``renderizar_segmento``)."""
+        h = hashlib.sha256(VERSAO_CODIFICACAO.encode())
+        h.update(hash_arquivo(tarefa["slide_path"]).encode())
+        parametros = {nome: tarefa.get(nome) for nome in PARAMETROS_CHAVE}
+        h.update(json.dumps(parametros, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def obter(self, chave):
+        """Caminho do segmento em cache ou None, contabilizando acerto/falha."""
+        item = self.indice.get(chave)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        item["ultimo_acesso"] = time.time()
+        self._usar(chave)
+        return self.caminho(chave)
+
+    def registrar(self, chave):
+        """Move o segmento recém-renderizado para o cache."""
+        caminho = self.caminho(chave)
+        os.replace(self.caminho_parcial(chave), caminho)
+        self.indice[chave] = {"tamanho": os.path.getsize(caminho), "ultimo_acesso": time.time()}
+        self._usar(chave)
+        return caminho
+
+    def tamanho_total(self):
+        return sum(item["tamanho"] for item in self.indice.values())
+
+    def aplicar_limite(self, protegidas=(), remover=True):
+        """Remove os segmentos menos usados recentemente até respeitar o limite.
+
+        As chaves em ``protegidas`` (ex.: as do vídeo atual) e as que estão em uso por
+        outros trabalhos do processo nunca são removidas; entre processos, quem chama
+        segura a trava exclusiva de ``UsoCache`` ou passa ``remover=False`` (só grava o
+        índice). Com a trava exclusiva nenhum outro processo está renderizando: os
+        parciais que não são deste processo sobraram de uma execução interrompida e são
+        apagados; os demais contam para o limite. Ao final, os segmentos desta instância
+        são liberados.
+        """
+        removidos = 0
+        with _trava:
+            self._mesclar_indice()
+            total = self.tamanho_total()
+            for caminho, sufixo in self._parciais():
+                try:
+                    if remover and sufixo not in _sufixos_ativos:
+                        os.remove(caminho)
+                    else:
+                        total += os.path.getsize(caminho)
+                except FileNotFoundError:
+                    pass
+            for chave, item in sorted(self.indice.items(), key=lambda par: par[1]["ultimo_acesso"]):
+                if not remover or total <= self.limite_bytes:
+                    break
+                if chave in protegidas or chave in _em_uso:
+                    continue
+                try:
+                    os.remove(self.caminho(chave))
+                except FileNotFoundError:
+                    pass
+                total -= item["tamanho"]
+                del self.indice[chave]
+                removidos += 1
+            self.salvar_indice()
+        self.liberar()
+        return removidos
@@ -0,0 +1,151 @@
+"""Cache em disco das narrações, endereçado pelo texto e pela voz.
+
+A chave de um áudio é o hash do texto normalizado (espaços colapsados), do
+``voice_id``, do modelo e das configurações da voz. Assim, a mesma frase narrada
+com a mesma voz é sintetizada uma única vez, em qualquer documento ou posição, e um
+parágrafo editado nunca reaproveita o áudio antigo. Os arquivos ``N.M_narracao_slide.mp3``
+são criados a partir do cache por link (ou cópia, se o sistema não permitir links).
+O cache tem limite de tamanho e remove primeiro os áudios usados há mais tempo (LRU).
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import unicodedata
+
+# Os motores de narração gravam no cache a partir de várias threads
+_trava = threading.Lock()
+
+
+def normalizar_texto(texto):
+    return " ".join(unicodedata.normalize("NFC", texto).split())
+
+
+class CacheTTS:
+    def __init__(self, diretorio, limite_bytes):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.indice_path = os.path.join(diretorio, "indice.json")
+        self.hits = 0
+        self.misses = 0
+        # A ElevenLabs cobra por caractere: cada acerto economiza o tamanho do texto
+        self.caracteres_economizados = 0
+        os.makedirs(diretorio, exist_ok=True)
+        self.indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        try:
+            with open(self.indice_path, encoding="utf-8") as arquivo:
+                indice = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {chave: item for chave, item in indice.items() if os.path.exists(self.caminho(chave))}
+
+    def salvar_indice(self):
+        with _trava:
+            em_disco = self._carregar_indice()
+            em_disco.update(self.indice)
+            self.indice = em_disco
+            temporario = f"{self.indice_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(self.indice, arquivo)
+            os.replace(temporario, self.indice_path)
+
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.mp3")
+
+    @staticmethod
+    def chave(texto, assinatura):
+        """Hash do texto normalizado e da ``assinatura`` da voz (voice_id, modelo, configurações)."""
+        h = hashlib.sha256(normalizar_texto(texto).encode("utf-8"))
+        h.update(json.dumps(assinatura, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def obter(self, chave, texto=""):
+        """Caminho do áudio em cache ou None, contabilizando acerto/falha."""
+        with _trava:
+            item = self.indice.get(chave)
+            if item is None or not os.path.exists(self.caminho(chave)):
+                self.misses += 1
+                return None
+            self.contar_acerto(texto)
+            item["ultimo_acesso"] = time.time()
+        return self.caminho(chave)
+
+    def contar_acerto(self, texto):
+        self.hits += 1
+        self.caracteres_economizados += len(texto)
+
+    def desfazer_acerto(self, texto):
+        """Conta como falha um acerto de ``obter`` cujo áudio sumiu antes de ``materializar``."""
+        with _trava:
+            self.hits -= 1
+            self.misses += 1
+            self.caracteres_economizados -= len(texto)
+
+    def guardar(self, chave, dados):
+        caminho = self.caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+        with _trava:
+            self.indice[chave] = {"tamanho": len(dados), "ultimo_acesso": time.time()}
+        return caminho
+
+    def materializar(self, chave, destino):
+        """Cria ``destino`` a partir do áudio em cache, substituindo o arquivo anterior.
+
+        Devolve None se o áudio saiu do cache depois de ``obter`` (outra sessão aplicando
+        o limite): quem chama trata como uma falha e narra o texto de novo.
+        """
+        origem = self.caminho(chave)
+        temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Se ``destino`` já é um link para o mesmo áudio, o rename não faria nada
+            if os.path.exists(destino) and os.path.samefile(origem, destino):
+                return destino
+            try:
+                os.link(origem, temporario)
+            except OSError:
+                shutil.copyfile(origem, temporario)
+        except FileNotFoundError:
+            with _trava:
+                self.indice.pop(chave, None)
+            return None
+        os.replace(temporario, destino)
+        return destino
+
+    def tamanho_total(self):
+        return sum(item["tamanho"] for item in self.indice.values())
+
+    def aplicar_limite(self, protegidas=()):
+        """Remove os áudios menos usados recentemente até respeitar o limite e salva o índice."""
+        removidos = 0
+        with _trava:
+            total = self.tamanho_total()
+            for chave, item in sorted(self.indice.items(), key=lambda par: par[1]["ultimo_acesso"]):
+                if total <= self.limite_bytes:
+                    break
+                if chave in protegidas:
+                    continue
+                try:
+                    os.remove(self.caminho(chave))
+                except FileNotFoundError:
+                    pass
+                total -= item["tamanho"]
+                del self.indice[chave]
+                removidos += 1
+        self.salvar_indice()
+        return removidos
+
+    def resumo(self):
+        consultas = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / consultas if consultas else 0.0,
+            "caracteres_economizados": self.caracteres_economizados,
+        }
@@ -0,0 +1,190 @@
+"""Conversão de apresentações PPTX em DOCX com marcadores de slide.
+
+O DOCX gerado tem um parágrafo ``SLIDE: N`` por slide, o título (``TITLE: ...``) e o
+texto das caixas já com as substituições de pronúncia e dividido em parágrafos de até
+``limite_caracteres``. Vários arquivos podem ser convertidos em paralelo, um por
+processo, com o andamento informado a cada slide.
+"""
+import io
+import multiprocessing
+import os
+import queue
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from types import SimpleNamespace
+
+from utils import metricas
+from utils.segmentacao import dividir_texto
+from utils.substituicoes import ARQUIVO_PADRAO, carregar_substituidor
+
+
+@metricas.medir("conversao_pptx")
+def pptx_to_word_with_slide_markers(pptx_memory, word_memory, substituidor, limite_caracteres, ao_concluir_slide=None):
+    """Converte ``pptx_memory`` e grava o DOCX em ``word_memory``.
+
+    ``ao_concluir_slide(numero, total)`` é chamado depois de cada slide.
+    """
+    from docx import Document
+    from pptx import Presentation
+
+    prs = Presentation(pptx_memory)
+    doc = Document()
+    total = len(prs.slides)
+
+    for i, slide in enumerate(prs.slides):
+        doc.add_paragraph(f"SLIDE: {i+1}")
+
+        if i > 0:
+            doc.add_paragraph().add_run().add_break()
+
+        title_text = ""
+        if slide.shapes.title:
+            title_text = slide.shapes.title.text
+            if title_text:
+                doc.add_paragraph("TITLE: " + substituidor.aplicar(title_text), style='Heading 1')
+
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text and shape.text != title_text:
+                shape_text = substituidor.aplicar(shape.text)
+                partes_texto = dividir_texto(shape_text, limite_caracteres)
+                for parte in partes_texto:
+                    doc.add_paragraph(parte)
+
+        if ao_concluir_slide:
+            ao_concluir_slide(i + 1, total)
+
+    doc.save(word_memory)
+
+
+def nome_docx(nome_pptx):
+    return f"{os.path.splitext(os.path.basename(nome_pptx))[0]}.docx"
+
+
+def converter_arquivo(nome, dados, limite_caracteres, regras_path=ARQUIVO_PADRAO, fila=None):
+    """Converte um PPTX (em bytes) e devolve ``(nome, bytes do DOCX)``; executado nos processos."""
+    def ao_concluir_slide(numero, total):
+        if fila is not None:
+            fila.put((nome, numero, total))
+
+    word_memory = io.BytesIO()
+    pptx_to_word_with_slide_markers(io.BytesIO(dados), word_memory, carregar_substituidor(regras_path),
+                                    limite_caracteres, ao_concluir_slide)
+    return nome, word_memory.getvalue()
+
+
+class _AvisoIndexado:
+    """Acrescenta a posição do arquivo no lote às mensagens de andamento (nomes podem se repetir)."""
+
+    def __init__(self, indice, fila):
+        self.indice = indice
+        self.fila = fila
+
+    def put(self, mensagem):
+        self.fila.put((self.indice, *mensagem))
+
+
+def _converter_com_metricas(indice, nome, dados, limite_caracteres, regras_path, fila):
+    """``converter_arquivo`` num processo auxiliar, devolvendo também as métricas da conversão."""
+    # Os processos são reaproveitados entre arquivos: cada resultado leva só a sua medição
+    metricas.registro.zerar()
+    _, docx_bytes = converter_arquivo(nome, dados, limite_caracteres, regras_path, _AvisoIndexado(indice, fila))
+    return indice, docx_bytes, metricas.registro.instantaneo()
+
+
+def converter_lote(arquivos, limite_caracteres, workers=None, ao_progredir=None, regras_path=ARQUIVO_PADRAO):
+    """Converte vários PPTX em paralelo e devolve ``[(nome do PPTX, bytes do DOCX)]`` na ordem recebida.
+
+    ``arquivos`` é uma lista de ``(nome, bytes)``; nomes repetidos são convertidos
+    separadamente. ``ao_progredir(indice, nome, slide, total)`` é chamado na thread que
+    chamou esta função a cada slide convertido, em qualquer arquivo (``indice`` é a
+    posição em ``arquivos``). Se algum arquivo falhar, a exceção é propagada depois que
+    os demais terminarem.
+
+    Os processos são iniciados com ``spawn``: um ``fork`` a partir do servidor do
+    Streamlit (com várias threads) copiaria travas que podem estar presas naquele instante.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(arquivos)))
+    nomes = [nome for nome, _ in arquivos]
+    resultados = [None] * len(arquivos)
+
+    def avisar(indice, nome, slide, total):
+        if ao_progredir:
+            ao_progredir(indice, nome, slide, total)
+
+    if workers == 1:
+        # Sem processos: o andamento é repassado diretamente
+        for indice, (nome, dados) in enumerate(arquivos):
+            aviso = _AvisoIndexado(indice, SimpleNamespace(put=lambda mensagem: avisar(*mensagem)))
+            _, docx_bytes = converter_arquivo(nome, dados, limite_caracteres, regras_path, aviso)
+            resultados[indice] = (nome, docx_bytes)
+        return resultados
+
+    def drenar(fila):
+        try:
+            while True:
+                avisar(*fila.get_nowait())
+        except queue.Empty:
+            pass
+
+    erros = []
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Manager() as gerenciador, ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        # O andamento vem dos processos por uma fila compartilhada, lida aqui entre as conclusões
+        fila = gerenciador.Queue()
+        pendentes = {executor.submit(_converter_com_metricas, indice, nome, dados, limite_caracteres, regras_path, fila)
+                     for indice, (nome, dados) in enumerate(arquivos)}
+        while pendentes:
+            concluidos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+            drenar(fila)
+            for futuro in concluidos:
+                try:
+                    indice, docx_bytes, medicoes = futuro.result()
+                    resultados[indice] = (nomes[indice], docx_bytes)
+                    metricas.registro.mesclar(medicoes)
+                except Exception as e:
+                    erros.append(e)
+        drenar(fila)
+    if erros:
+        raise erros[0]
+    return resultados
+
+
+class AndamentoLote:
+    """Fração concluída de um lote de ``converter_lote``, montada com os avisos de cada slide."""
+
+    def __init__(self, quantidade):
+        self.fracoes = [0.0] * quantidade
+
+    def registrar(self, indice, slide, total):
+        """Registra o aviso do arquivo ``indice`` e devolve a fração do lote já convertida."""
+        self.fracoes[indice] = slide / total
+        return sum(self.fracoes) / len(self.fracoes)
+
+
+def nomes_unicos(nomes):
+    """Nomes de arquivo sem repetição: ``aula.docx``, ``aula (2).docx``..."""
+    vistos = set()
+    unicos = []
+    for nome in nomes:
+        base, extensao = os.path.splitext(nome)
+        candidato, n = nome, 1
+        while candidato.lower() in vistos:
+            n += 1
+            candidato = f"{base} ({n}){extensao}"
+        vistos.add(candidato.lower())
+        unicos.append(candidato)
+    return unicos
+
+
+def zip_docx(resultados):
+    """ZIP em memória com um DOCX por apresentação (já comprimidos: armazenados sem recompressão).
+
+    ``resultados`` é a lista devolvida por ``converter_lote``.
+    """
+    zip_memory = io.BytesIO()
+    nomes = nomes_unicos([nome_docx(nome) for nome, _ in resultados])
+    with zipfile.ZipFile(zip_memory, "w", zipfile.ZIP_STORED) as zipf:
+        for nome, (_, docx_bytes) in zip(nomes, resultados):
+            zipf.writestr(nome, docx_bytes)
+    zip_memory.seek(0)
+    return zip_memory
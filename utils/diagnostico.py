@@ -0,0 +1,60 @@
+"""Diagnóstico nas páginas do Streamlit: métricas do servidor e perfil (cProfile) de uma execução."""
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from utils import metricas
+
+
+def rotulo_medicao(item):
+    """``nome{chave=valor}`` de uma linha de ``metricas.Registro.resumo``."""
+    nome = item["nome"].removesuffix("_segundos")
+    rotulos = ", ".join(f"{chave}={valor}" for chave, valor in item["rotulos"].items())
+    return f"{nome} ({rotulos})" if rotulos else nome
+
+
+def barra_diagnostico(pagina):
+    """Métricas na barra lateral; devolve se a próxima ação da página deve ser perfilada."""
+    metricas.iniciar_exportacao()
+    with st.sidebar.expander("Diagnóstico"):
+        perfilar = st.checkbox(
+            "Perfilar a próxima execução (cProfile)", key=f"perfilar_{pagina}",
+            help="Só a thread da página é perfilada: trabalho em outros processos ou threads aparece como espera."
+        )
+        st.caption("Tempos medidos neste servidor (todas as sessões).")
+        resumo = metricas.registro.resumo()
+        if resumo:
+            st.table({
+                "Medição": [rotulo_medicao(item) for item in resumo],
+                "Chamadas": [item["total"] for item in resumo],
+                "Média (s)": [f"{item['media']:.3f}" for item in resumo],
+                "Total (s)": [f"{item['soma']:.1f}" for item in resumo],
+            })
+        else:
+            st.write("Nenhuma medição ainda.")
+        st.download_button("Baixar métricas (Prometheus)", metricas.registro.texto_prometheus(),
+                           file_name="metricas.prom", mime="text/plain", key=f"metricas_{pagina}")
+    return perfilar
+
+
+def exibir_perfil(caminho, texto, chave):
+    """Relatório do cProfile e download do ``.prof`` (abre no snakeviz/pstats)."""
+    with st.expander("Perfil da execução (cProfile)"):
+        st.code(texto)
+        with open(caminho, "rb") as arquivo:
+            st.download_button("Baixar perfil (.prof)", arquivo, file_name=os.path.basename(caminho),
+                               mime="application/octet-stream", key=f"perfil_{chave}")
+
+
+@contextmanager
+def executar_com_perfil(ativo, pasta, nome):
+    """Perfila o bloco quando ``ativo`` e exibe o resultado logo abaixo."""
+    if not ativo:
+        yield
+        return
+    caminho = os.path.join(pasta, f"{nome}_{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    with metricas.perfilar(caminho) as perfil:
+        yield
+    exibir_perfil(perfil.caminho, perfil.texto, nome)
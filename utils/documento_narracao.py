@@ -0,0 +1,47 @@
+"""Representação intermediária do DOCX de narração.
+
+O documento gerado pela conversão PPTX → DOCX tem parágrafos ``SLIDE: N`` seguidos do
+texto de cada slide. Ele é lido uma única vez e reduzido a uma lista de slides com as
+partes de narração em ordem (sentenças agrupadas até o limite de caracteres), mais o
+texto completo para a pré-visualização. A página guarda o resultado em cache pelo
+hash do arquivo enviado, então uma nova interação não volta a interpretar o OOXML.
+"""
+import hashlib
+import io
+
+from utils.segmentacao import dividir_sentencas, empacotar
+
+FINAIS = (".", "!", "?", "…", ":", ";")
+
+
+def hash_documento(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+def ler_documento(dados, limite_caracteres):
+    """``{"hash", "texto", "slides": [{"slide", "partes"}]}`` a partir dos bytes do DOCX."""
+    import docx
+
+    doc = docx.Document(io.BytesIO(dados))
+    linhas = []
+    sentencas_por_slide = {}
+    current_slide = 0
+    for para in doc.paragraphs:
+        linhas.append(para.text)
+        text = para.text.strip()
+        if text.startswith("SLIDE:"):
+            current_slide = int(text.split(': ')[1])
+        elif text:
+            sentencas = dividir_sentencas(text)
+            # Parágrafos sem pontuação final (ex.: títulos) ganham um ponto para manter a
+            # pausa quando são agrupados com o parágrafo seguinte na mesma parte
+            if sentencas and not sentencas[-1].endswith(FINAIS):
+                sentencas[-1] += "."
+            sentencas_por_slide.setdefault(current_slide, []).extend(sentencas)
+
+    return {
+        "hash": hash_documento(dados),
+        "texto": "\n".join(linhas),
+        "slides": [{"slide": slide, "partes": empacotar(sentencas, limite_caracteres)}
+                   for slide, sentencas in sentencas_por_slide.items()],
+    }
@@ -0,0 +1,112 @@
+"""Geração dos DOCX de questões comentadas com marcadores de slide.
+
+As questões chegam de um iterador (o cursor do banco, lido em lotes) e são escritas
+conforme chegam. Um documento do ``python-docx`` fica inteiro em memória até ser
+salvo, então a exportação é dividida em partes de ``questoes_por_arquivo`` questões:
+cada parte é gravada em disco assim que se completa e descartada, e a memória usada
+não depende do total de questões.
+"""
+import gc
+import os
+import threading
+
+
+# Função para extrair a parte do gabarito comentado
+def extrair_gabarito_comentado(comentario):
+    indice = comentario.find("**Gabarito Comentado:**")
+    if indice != -1:
+        return comentario[indice + len("**Gabarito Comentado:**"):].strip()
+    return ""
+
+
+# Função para adicionar conteúdo ao documento
+def adicionar_conteudo_ao_documento(doc, slide_numero, numero_da_questao, titulo, conteudo, substituidor, incluir_titulo=True):
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt
+
+    p = doc.add_paragraph()
+    run = p.add_run(f"SLIDE: {slide_numero}\n")
+    run.bold = True
+    run.font.size = Pt(16)
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    if incluir_titulo:
+        titulo_formatado = substituidor.aplicar(f"{titulo} {numero_da_questao}")
+        doc.add_paragraph(titulo_formatado, style='Heading 1')
+
+    conteudo_formatado = substituidor.aplicar(conteudo)
+    doc.add_paragraph(conteudo_formatado)
+
+
+def _novo_documento(assunto):
+    """Documento vazio com o slide de título do assunto; devolve ``(doc, próximo slide)``."""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt
+
+    doc = Document()
+    slide_numero = 1
+    if assunto:
+        titulo_assunto = f"Questões Comentadas sobre {assunto}"
+        p = doc.add_paragraph()
+        run = p.add_run(f"SLIDE: {slide_numero}\n" + titulo_assunto)
+        run.bold = True
+        run.font.size = Pt(16)
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        slide_numero += 1  # Incrementa o número do slide
+    return doc, slide_numero
+
+
+def _salvar(doc, caminho):
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    doc.save(temporario)
+    os.replace(temporario, caminho)
+
+
+def exportar_questoes(questoes, destino_dir, substituidor, assunto="", questoes_por_arquivo=None,
+                      nome="questoes", ao_progredir=None):
+    """Escreve as questões em um ou mais DOCX em ``destino_dir`` e devolve os caminhos.
+
+    ``questoes`` é um iterável de ``(QuestaoID, Questao, Comentario)``. Cada arquivo
+    recomeça a numeração de slides (é narrado e renderizado sozinho); a numeração das
+    questões continua entre os arquivos. ``ao_progredir(questoes_escritas)`` é chamado
+    a cada questão.
+    """
+    os.makedirs(destino_dir, exist_ok=True)
+    caminhos = []
+    doc, slide_numero = _novo_documento(assunto)
+    no_arquivo = 0
+    numero_da_questao = 1
+
+    def caminho_parte(indice):
+        if questoes_por_arquivo:
+            return os.path.join(destino_dir, f"{nome}_{indice:03d}.docx")
+        return os.path.join(destino_dir, f"{nome}.docx")
+
+    for questaoID, questao, comentario in questoes:
+        if questoes_por_arquivo and no_arquivo == questoes_por_arquivo:
+            caminhos.append(caminho_parte(len(caminhos) + 1))
+            _salvar(doc, caminhos[-1])
+            # O pacote do python-docx tem referências cíclicas: sem a coleta, várias partes
+            # já gravadas ficariam em memória até a próxima coleta completa
+            del doc
+            gc.collect()
+            doc, slide_numero = _novo_documento(assunto)
+            no_arquivo = 0
+
+        adicionar_conteudo_ao_documento(doc, slide_numero, numero_da_questao, "Questão", questao, substituidor)
+        slide_numero += 1
+
+        gabarito_comentado = extrair_gabarito_comentado(comentario)
+        if gabarito_comentado:
+            adicionar_conteudo_ao_documento(doc, slide_numero, numero_da_questao, "", gabarito_comentado, substituidor, incluir_titulo=False)
+            slide_numero += 1
+
+        no_arquivo += 1
+        if ao_progredir:
+            ao_progredir(numero_da_questao)
+        numero_da_questao += 1
+
+    caminhos.append(caminho_parte(len(caminhos) + 1))
+    _salvar(doc, caminhos[-1])
+    return caminhos
@@ -0,0 +1,194 @@
+"""Índice de duração dos áudios de narração lido só dos cabeçalhos MP3, sem decodificar.
+
+A duração vem do cabeçalho Xing/Info ou VBRI quando existe; caso contrário, os
+cabeçalhos de todos os quadros MP3 são percorridos (só 4 bytes por quadro). As
+durações ficam num arquivo JSON indexado pelo hash do conteúdo: a cópia de uma
+narração em outra pasta (ex.: a entrada de cada trabalho da fila de vídeos) reaproveita
+a duração já lida. Um segundo nível, por caminho, tamanho e data de modificação, evita
+abrir de novo um arquivo que não mudou; caminhos que deixaram de existir (e durações
+que nenhum caminho usa mais) são descartados ao salvar.
+"""
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+
+import imageio_ffmpeg
+
+BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+TAXAS = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+VERSOES = {0: 2.5, 2: 2, 3: 1}
+CAMADAS = {1: 3, 2: 2, 3: 1}
+
+
+def ler_cabecalho(dados, pos):
+    """Interpreta o cabeçalho de quadro MP3 em ``pos``; retorna None se não for válido.
+
+    O resultado é ``(tamanho_do_quadro, amostras_por_quadro, taxa, mono, versao)``.
+    """
+    if pos + 4 > len(dados) or dados[pos] != 0xFF or (dados[pos + 1] & 0xE0) != 0xE0:
+        return None
+    versao = VERSOES.get((dados[pos + 1] >> 3) & 0x03)
+    camada = CAMADAS.get((dados[pos + 1] >> 1) & 0x03)
+    indice_bitrate = dados[pos + 2] >> 4
+    indice_taxa = (dados[pos + 2] >> 2) & 0x03
+    if versao is None or camada is None or indice_bitrate in (0, 15) or indice_taxa == 3:
+        return None
+
+    bitrate = BITRATES[(1 if versao == 1 else 2, camada)][indice_bitrate] * 1000
+    taxa = TAXAS[versao][indice_taxa]
+    preenchimento = (dados[pos + 2] >> 1) & 0x01
+    mono = (dados[pos + 3] >> 6) == 3
+
+    if camada == 1:
+        return (12 * bitrate // taxa + preenchimento) * 4, 384, taxa, mono, versao
+    if camada == 3 and versao != 1:
+        return 72 * bitrate // taxa + preenchimento, 576, taxa, mono, versao
+    return 144 * bitrate // taxa + preenchimento, 1152, taxa, mono, versao
+
+
+def inicio_audio(dados):
+    """Posição do primeiro byte após a tag ID3v2 (se houver)."""
+    if dados[:3] == b"ID3" and len(dados) >= 10:
+        tamanho = (dados[6] << 21) | (dados[7] << 14) | (dados[8] << 7) | dados[9]
+        rodape = 10 if dados[5] & 0x10 else 0
+        return 10 + tamanho + rodape
+    return 0
+
+
+def quadros_declarados(dados, pos, mono, versao):
+    """Quadros informados pelo cabeçalho Xing/Info ou VBRI e amostras a descontar.
+
+    Retorna ``(quadros, amostras_descartadas)`` ou None. As amostras descartadas vêm
+    da tag LAME (atraso do codificador + preenchimento final), que o ffmpeg remove
+    ao decodificar.
+    """
+    if versao == 1:
+        deslocamento = 4 + (17 if mono else 32)
+    else:
+        deslocamento = 4 + (9 if mono else 17)
+    xing = pos + deslocamento
+    if dados[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(dados[xing + 4:xing + 8], "big")
+        if not flags & 0x01:
+            return None
+        quadros = int.from_bytes(dados[xing + 8:xing + 12], "big")
+        # Campos opcionais: bytes (4), TOC (100) e qualidade (4)
+        lame = xing + 12 + (4 if flags & 0x02 else 0) + (100 if flags & 0x04 else 0) + (4 if flags & 0x08 else 0)
+        descartadas = 0
+        if dados[lame:lame + 4] in (b"LAME", b"Lavf", b"Lavc"):
+            atraso_preenchimento = int.from_bytes(dados[lame + 21:lame + 24], "big")
+            descartadas = (atraso_preenchimento >> 12) + (atraso_preenchimento & 0xFFF)
+        return quadros, descartadas
+    vbri = pos + 36
+    if dados[vbri:vbri + 4] == b"VBRI":
+        return int.from_bytes(dados[vbri + 14:vbri + 18], "big"), 0
+    return None
+
+
+def duracao_mp3(dados):
+    """Duração em segundos a partir dos cabeçalhos MP3, ou None se não for possível ler."""
+    pos = inicio_audio(dados)
+    # Procura o primeiro quadro válido seguido de outro quadro válido
+    while pos + 4 <= len(dados):
+        cabecalho = ler_cabecalho(dados, pos)
+        if cabecalho and (pos + cabecalho[0] >= len(dados) or ler_cabecalho(dados, pos + cabecalho[0])):
+            break
+        pos += 1
+    else:
+        return None
+
+    tamanho, amostras, taxa, mono, versao = cabecalho
+    declarados = quadros_declarados(dados, pos, mono, versao)
+    if declarados is not None:
+        quadros, descartadas = declarados
+        return max(quadros * amostras - descartadas, 0) / taxa
+
+    total_amostras = 0
+    while cabecalho:
+        total_amostras += cabecalho[1]
+        pos += cabecalho[0]
+        cabecalho = ler_cabecalho(dados, pos)
+    return total_amostras / taxa
+
+
+def duracao_ffmpeg(audio_path):
+    """Alternativa para arquivos que não são MP3: lê a duração informada pelo ffmpeg."""
+    resultado = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", audio_path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    encontrado = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", resultado.stderr.decode("utf-8", errors="replace"))
+    if not encontrado:
+        raise RuntimeError(f"Não foi possível obter a duração de {audio_path}")
+    horas, minutos, segundos = encontrado.groups()
+    return int(horas) * 3600 + int(minutos) * 60 + float(segundos)
+
+
+class IndiceDuracoes:
+    VERSAO = 2
+
+    def __init__(self, indice_path):
+        self.indice_path = indice_path
+        self.alterado = False
+        try:
+            with open(indice_path, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            dados = {}
+        if dados.get("versao") != self.VERSAO:
+            # Formato antigo (por caminho) ou ilegível: recomeça
+            dados = {}
+            self.alterado = True
+        # caminho -> {"tamanho", "mtime", "hash"}; hash -> duração
+        self.arquivos = dados.get("arquivos", {})
+        self.duracoes = dados.get("duracoes", {})
+
+    def duracao(self, audio_path):
+        """Duração do arquivo, consultando o índice antes de ler os cabeçalhos."""
+        info = os.stat(audio_path)
+        chave = os.path.abspath(audio_path)
+        item = self.arquivos.get(chave)
+        if item and item["tamanho"] == info.st_size and item["mtime"] == info.st_mtime_ns and item["hash"] in self.duracoes:
+            return self.duracoes[item["hash"]]
+
+        with open(audio_path, "rb") as arquivo:
+            dados = arquivo.read()
+        conteudo = hashlib.sha256(dados).hexdigest()
+        duracao = self.duracoes.get(conteudo)
+        if duracao is None:
+            duracao = duracao_mp3(dados)
+            if duracao is None:
+                duracao = duracao_ffmpeg(audio_path)
+            self.duracoes[conteudo] = duracao
+        self.arquivos[chave] = {"tamanho": info.st_size, "mtime": info.st_mtime_ns, "hash": conteudo}
+        self.alterado = True
+        return duracao
+
+    def podar(self):
+        """Descarta caminhos que não existem mais e durações sem nenhum caminho."""
+        existentes = {caminho: item for caminho, item in self.arquivos.items() if os.path.exists(caminho)}
+        usados = {item["hash"] for item in existentes.values()}
+        duracoes = {conteudo: duracao for conteudo, duracao in self.duracoes.items() if conteudo in usados}
+        if len(existentes) != len(self.arquivos) or len(duracoes) != len(self.duracoes):
+            self.arquivos, self.duracoes = existentes, duracoes
+            self.alterado = True
+
+    def salvar(self):
+        self.podar()
+        if not self.alterado:
+            return
+        temporario = f"{self.indice_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump({"versao": self.VERSAO, "arquivos": self.arquivos, "duracoes": self.duracoes}, arquivo)
+        os.replace(temporario, self.indice_path)
+        self.alterado = False
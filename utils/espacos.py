@@ -0,0 +1,166 @@
+"""Espaços de trabalho isolados por sessão, com cota e limpeza automática.
+
+Cada sessão do aplicativo recebe uma pasta própria (narrações, manifestos, exportações),
+em vez de todas escreverem nas mesmas pastas relativas ao diretório atual. O último
+uso fica registrado num arquivo marcador; uma thread em segundo plano apaga os
+espaços sem uso há mais de ``ttl`` segundos e executa as coletas registradas por
+outros módulos (ex.: trabalhos de renderização finalizados). Os caches endereçados
+por conteúdo (narrações, segmentos de vídeo) continuam compartilhados.
+
+Configuração por variáveis de ambiente: ``ESPACOS_DIR``, ``ESPACOS_TTL_HORAS`` e
+``ESPACOS_LIMITE_MB`` (cota de cada sessão).
+"""
+import os
+import re
+import shutil
+import threading
+import time
+
+BLOCO = 1024 * 1024
+MARCADOR = ".ultimo_uso"
+# Intervalo entre duas coletas em segundo plano
+INTERVALO_COLETA = 600
+
+
+class CotaExcedida(Exception):
+    pass
+
+
+def verificar_cota(uso, adicionais, limite_bytes):
+    """Levanta ``CotaExcedida`` se ``uso + adicionais`` passa de ``limite_bytes``."""
+    if uso + adicionais > limite_bytes:
+        raise CotaExcedida(
+            f"Espaço da sessão esgotado: {(uso + adicionais) / 1024 / 1024:.0f} MB de "
+            f"{limite_bytes / 1024 / 1024:.0f} MB. Apague arquivos antigos para continuar."
+        )
+
+
+def tamanho_pasta(pasta):
+    """Bytes ocupados pelos arquivos de ``pasta`` (recursivo, sem seguir links)."""
+    total = 0
+    try:
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    total += tamanho_pasta(entrada.path)
+                elif entrada.is_file(follow_symlinks=False):
+                    total += entrada.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def tamanho_envio(arquivo):
+    """Tamanho de um arquivo enviado (``UploadedFile`` ou outro objeto de arquivo)."""
+    tamanho = getattr(arquivo, "size", None)
+    if tamanho is None:
+        posicao = arquivo.tell()
+        tamanho = arquivo.seek(0, os.SEEK_END)
+        arquivo.seek(posicao)
+    return tamanho
+
+
+def salvar_envio(arquivo, destino):
+    """Grava um arquivo enviado em blocos, sem criar outra cópia inteira em memória."""
+    arquivo.seek(0)
+    temporario = f"{destino}.{threading.get_ident()}.tmp"
+    with open(temporario, "wb") as saida:
+        shutil.copyfileobj(arquivo, saida, BLOCO)
+    os.replace(temporario, destino)
+    return destino
+
+
+class EspacosTrabalho:
+    def __init__(self, base_dir, ttl=24 * 3600, limite_bytes=2048 * 1024 * 1024):
+        self.base_dir = base_dir
+        self.ttl = ttl
+        self.limite_bytes = limite_bytes
+        self._coletas = []
+        self._thread = None
+        self._trava = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def caminho(self, sessao):
+        if not re.fullmatch(r"[0-9A-Za-z_-]+", sessao):
+            raise ValueError(f"identificador de sessão inválido: {sessao!r}")
+        return os.path.join(self.base_dir, sessao)
+
+    def espaco(self, sessao, *subpastas):
+        """Pasta da sessão (criada se preciso) e registro do uso, que adia a limpeza."""
+        pasta = self.caminho(sessao)
+        os.makedirs(os.path.join(pasta, *subpastas), exist_ok=True)
+        with open(os.path.join(pasta, MARCADOR), "w"):
+            pass
+        return os.path.join(pasta, *subpastas)
+
+    def uso(self, sessao):
+        return tamanho_pasta(self.caminho(sessao))
+
+    def verificar_cota(self, sessao, adicionais=0):
+        """Levanta ``CotaExcedida`` se a sessão passaria do limite com ``adicionais`` bytes."""
+        verificar_cota(self.uso(sessao), adicionais, self.limite_bytes)
+
+    def limpar(self, sessao):
+        """Apaga o conteúdo da pasta da sessão."""
+        shutil.rmtree(self.caminho(sessao), ignore_errors=True)
+
+    def registrar_coleta(self, funcao):
+        """``funcao()`` passa a ser chamada a cada coleta em segundo plano."""
+        with self._trava:
+            self._coletas.append(funcao)
+
+    def coletar(self, agora=None):
+        """Apaga os espaços sem uso há mais de ``ttl`` e devolve quantos foram removidos."""
+        agora = agora or time.time()
+        removidos = 0
+        for nome in os.listdir(self.base_dir):
+            pasta = os.path.join(self.base_dir, nome)
+            if not os.path.isdir(pasta):
+                continue
+            try:
+                ultimo_uso = os.stat(os.path.join(pasta, MARCADOR)).st_mtime
+            except FileNotFoundError:
+                ultimo_uso = os.stat(pasta).st_mtime
+            if agora - ultimo_uso > self.ttl:
+                shutil.rmtree(pasta, ignore_errors=True)
+                removidos += 1
+        with self._trava:
+            coletas = list(self._coletas)
+        for funcao in coletas:
+            funcao()
+        return removidos
+
+    def iniciar_coleta(self, intervalo=INTERVALO_COLETA):
+        """Inicia (uma vez) a thread que executa ``coletar`` periodicamente."""
+        with self._trava:
+            if self._thread is not None:
+                return
+
+            def laco():
+                while True:
+                    try:
+                        self.coletar()
+                    except Exception:
+                        pass
+                    time.sleep(intervalo)
+
+            self._thread = threading.Thread(target=laco, name="coleta-espacos", daemon=True)
+            self._thread.start()
+
+
+_padrao = None
+_trava_padrao = threading.Lock()
+
+
+def espacos_padrao():
+    """Gerenciador único por processo (compartilhado entre sessões), com a coleta iniciada."""
+    global _padrao
+    with _trava_padrao:
+        if _padrao is None:
+            _padrao = EspacosTrabalho(
+                os.environ.get("ESPACOS_DIR", os.path.join(os.getcwd(), "espacos")),
+                ttl=float(os.environ.get("ESPACOS_TTL_HORAS", "24")) * 3600,
+                limite_bytes=int(os.environ.get("ESPACOS_LIMITE_MB", "2048")) * 1024 * 1024,
+            )
+            _padrao.iniciar_coleta()
+        return _padrao
@@ -0,0 +1,51 @@
+"""Exportação da pasta de narrações para um arquivo ZIP em disco.
+
+Os MP3 já são comprimidos, então entram no ZIP sem compressão (``ZIP_STORED``) e são
+copiados em blocos: a memória usada não depende do tamanho da aula e o tempo fica
+próximo ao da cópia dos arquivos. O nome do ZIP leva uma impressão digital da pasta
+(nomes, tamanhos e datas de modificação); se nada mudou desde a última exportação,
+o arquivo existente é reaproveitado.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import zipfile
+
+BLOCO = 1024 * 1024
+
+
+def impressao_pasta(pasta, extensao=".mp3"):
+    """Hash dos nomes, tamanhos e datas dos arquivos da pasta (sem ler o conteúdo)."""
+    h = hashlib.sha256()
+    with os.scandir(pasta) as entradas:
+        arquivos = sorted((e.name, e.stat()) for e in entradas if e.is_file() and e.name.lower().endswith(extensao))
+    for nome, info in arquivos:
+        h.update(f"{nome}\0{info.st_size}\0{info.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest(), [nome for nome, _ in arquivos]
+
+
+def exportar_zip(pasta, destino_dir, prefixo="narracoes", extensao=".mp3"):
+    """Caminho de um ZIP com os arquivos ``extensao`` de ``pasta``, criando-o só se a pasta mudou."""
+    os.makedirs(destino_dir, exist_ok=True)
+    impressao, nomes = impressao_pasta(pasta, extensao)
+    destino = os.path.join(destino_dir, f"{prefixo}_{impressao[:16]}.zip")
+    if os.path.exists(destino):
+        return destino
+
+    temporario = f"{destino}.{threading.get_ident()}.tmp"
+    with zipfile.ZipFile(temporario, "w", zipfile.ZIP_STORED, allowZip64=True) as zipf:
+        for nome in nomes:
+            caminho = os.path.join(pasta, nome)
+            info = zipfile.ZipInfo.from_file(caminho, nome)
+            info.compress_type = zipfile.ZIP_STORED
+            with open(caminho, "rb") as origem, zipf.open(info, "w") as saida:
+                shutil.copyfileobj(origem, saida, BLOCO)
+    os.replace(temporario, destino)
+
+    # Exportações anteriores da mesma pasta ficaram obsoletas
+    for nome in os.listdir(destino_dir):
+        caminho = os.path.join(destino_dir, nome)
+        if nome.startswith(f"{prefixo}_") and nome.endswith(".zip") and caminho != destino:
+            os.remove(caminho)
+    return destino
@@ -0,0 +1,212 @@
+"""Fila local de renderização de vídeos executada em segundo plano.
+
+Cada trabalho recebe uma pasta própria com as entradas (slides e áudios), o estado em
+``trabalho.json`` e o vídeo gerado. Os trabalhos rodam num conjunto limitado de
+threads, independentes da sessão do Streamlit: recarregar a página ou interagir com
+outros widgets não interrompe a renderização, e trabalhos que estavam na fila ou em
+execução quando o servidor parou são retomados na próxima inicialização.
+
+Cada trabalho pertence a uma sessão, que só vê e apaga os próprios trabalhos e tem uma
+cota de espaço; trabalhos finalizados há mais de ``ttl`` segundos são apagados por
+``coletar``.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from utils import metricas
+from utils.espacos import salvar_envio, tamanho_envio, tamanho_pasta, verificar_cota
+from utils.tempos import Cronometro
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+ATIVOS = (NA_FILA, EXECUTANDO)
+
+# Intervalo mínimo entre gravações do progresso em disco
+INTERVALO_PROGRESSO = 0.5
+
+
+class FilaRender:
+    def __init__(self, base_dir, max_trabalhos=1, max_processos=None, ttl=None, limite_sessao=None):
+        """``max_trabalhos`` vídeos são renderizados ao mesmo tempo e, somados, nunca
+        usam mais que ``max_processos`` processos de codificação. ``limite_sessao`` é a
+        cota, em bytes, dos trabalhos de cada sessão."""
+        self.base_dir = base_dir
+        self.ttl = ttl
+        self.limite_sessao = limite_sessao
+        self.trabalhos_dir = os.path.join(base_dir, "trabalhos")
+        self.max_trabalhos = max_trabalhos
+        self.max_processos = max_processos or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=max_trabalhos, thread_name_prefix="render")
+        os.makedirs(self.trabalhos_dir, exist_ok=True)
+        self._retomar()
+
+    def _dir(self, trabalho_id):
+        return os.path.join(self.trabalhos_dir, trabalho_id)
+
+    def _gravar(self, estado):
+        caminho = os.path.join(self._dir(estado["id"]), "trabalho.json")
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+
+    def ler(self, trabalho_id):
+        try:
+            with open(os.path.join(self._dir(trabalho_id), "trabalho.json"), encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def listar(self, sessao=None):
+        """Trabalhos conhecidos (só os da sessão, se informada), do mais recente para o mais antigo."""
+        trabalhos = [self.ler(nome) for nome in os.listdir(self.trabalhos_dir)]
+        trabalhos = [t for t in trabalhos if t and (sessao is None or t.get("sessao") == sessao)]
+        return sorted(trabalhos, key=lambda t: t["criado_em"], reverse=True)
+
+    def uso(self, sessao):
+        """Bytes ocupados pelos trabalhos da sessão (entradas e vídeos gerados)."""
+        return sum(tamanho_pasta(self._dir(estado["id"])) for estado in self.listar(sessao))
+
+    def enviar(self, nome_video, imagens, audios, parametros, sessao=None, perfilar=False):
+        """Copia as entradas para a pasta do trabalho e o coloca na fila.
+
+        ``imagens`` e ``audios`` são arquivos enviados (objetos de arquivo com ``name``),
+        as imagens na ordem dos slides. ``parametros`` são repassados a ``renderizar_video``.
+        Com ``perfilar``, a renderização é perfilada com cProfile (``perfil`` no estado).
+        Levanta ``CotaExcedida`` se as entradas não cabem na cota da sessão.
+        """
+        if self.limite_sessao and sessao is not None:
+            envio = sum(tamanho_envio(arquivo) for arquivo in list(imagens) + list(audios))
+            verificar_cota(self.uso(sessao), envio, self.limite_sessao)
+
+        trabalho_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        slides_dir = os.path.join(self._dir(trabalho_id), "entrada", "slides")
+        audios_dir = os.path.join(self._dir(trabalho_id), "entrada", "audios")
+        os.makedirs(slides_dir)
+        os.makedirs(audios_dir)
+
+        cronometro = Cronometro()
+        slides = []
+        with cronometro.etapa("persistencia_envio"):
+            # Gravados em blocos, direto do arquivo enviado
+            for n, imagem in enumerate(imagens, start=1):
+                slides.append(salvar_envio(imagem, os.path.join(slides_dir, f"{n:04d}_{os.path.basename(imagem.name)}")))
+            for audio in audios:
+                salvar_envio(audio, os.path.join(audios_dir, os.path.basename(audio.name)))
+
+        parametros = dict(parametros)
+        # Limita os processos de cada trabalho para não sobrecarregar o servidor
+        parametros["workers"] = max(1, min(int(parametros.get("workers", 1)), self.max_processos // self.max_trabalhos))
+        estado = {
+            "id": trabalho_id,
+            "sessao": sessao,
+            "nome": nome_video,
+            "status": NA_FILA,
+            "progresso": 0.0,
+            "mensagem": "Aguardando na fila",
+            "criado_em": time.time(),
+            "iniciado_em": None,
+            "concluido_em": None,
+            "slides": slides,
+            "parametros": parametros,
+            "saida": None,
+            "resumo": None,
+            "tempos": cronometro.etapas,
+            "erro": None,
+            "perfilar": perfilar,
+            "perfil": None,
+        }
+        self._gravar(estado)
+        self._executor.submit(self._executar, trabalho_id)
+        return trabalho_id
+
+    def _retomar(self):
+        """Recoloca na fila os trabalhos interrompidos por uma parada do servidor."""
+        for estado in sorted(self.listar(), key=lambda t: t["criado_em"]):
+            if estado["status"] in ATIVOS:
+                estado.update(status=NA_FILA, progresso=0.0, mensagem="Aguardando na fila (retomado)")
+                self._gravar(estado)
+                self._executor.submit(self._executar, estado["id"])
+
+    def _executar(self, trabalho_id):
+        estado = self.ler(trabalho_id)
+        if estado is None or estado["status"] != NA_FILA:
+            return
+        trabalho_dir = self._dir(trabalho_id)
+        estado.update(status=EXECUTANDO, iniciado_em=time.time(), mensagem="Iniciando")
+        self._gravar(estado)
+        metricas.observar("render_espera_fila_segundos", estado["iniciado_em"] - estado["criado_em"])
+        # Mantém o tempo de gravação do envio, medido antes de o trabalho entrar na fila
+        cronometro = Cronometro({nome: segundos for nome, segundos in estado["tempos"].items() if nome == "persistencia_envio"})
+
+        ultima_gravacao = [0.0]
+
+        def progresso(fracao, mensagem):
+            estado.update(progresso=fracao, mensagem=mensagem)
+            agora = time.time()
+            if agora - ultima_gravacao[0] >= INTERVALO_PROGRESSO:
+                ultima_gravacao[0] = agora
+                self._gravar(estado)
+
+        perfil = None
+        try:
+            # O moviepy (e a busca do ffmpeg) só é carregado quando um vídeo é renderizado.
+            # Dentro do try: uma falha aqui também marca o trabalho com erro, em vez de
+            # deixá-lo "executando" para sempre.
+            from utils.render import renderizar_video
+
+            audios_dir = os.path.join(trabalho_dir, "entrada", "audios")
+            audio_paths = {nome: os.path.join(audios_dir, nome) for nome in sorted(os.listdir(audios_dir))}
+            saida = os.path.join(trabalho_dir, "saida", f"{estado['nome']}.mp4")
+            os.makedirs(os.path.dirname(saida), exist_ok=True)
+            with ExitStack() as pilha:
+                if estado.get("perfilar"):
+                    # Perfila a thread da fila; com vários processos, a codificação aparece como espera
+                    perfil = pilha.enter_context(metricas.perfilar(os.path.join(trabalho_dir, "perfil.prof")))
+                resumo = renderizar_video(
+                    estado["slides"], audio_paths, saida,
+                    trabalho_dir=os.path.join(trabalho_dir, "temp"), cache_dir=self.base_dir,
+                    progresso=progresso, cronometro=cronometro, **estado["parametros"]
+                )
+            estado.update(status=CONCLUIDO, progresso=1.0, mensagem="Vídeo gerado com sucesso", saida=saida, resumo=resumo)
+        except Exception as e:
+            estado.update(status=ERRO, mensagem=f"Erro: {e}", erro=traceback.format_exc())
+        finally:
+            shutil.rmtree(os.path.join(trabalho_dir, "temp"), ignore_errors=True)
+            metricas.contar("render_trabalhos_total", status=estado["status"])
+            if perfil is not None and perfil.caminho:
+                estado["perfil"] = {"caminho": perfil.caminho, "texto": perfil.texto}
+            estado["tempos"] = cronometro.etapas
+            estado["concluido_em"] = time.time()
+            self._gravar(estado)
+
+    def remover(self, trabalho_id):
+        """Apaga a pasta de um trabalho que não está na fila nem em execução."""
+        estado = self.ler(trabalho_id)
+        if estado and estado["status"] in ATIVOS:
+            return False
+        shutil.rmtree(self._dir(trabalho_id), ignore_errors=True)
+        return True
+
+    def limpar_finalizados(self, sessao=None):
+        for estado in self.listar(sessao):
+            self.remover(estado["id"])
+
+    def coletar(self, agora=None):
+        """Apaga os trabalhos finalizados há mais de ``ttl`` segundos."""
+        if not self.ttl:
+            return
+        agora = agora or time.time()
+        for estado in self.listar():
+            finalizado_em = estado.get("concluido_em") or estado["criado_em"]
+            if estado["status"] not in ATIVOS and agora - finalizado_em > self.ttl:
+                self.remover(estado["id"])
@@ -0,0 +1,104 @@
+"""Normalização das imagens dos slides para a resolução final do vídeo.
+
+Cada imagem enviada é convertida uma única vez para a resolução escolhida e guardada
+em cache pelo hash do conteúdo enviado. Assim todos os slides têm o mesmo tamanho e
+o arquivo original não precisa ser decodificado e salvo de novo a cada geração. O
+cache tem limite de tamanho e remove primeiro as imagens usadas há mais tempo (LRU,
+pela data de modificação, renovada a cada acerto).
+"""
+import hashlib
+import io
+import os
+import threading
+
+from PIL import Image
+
+RESOLUCOES = {
+    "1920x1080 (Full HD)": (1920, 1080),
+    "1280x720 (HD)": (1280, 720),
+    "3840x2160 (4K)": (3840, 2160),
+}
+# letterbox: mantém a proporção e completa com barras pretas
+# fit: estica a imagem para ocupar exatamente a resolução escolhida
+MODOS = ("letterbox", "fit")
+
+
+def chave_imagem(dados, resolucao, modo):
+    h = hashlib.sha256(dados)
+    h.update(f"{resolucao[0]}x{resolucao[1]}:{modo}".encode())
+    return h.hexdigest()
+
+
+def normalizar_imagem(imagem, resolucao, modo="letterbox"):
+    """Redimensiona uma imagem PIL para ``resolucao`` conforme o ``modo``."""
+    largura, altura = resolucao
+    imagem = imagem.convert("RGB")
+    if modo == "fit":
+        return imagem.resize((largura, altura), Image.LANCZOS)
+
+    escala = min(largura / imagem.width, altura / imagem.height)
+    tamanho = (max(1, round(imagem.width * escala)), max(1, round(imagem.height * escala)))
+    if tamanho != imagem.size:
+        imagem = imagem.resize(tamanho, Image.LANCZOS)
+    if tamanho == (largura, altura):
+        return imagem
+    fundo = Image.new("RGB", (largura, altura), "black")
+    fundo.paste(imagem, ((largura - tamanho[0]) // 2, (altura - tamanho[1]) // 2))
+    return fundo
+
+
+def normalizar_slide(dados, cache_dir, resolucao=(1920, 1080), modo="letterbox"):
+    """Devolve o caminho do slide normalizado, convertendo só se ainda não estiver em cache."""
+    if modo not in MODOS:
+        raise ValueError(f"Modo de ajuste inválido: {modo}")
+    os.makedirs(cache_dir, exist_ok=True)
+    destino = os.path.join(cache_dir, f"{chave_imagem(dados, resolucao, modo)}.png")
+    if os.path.exists(destino):
+        try:
+            os.utime(destino)
+            return destino
+        except FileNotFoundError:
+            # Removida por aplicar_limite_imagens entre as duas chamadas: converte de novo
+            pass
+
+    with Image.open(io.BytesIO(dados)) as imagem:
+        # Em JPEG, decodifica já reduzido quando a imagem é maior que o destino
+        imagem.draft("RGB", resolucao)
+        normalizada = normalizar_imagem(imagem, resolucao, modo)
+    # Nome temporário único: dois trabalhos podem converter a mesma imagem ao mesmo tempo
+    temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    normalizada.save(temporario, format="PNG", compress_level=1)
+    os.replace(temporario, destino)
+    return destino
+
+
+def aplicar_limite_imagens(cache_dir, limite_bytes, protegidas=()):
+    """Remove as imagens menos usadas recentemente até o cache caber em ``limite_bytes``.
+
+    Os caminhos em ``protegidas`` (ex.: os slides do vídeo atual) nunca são removidos.
+    Devolve quantas imagens foram removidas.
+    """
+    protegidas = {os.path.abspath(caminho) for caminho in protegidas}
+    imagens = []
+    try:
+        with os.scandir(cache_dir) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith(".png") and entrada.is_file():
+                    estado = entrada.stat()
+                    imagens.append((estado.st_mtime, estado.st_size, entrada.path))
+    except FileNotFoundError:
+        return 0
+    total = sum(tamanho for _, tamanho, _ in imagens)
+    removidas = 0
+    for _, tamanho, caminho in sorted(imagens):
+        if total <= limite_bytes:
+            break
+        if os.path.abspath(caminho) in protegidas:
+            continue
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+        removidas += 1
+    return removidas
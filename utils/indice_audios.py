@@ -0,0 +1,88 @@
+"""Índice das narrações de uma aula: slide → partes em ordem numérica.
+
+Os nomes dos áudios (``N.M_narracao_slide.mp3``) são interpretados uma única vez e
+agrupados por slide, com as partes ordenadas pelo número (``10.2`` antes de
+``10.10``), independentemente da ordem de envio. A validação aponta, antes de
+qualquer codificação, partes faltando e partes repetidas (erros), e slides sem
+narração e áudios órfãos (avisos). Um áudio órfão, fora do padrão de nome ou de um
+slide fora do intervalo renderizado, é ignorado: renderizar só parte da aula com
+``slide_inicial`` continua possível com a pasta de narrações completa.
+"""
+import os
+from collections import Counter
+
+from utils.tts import ler_nome_parte
+
+
+class IndiceInvalido(ValueError):
+    def __init__(self, problemas):
+        self.problemas = problemas
+        super().__init__("; ".join(descrever_problemas(problemas)[0]))
+
+
+def indexar_audios(audio_paths):
+    """``({slide: [(parte, nome, caminho)]}, nomes fora do padrão)`` a partir de ``{nome: caminho}``."""
+    indice = {}
+    fora_do_padrao = []
+    for nome, caminho in audio_paths.items():
+        numeros = ler_nome_parte(os.path.basename(nome))
+        if numeros is None:
+            fora_do_padrao.append(nome)
+            continue
+        slide, parte = numeros
+        indice.setdefault(slide, []).append((parte, nome, caminho))
+    for partes in indice.values():
+        partes.sort()
+    return indice, sorted(fora_do_padrao)
+
+
+def caminhos_slide(indice, slide):
+    """Caminhos das partes do slide, em ordem."""
+    return [caminho for _, _, caminho in indice.get(slide, [])]
+
+
+def validar_indice(indice, primeiro, ultimo, fora_do_padrao=()):
+    """Problemas do índice para os slides ``primeiro``..``ultimo``.
+
+    ``sem_audio`` (o slide fica em silêncio, como um slide de título) e ``orfaos`` (os
+    áudios são ignorados) são avisos; ``lacunas`` e ``repetidas`` são erros.
+    """
+    orfaos = list(fora_do_padrao)
+    lacunas = {}
+    repetidas = {}
+    for slide, partes in sorted(indice.items()):
+        if not primeiro <= slide <= ultimo:
+            orfaos.extend(nome for _, nome, _ in partes)
+            continue
+        numeros = [parte for parte, _, _ in partes]
+        faltando = sorted(set(range(1, max(numeros) + 1)) - set(numeros))
+        if faltando:
+            lacunas[slide] = faltando
+        duplicadas = sorted(parte for parte, vezes in Counter(numeros).items() if vezes > 1)
+        if duplicadas:
+            repetidas[slide] = duplicadas
+    return {
+        "sem_audio": [slide for slide in range(primeiro, ultimo + 1) if slide not in indice],
+        "orfaos": orfaos,
+        "lacunas": lacunas,
+        "repetidas": repetidas,
+    }
+
+
+def tem_erros(problemas):
+    return bool(problemas["lacunas"] or problemas["repetidas"])
+
+
+def descrever_problemas(problemas):
+    """Mensagens legíveis para a página e para os logs: ``(erros, avisos)``."""
+    erros = []
+    for slide, partes in problemas["lacunas"].items():
+        erros.append(f"Slide {slide}: faltam as partes {', '.join(map(str, partes))}")
+    for slide, partes in problemas["repetidas"].items():
+        erros.append(f"Slide {slide}: partes repetidas {', '.join(map(str, partes))}")
+    avisos = []
+    if problemas["sem_audio"]:
+        avisos.append(f"Slides sem narração (ficarão em silêncio): {', '.join(map(str, problemas['sem_audio']))}")
+    if problemas["orfaos"]:
+        avisos.append(f"Áudios sem slide correspondente (serão ignorados): {', '.join(problemas['orfaos'])}")
+    return erros, avisos
@@ -0,0 +1,88 @@
+"""Manifesto da geração das narrações de um documento.
+
+Para cada DOCX (identificado pelo hash do arquivo enviado) fica registrado, em JSON,
+cada parte planejada: slide, número da parte, hash do texto, arquivo de saída e
+situação. Uma execução interrompida (créditos esgotados, botão de parar, queda do
+servidor) é retomada a partir do manifesto: partes concluídas cujo texto e voz não
+mudaram e cujo arquivo ainda existe não são consultadas nem reenviadas, mesmo que a
+chave da API tenha sido trocada.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from utils.cache_tts import normalizar_texto
+
+PENDENTE = "pendente"
+CONCLUIDA = "concluida"
+ERRO = "erro"
+
+
+def hash_texto(texto):
+    return hashlib.sha256(normalizar_texto(texto).encode("utf-8")).hexdigest()
+
+
+def identificador_parte(parte):
+    return f"{parte['slide']}.{parte['parte']}"
+
+
+class ManifestoNarracao:
+    def __init__(self, diretorio, documento_hash, assinatura):
+        """``assinatura`` identifica a voz (voice_id, modelo, configurações); se mudar,
+        as partes concluídas com a voz anterior voltam a ficar pendentes."""
+        os.makedirs(diretorio, exist_ok=True)
+        self.caminho = os.path.join(diretorio, f"{documento_hash}.json")
+        self.documento_hash = documento_hash
+        self.assinatura = assinatura
+        self.partes = {}
+        self._trava = threading.Lock()
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+            if dados.get("assinatura") == assinatura:
+                self.partes = dados.get("partes", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def salvar(self):
+        with self._trava:
+            dados = {"documento": self.documento_hash, "assinatura": self.assinatura,
+                     "atualizado_em": time.time(), "partes": self.partes}
+            temporario = f"{self.caminho}.{threading.get_ident()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False, indent=1)
+            os.replace(temporario, self.caminho)
+
+    def planejar(self, partes):
+        """Registra as partes do documento e devolve as que ainda precisam ser geradas."""
+        planejadas = {}
+        pendentes = []
+        for parte in partes:
+            identificador = identificador_parte(parte)
+            anterior = self.partes.get(identificador, {})
+            item = {"slide": parte["slide"], "parte": parte["parte"], "hash_texto": hash_texto(parte["texto"]),
+                    "arquivo": parte["arquivo"], "status": PENDENTE, "erro": None}
+            if (anterior.get("status") == CONCLUIDA and anterior.get("hash_texto") == item["hash_texto"]
+                    and anterior.get("arquivo") == item["arquivo"] and os.path.exists(item["arquivo"])):
+                item["status"] = CONCLUIDA
+            else:
+                pendentes.append(parte)
+            planejadas[identificador] = item
+        self.partes = planejadas
+        self.salvar()
+        return pendentes
+
+    def marcar(self, parte, status, erro=None):
+        """Atualiza a situação de uma parte e grava o manifesto (chamado de várias threads)."""
+        with self._trava:
+            item = self.partes.get(identificador_parte(parte))
+            if item is None:
+                return
+            item.update(status=status, erro=erro)
+        self.salvar()
+
+    def resumo(self):
+        return Counter(item["status"] for item in self.partes.values())
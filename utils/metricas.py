@@ -0,0 +1,266 @@
+"""Métricas de desempenho (contadores e histogramas de latência) e perfil com cProfile.
+
+As funções mais pesadas do aplicativo (conversão do PPTX, consultas ao banco,
+requisições de TTS, codificação do vídeo) são envolvidas por ``medir``, que soma a
+duração num histograma ``<nome>_segundos`` e conta as falhas em ``<nome>_erros_total``.
+O registro é único por processo e seguro entre threads; processos auxiliares
+(conversão em lote, aulas em paralelo) devolvem um ``instantaneo`` que o processo
+principal incorpora com ``mesclar``.
+
+Exportação, configurada por variáveis de ambiente:
+
+- ``METRICAS_ARQUIVO``: o registro é gravado periodicamente nesse arquivo, em formato
+  texto do Prometheus se terminar em ``.prom`` (coletor *textfile* do node_exporter)
+  ou em JSON nos demais casos;
+- ``METRICAS_PORTA``: serve ``/metrics`` no formato do Prometheus nessa porta.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator, contextmanager
+
+# Limites (em segundos) dos baldes dos histogramas: de consultas rápidas a vídeos longos
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Intervalo entre duas gravações do arquivo de métricas
+INTERVALO_EXPORTACAO = 30
+
+
+def _chave(nome, rotulos):
+    return nome, tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos_prometheus(rotulos, **extras):
+    pares = list(rotulos) + sorted(extras.items())
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + "}"
+
+
+class _Medicao(ContextDecorator):
+    def __init__(self, registro, nome, rotulos):
+        self.registro = registro
+        self.nome = nome
+        self.rotulos = rotulos
+
+    def _recreate_cm(self):
+        # Como decorador, cada chamada recebe a sua medição: chamadas simultâneas (threads)
+        # ou recursivas não compartilham o instante de início
+        return _Medicao(self.registro, self.nome, self.rotulos)
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        self.registro.observar(f"{self.nome}_segundos", time.perf_counter() - self._inicio, **self.rotulos)
+        if tipo is not None:
+            self.registro.contar(f"{self.nome}_erros_total", **self.rotulos)
+        return False
+
+
+class Registro:
+    def __init__(self, baldes=BALDES):
+        self.baldes = tuple(baldes)
+        self._contadores = {}
+        # chave -> [contagem por balde (não cumulativa) + acima do último, soma, total]
+        self._histogramas = {}
+        self._trava = threading.Lock()
+
+    def contar(self, nome, valor=1, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._trava:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = _chave(nome, rotulos)
+        posicao = next((n for n, limite in enumerate(self.baldes) if valor <= limite), len(self.baldes))
+        with self._trava:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = [[0] * (len(self.baldes) + 1), 0.0, 0]
+            histograma[0][posicao] += 1
+            histograma[1] += valor
+            histograma[2] += 1
+
+    def medir(self, nome, **rotulos):
+        """Mede o bloco (``with``) ou a função decorada em ``<nome>_segundos``."""
+        return _Medicao(self, nome, rotulos)
+
+    def instantaneo(self):
+        """Cópia serializável em JSON do registro."""
+        with self._trava:
+            return {
+                "baldes": list(self.baldes),
+                "contadores": [{"nome": nome, "rotulos": dict(rotulos), "valor": valor}
+                               for (nome, rotulos), valor in sorted(self._contadores.items())],
+                "histogramas": [{"nome": nome, "rotulos": dict(rotulos), "baldes": list(contagens),
+                                 "soma": soma, "total": total}
+                                for (nome, rotulos), (contagens, soma, total) in sorted(self._histogramas.items())],
+            }
+
+    def mesclar(self, instantaneo):
+        """Soma ao registro um ``instantaneo`` (ex.: vindo de outro processo)."""
+        if list(instantaneo["baldes"]) != list(self.baldes):
+            raise ValueError("instantâneo com baldes diferentes dos do registro")
+        with self._trava:
+            for item in instantaneo["contadores"]:
+                chave = _chave(item["nome"], item["rotulos"])
+                self._contadores[chave] = self._contadores.get(chave, 0) + item["valor"]
+            for item in instantaneo["histogramas"]:
+                chave = _chave(item["nome"], item["rotulos"])
+                histograma = self._histogramas.setdefault(chave, [[0] * (len(self.baldes) + 1), 0.0, 0])
+                histograma[0] = [a + b for a, b in zip(histograma[0], item["baldes"])]
+                histograma[1] += item["soma"]
+                histograma[2] += item["total"]
+
+    def zerar(self):
+        with self._trava:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def resumo(self):
+        """Linhas ``{"nome", "rotulos", "total", "media", "soma"}`` de cada histograma, para exibição."""
+        return [{"nome": item["nome"], "rotulos": item["rotulos"], "total": item["total"],
+                 "soma": item["soma"], "media": item["soma"] / item["total"] if item["total"] else 0.0}
+                for item in self.instantaneo()["histogramas"]]
+
+    def texto_prometheus(self):
+        """Registro no formato de exposição em texto do Prometheus."""
+        dados = self.instantaneo()
+        linhas = []
+        tipos = set()
+        for item in dados["contadores"]:
+            if item["nome"] not in tipos:
+                tipos.add(item["nome"])
+                linhas.append(f"# TYPE {item['nome']} counter")
+            linhas.append(f"{item['nome']}{_rotulos_prometheus(item['rotulos'].items())} {item['valor']}")
+        for item in dados["histogramas"]:
+            nome = item["nome"]
+            if nome not in tipos:
+                tipos.add(nome)
+                linhas.append(f"# TYPE {nome} histogram")
+            rotulos = item["rotulos"].items()
+            acumulado = 0
+            for limite, contagem in zip(dados["baldes"], item["baldes"]):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_rotulos_prometheus(rotulos, le=limite)} {acumulado}")
+            linhas.append(f"{nome}_bucket{_rotulos_prometheus(rotulos, le='+Inf')} {item['total']}")
+            linhas.append(f"{nome}_sum{_rotulos_prometheus(rotulos)} {item['soma']:.6f}")
+            linhas.append(f"{nome}_count{_rotulos_prometheus(rotulos)} {item['total']}")
+        return "\n".join(linhas) + "\n"
+
+    def salvar(self, caminho):
+        """Grava o registro em ``caminho``: texto do Prometheus se terminar em ``.prom``, senão JSON."""
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            if caminho.endswith(".prom"):
+                arquivo.write(self.texto_prometheus())
+            else:
+                json.dump(self.instantaneo(), arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+        return caminho
+
+
+registro = Registro()
+_exportacao_iniciada = False
+_trava_exportacao = threading.Lock()
+
+
+def contar(nome, valor=1, **rotulos):
+    registro.contar(nome, valor, **rotulos)
+
+
+def observar(nome, valor, **rotulos):
+    registro.observar(nome, valor, **rotulos)
+
+
+def medir(nome, **rotulos):
+    """``with medir("consulta", tabela="x"):`` ou ``@medir("conversao_pptx")`` no registro do processo."""
+    return registro.medir(nome, **rotulos)
+
+
+def _servir(porta):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Pedido(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = registro.texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("0.0.0.0", porta), Pedido)
+    threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return servidor
+
+
+def iniciar_exportacao(intervalo=INTERVALO_EXPORTACAO):
+    """Inicia (uma vez por processo) a exportação configurada em ``METRICAS_ARQUIVO``/``METRICAS_PORTA``."""
+    global _exportacao_iniciada
+    with _trava_exportacao:
+        if _exportacao_iniciada:
+            return
+        _exportacao_iniciada = True
+        caminho = os.environ.get("METRICAS_ARQUIVO")
+        porta = os.environ.get("METRICAS_PORTA")
+        if porta:
+            _servir(int(porta))
+        if caminho:
+            def laco():
+                while True:
+                    time.sleep(intervalo)
+                    try:
+                        registro.salvar(caminho)
+                    except OSError:
+                        pass
+
+            threading.Thread(target=laco, name="metricas-arquivo", daemon=True).start()
+
+
+class Perfil:
+    """Resultado de ``perfilar``: o ``.prof`` gravado e o relatório em texto."""
+
+    def __init__(self):
+        self.caminho = None
+        self.texto = ""
+
+
+@contextmanager
+def perfilar(caminho, linhas=40):
+    """Perfila o bloco com cProfile (só a thread atual) e grava o resultado em ``caminho``.
+
+    O ``.prof`` abre no ``snakeviz``/``pstats``; ``Perfil.texto`` traz as ``linhas``
+    funções com maior tempo acumulado.
+    """
+    import cProfile
+    import io
+    import pstats
+
+    perfil = Perfil()
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield perfil
+    finally:
+        perfilador.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        perfilador.dump_stats(caminho)
+        saida = io.StringIO()
+        pstats.Stats(perfilador, stream=saida).sort_stats("cumulative").print_stats(linhas)
+        perfil.caminho = caminho
+        perfil.texto = saida.getvalue()
@@ -0,0 +1,233 @@
+"""Geração do vídeo da aula a partir das imagens dos slides e dos áudios de narração.
+
+Este módulo não depende do Streamlit: é usado tanto pela página de vídeos (através da
+fila de renderização) quanto por execuções sem interface.
+"""
+import os
+from contextlib import ExitStack
+
+import numpy as np
+from moviepy.editor import AudioFileClip, ImageClip, concatenate_videoclips
+from PIL import Image
+from proglog import ProgressBarLogger
+
+from utils import metricas
+from utils.cache_segmentos import CacheSegmentos
+from utils.duracao_audio import IndiceDuracoes
+from utils.imagens import aplicar_limite_imagens, normalizar_slide
+from utils.indice_audios import IndiceInvalido, caminhos_slide, indexar_audios, tem_erros, validar_indice
+from utils.segmentos import renderizar_segmentos, concatenar_segmentos
+from utils.tempos import Cronometro
+from utils.trilha_audio import gerar_trilha
+from utils.uso_cache import UsoCache
+
+AUDIO_DELAY = 0.3
+EXTRA_DURATION = 0.3
+FADE_AUDIO = 0.2  # Fade de cada parte da narração
+FADE_TRANSICAO = 0.1  # Fade de/para preto entre os slides
+SILENCIO_FINAL = 1
+
+
+def pil_to_npimage(pil_image):
+    """Convert PIL Image to numpy array."""
+    return np.array(pil_image)
+
+
+@metricas.medir("moviepy_create_slide")
+def create_slide(slide_path, slide_duration):
+    """Create a silent video slide; the lesson soundtrack is added once to the final video."""
+    with Image.open(slide_path) as imagem:
+        image_np = pil_to_npimage(imagem)
+    return ImageClip(image_np, duration=slide_duration)
+
+
+def create_fade_transition(clip, fade_duration=0.5):
+    """Aplica um fade in e fade out no clipe dado."""
+    return clip.fadein(fade_duration).fadeout(fade_duration)
+
+
+class LoggerProgresso(ProgressBarLogger):
+    """Repassa o andamento do ``write_videofile`` do moviepy (blocos de áudio e quadros de vídeo)."""
+
+    def __init__(self, ao_progredir):
+        super().__init__()
+        self.ao_progredir = ao_progredir
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if attr == "index" and self.bars[bar].get("total"):
+            self.ao_progredir(bar, value, self.bars[bar]["total"])
+
+
+def renderizar_video(slide_paths, audio_paths, output_path, trabalho_dir, cache_dir, slide_inicial=1,
+                     resolucao=(1920, 1080), modo_ajuste="letterbox", usar_segmentos=True,
+                     workers=1, limite_cache_mb=2048, limite_imagens_mb=1024, progresso=None, cronometro=None):
+    """Gera o MP4 da aula e devolve um resumo da execução.
+
+    ``slide_paths`` são as imagens na ordem dos slides (a primeira é o slide
+    ``slide_inicial``) e ``audio_paths`` mapeia o nome de cada áudio
+    (``N.M_narracao_slide.mp3``) para o seu caminho; partes faltando ou repetidas
+    levantam ``IndiceInvalido`` antes de qualquer processamento, e áudios órfãos são
+    ignorados. Arquivos intermediários ficam em ``trabalho_dir`` e os caches
+    compartilhados (imagens, segmentos, durações) em ``cache_dir``, limitados a
+    ``limite_cache_mb`` (segmentos) e ``limite_imagens_mb`` (imagens).
+    ``progresso(fracao, mensagem)`` recebe o andamento.
+
+    O tempo de cada etapa é somado em ``cronometro`` e gravado em
+    ``<saida>_tempos.json``, ao lado do vídeo.
+    """
+    def avisar(fracao, mensagem):
+        if progresso:
+            progresso(min(max(fracao, 0.0), 1.0), mensagem)
+
+    cronometro = cronometro or Cronometro()
+    # Etapas medidas antes desta chamada (ex.: gravação do envio na fila) não vão para as métricas
+    etapas_anteriores = set(cronometro.etapas)
+    resolucao = tuple(resolucao)
+
+    # Slide → partes da narração em ordem numérica, montado e validado numa única passada
+    with cronometro.etapa("indice_audios"):
+        indice, fora_do_padrao = indexar_audios(audio_paths)
+        problemas = validar_indice(indice, slide_inicial, slide_inicial + len(slide_paths) - 1, fora_do_padrao)
+    if tem_erros(problemas):
+        raise IndiceInvalido(problemas)
+
+    os.makedirs(trabalho_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Imagens e segmentos do cache ficam protegidos da limpeza de outros trabalhos e
+    # processos enquanto esta renderização os usa. ``limpeza`` libera as reservas, apaga
+    # os segmentos parciais e fecha a trilha mesmo se a renderização falhar
+    with UsoCache(cache_dir) as uso, ExitStack() as limpeza:
+        # Durações lidas dos cabeçalhos MP3 (sem decodificar), com índice em disco
+        indice_duracoes = IndiceDuracoes(os.path.join(cache_dir, "indice_duracoes.json"))
+        duracao_estimada = 0.0
+
+        tarefas = []
+        for n, caminho in enumerate(slide_paths):
+            i = slide_inicial + n
+            # Converte para a resolução final uma única vez (cache pelo conteúdo enviado)
+            with cronometro.etapa("carregamento_imagens"):
+                with open(caminho, "rb") as arquivo:
+                    slide_path = normalizar_slide(arquivo.read(), os.path.join(cache_dir, "cache_imagens"), resolucao, modo_ajuste)
+
+            slide_audio_paths = caminhos_slide(indice, i)
+            tarefas.append((slide_path, slide_audio_paths))
+            with cronometro.etapa("leitura_duracoes"):
+                duracao_slide = sum(indice_duracoes.duracao(path) for path in slide_audio_paths) + AUDIO_DELAY + EXTRA_DURATION + SILENCIO_FINAL
+            duracao_estimada += duracao_slide
+            avisar((n + 1) / len(slide_paths), f"Preparando slide {i}/{slide_inicial + len(slide_paths) - 1} - {duracao_slide:.1f}s de vídeo")
+        indice_duracoes.salvar()
+
+        # Trilha de áudio da aula inteira: cada narração é decodificada uma única vez
+        trilha_path = os.path.join(trabalho_dir, "trilha.wav")
+
+        def ao_concluir_trilha(numero, fim):
+            avisar(fim / duracao_estimada if duracao_estimada else 1.0, f"Trilha de áudio: slide {numero} ({fim:.0f}s de {duracao_estimada:.0f}s)")
+
+        with cronometro.etapa("trilha_audio"):
+            tabela_tempos = gerar_trilha(
+                [(slide_inicial + n, slide_audio_paths) for n, (_, slide_audio_paths) in enumerate(tarefas)],
+                trilha_path, AUDIO_DELAY, EXTRA_DURATION, fade_duration=FADE_AUDIO,
+                additional_silent_time=SILENCIO_FINAL, ao_concluir_slide=ao_concluir_trilha
+            )
+        duracao_total = tabela_tempos[-1]["fim"] if tabela_tempos else 0.0
+        resumo = {"slides": len(tarefas), "duracao_estimada": duracao_estimada, "duracao": duracao_total,
+                  "modo": "segmentos" if usar_segmentos else "moviepy", "slides_sem_audio": problemas["sem_audio"]}
+
+        if usar_segmentos:
+            # Cada slide vira um segmento MP4 e os segmentos são unidos sem recodificação.
+            # Slides cujas entradas não mudaram são reaproveitados do cache.
+            with cronometro.etapa("montagem"):
+                cache = CacheSegmentos(os.path.join(cache_dir, "cache_segmentos"), int(limite_cache_mb) * 1024 * 1024)
+                limpeza.callback(cache.liberar)
+                limpeza.callback(cache.descartar_parciais)
+                segmentos = [None] * len(tarefas)
+                chaves = []
+                pendentes = []
+                chaves_pendentes = set()
+                for n, (slide_path, _) in enumerate(tarefas):
+                    tarefa = dict(
+                        slide_path=slide_path, tamanho=resolucao,
+                        duracao=tabela_tempos[n]["duracao"], transition_duration=FADE_TRANSICAO
+                    )
+                    chave = cache.chave(tarefa)
+                    chaves.append(chave)
+                    segmentos[n] = cache.obter(chave)
+                    # Slides idênticos compartilham o mesmo segmento
+                    if segmentos[n] is None and chave not in chaves_pendentes:
+                        chaves_pendentes.add(chave)
+                        tarefa["destino"] = cache.caminho_parcial(chave)
+                        pendentes.append((n, tarefa))
+
+            # Andamento medido em segundos de vídeo codificados, não em quantidade de slides
+            segundos_pendentes = sum(tarefa["duracao"] for _, tarefa in pendentes)
+            segundos_codificados = [0.0]
+
+            def ao_concluir(indice, caminho, concluidos):
+                n, tarefa = pendentes[indice]
+                segmentos[n] = cache.registrar(chaves[n])
+                segundos_codificados[0] += tarefa["duracao"]
+                avisar(
+                    segundos_codificados[0] / segundos_pendentes,
+                    f"Codificação: slide {slide_inicial + n} concluído - {concluidos}/{len(pendentes)} "
+                    f"({segundos_codificados[0]:.0f}s de {segundos_pendentes:.0f}s de vídeo)"
+                )
+
+            with cronometro.etapa("codificacao"):
+                renderizar_segmentos([tarefa for _, tarefa in pendentes], int(workers), ao_concluir)
+            segmentos = [segmento or cache.caminho(chave) for segmento, chave in zip(segmentos, chaves)]
+
+            def ao_progredir_mux(segundos):
+                avisar(segundos / duracao_total if duracao_total else 1.0,
+                       f"Multiplexação: {segundos:.0f}s de {duracao_total:.0f}s")
+
+            with cronometro.etapa("multiplexacao"):
+                concatenar_segmentos(segmentos, output_path, trilha_path, ao_progredir_mux)
+            resumo.update(cache_hits=cache.hits, cache_misses=cache.misses)
+        else:
+            with cronometro.etapa("montagem"):
+                final_clips = [
+                    create_fade_transition(create_slide(slide_path, tempos["duracao"]), FADE_TRANSICAO)
+                    for (slide_path, _), tempos in zip(tarefas, tabela_tempos)
+                ]
+                # Todos os slides já têm o mesmo tamanho: dispensa o modo "compose"
+                final_video = concatenate_videoclips(final_clips, method="chain")
+                trilha_clip = limpeza.enter_context(AudioFileClip(trilha_path))
+                final_video = final_video.set_audio(trilha_clip)
+
+            def ao_progredir_moviepy(barra, valor, total):
+                if barra == "t":
+                    avisar(valor / total, f"Codificação: quadro {valor} de {total}")
+                else:
+                    avisar(valor / total, f"Codificação do áudio: bloco {valor} de {total}")
+
+            # No moviepy a codificação do vídeo e a multiplexação acontecem na mesma chamada
+            with cronometro.etapa("codificacao"), metricas.medir("moviepy_write_videofile"):
+                final_video.write_videofile(
+                    output_path, codec='libx264', audio_codec='aac', fps=24,
+                    temp_audiofile=os.path.join(trabalho_dir, "temp_audio.m4a"),
+                    logger=LoggerProgresso(ao_progredir_moviepy)
+                )
+            trilha_clip.close()
+            del final_clips
+            del final_video
+
+        os.remove(trilha_path)
+
+        # Limite dos caches aplicado só se ninguém mais os está usando (senão, na próxima vez)
+        limpar = uso.tentar_exclusivo()
+        if usar_segmentos:
+            cache.aplicar_limite(protegidas=set(chaves), remover=limpar)
+        if limpar:
+            aplicar_limite_imagens(os.path.join(cache_dir, "cache_imagens"), int(limite_imagens_mb) * 1024 * 1024,
+                                   protegidas=[slide_path for slide_path, _ in tarefas])
+
+    for etapa, segundos in cronometro.etapas.items():
+        if etapa not in etapas_anteriores:
+            metricas.observar("render_etapa_segundos", segundos, etapa=etapa, modo=resumo["modo"])
+    if usar_segmentos:
+        metricas.contar("render_segmentos_total", cache.hits, origem="cache")
+        metricas.contar("render_segmentos_total", cache.misses, origem="ffmpeg")
+    resumo["tempos"] = cronometro.relatorio()
+    cronometro.salvar(f"{os.path.splitext(output_path)[0]}_tempos.json", **{k: v for k, v in resumo.items() if k != "tempos"})
+    return resumo
@@ -0,0 +1,126 @@
+"""Divisão do texto da narração em sentenças e em partes de até N caracteres.
+
+Usado pela conversão PPTX → DOCX e pela geração dos áudios. O texto é percorrido uma
+única vez: os finais de sentença são encontrados por expressão regular, descartando
+pontos de abreviações comuns em português (``art.``, ``nº.``, ``Obs.:``, ``Sr.``,
+iniciais como ``J.J.``) e pontos seguidos de letra minúscula. Uma letra sozinha só é
+abreviação em contextos conhecidos (``n. 8.112``, ``art. 5º, c.``, ``Segundo J. Silva``):
+em "a letra c. Em seguida" ou "inciso V. Depois" o ponto termina a sentença. As
+sentenças são então agrupadas em partes que nunca passam do limite; uma sentença maior
+que o limite é quebrada na última vírgula/ponto e vírgula (ou espaço) antes dele.
+"""
+import re
+
+ABREVIACOES = {
+    "art", "arts", "n", "nº", "nos", "núm", "obs", "sr", "sra", "srs", "dr", "dra", "drs", "prof", "profa",
+    "exmo", "exma", "ilmo", "ilma", "inc", "incs", "al", "p", "pp", "pág", "págs", "fl", "fls", "cf",
+    "v", "vol", "cap", "caps", "ed", "séc", "min", "máx", "aprox", "tel", "dec", "res", "ref", "ex",
+    "jr", "ltda", "cia", "av", "c", "s",
+}
+
+# Pontuação final seguida de espaço (aspas e parênteses de fechamento ficam na sentença)
+_FIM_SENTENCA = re.compile(r"[.!?…]+[\"'”»)\]]*(?=\s)")
+_PROXIMO_CARACTERE = re.compile(r"\s+(\S)")
+_INICIAIS = re.compile(r"^(?:\w\.)+\w$")
+_ITEM_NUMERADO = re.compile(r"^\d+[º°ª]?,$")
+_TEM_CONTEUDO = re.compile(r"\w")
+
+
+def _eh_abreviacao(texto, inicio, ponto, proximo):
+    """Se a palavra que termina em ``texto[ponto]`` (um ponto) é abreviação ou inicial.
+
+    ``proximo`` é o primeiro caractere depois do ponto (vazio no fim do texto).
+    """
+    # Volta só até o espaço anterior: cada palavra é examinada uma vez
+    espaco = max(texto.rfind(" ", inicio, ponto), inicio - 1)
+    trecho = texto[espaco + 1:ponto].split()
+    palavra = trecho[-1].lstrip("(\"'“«[") if trecho else ""
+    if len(palavra) != 1:
+        return palavra.lower() in ABREVIACOES or bool(_INICIAIS.match(palavra))
+    if not palavra.isalpha():
+        return False
+    # "n. 8.112", "p. 12", "v. 2"
+    if proximo.isdigit() and palavra.lower() in ABREVIACOES:
+        return True
+    anterior = _palavra_anterior(texto, inicio, espaco, trecho)
+    # Alínea depois de artigo ou inciso numerado: "art. 5º, c."
+    if _ITEM_NUMERADO.match(anterior):
+        return True
+    # Inicial de nome: maiúscula depois do começo da sentença, de outra palavra com
+    # maiúscula ou de outra inicial ("Segundo J. Silva", "Maria J. Souza", "J. R. Silva").
+    # Depois de minúscula é uma letra comum ("inciso V.", "vitamina C.") e termina a sentença
+    return palavra.isupper() and palavra.isascii() and (not anterior or anterior[0].isupper())
+
+
+def _palavra_anterior(texto, inicio, espaco, trecho):
+    """Palavra antes da examinada por ``_eh_abreviacao`` (vazia no começo da sentença)."""
+    if len(trecho) > 1:
+        return trecho[-2].lstrip("(\"'“«[")
+    if espaco < inicio:
+        return ""
+    anteriores = texto[max(texto.rfind(" ", inicio, espaco), inicio - 1) + 1:espaco].split()
+    return anteriores[-1].lstrip("(\"'“«[") if anteriores else ""
+
+
+def dividir_sentencas(texto):
+    """Lista das sentenças de ``texto``, sem espaços nas pontas e sem trechos vazios."""
+    sentencas = []
+    inicio = 0
+    for fim in _FIM_SENTENCA.finditer(texto):
+        proximo = _PROXIMO_CARACTERE.match(texto, fim.end())
+        proximo = proximo.group(1) if proximo else ""
+        if proximo.islower():
+            continue
+        if (fim.group().startswith(".") and not fim.group().startswith("..")
+                and _eh_abreviacao(texto, inicio, fim.start(), proximo)):
+            continue
+        sentencas.append(texto[inicio:fim.end()])
+        inicio = fim.end()
+    sentencas.append(texto[inicio:])
+    return [s.strip() for s in sentencas if _TEM_CONTEUDO.search(s)]
+
+
+def _quebrar(sentenca, limite):
+    """Divide uma sentença maior que ``limite`` em pedaços de até ``limite`` caracteres."""
+    pedacos = []
+    inicio = 0
+    while len(sentenca) - inicio > limite:
+        fim = inicio + limite
+        # Prefere uma pausa natural na segunda metade do trecho; senão, o último espaço
+        corte = max(sentenca.rfind(", ", inicio + limite // 2, fim), sentenca.rfind("; ", inicio + limite // 2, fim),
+                    sentenca.rfind(": ", inicio + limite // 2, fim))
+        if corte != -1:
+            corte += 1
+        else:
+            corte = sentenca.rfind(" ", inicio, fim + 1)
+            if corte <= inicio:
+                corte = fim
+        pedacos.append(sentenca[inicio:corte].strip())
+        inicio = corte
+    pedacos.append(sentenca[inicio:].strip())
+    return [pedaco for pedaco in pedacos if pedaco]
+
+
+def empacotar(sentencas, limite):
+    """Agrupa sentenças consecutivas em partes de no máximo ``limite`` caracteres."""
+    partes = []
+    atual = []
+    tamanho = 0
+    for sentenca in sentencas:
+        for pedaco in _quebrar(sentenca, limite):
+            acrescimo = len(pedaco) + (1 if atual else 0)
+            if atual and tamanho + acrescimo > limite:
+                partes.append(" ".join(atual))
+                atual = []
+                acrescimo = len(pedaco)
+                tamanho = 0
+            atual.append(pedaco)
+            tamanho += acrescimo
+    if atual:
+        partes.append(" ".join(atual))
+    return partes
+
+
+def dividir_texto(texto, limite):
+    """Divide ``texto`` em partes de até ``limite`` caracteres, terminando em fim de sentença sempre que possível."""
+    return empacotar(dividir_sentencas(texto), limite)
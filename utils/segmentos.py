@@ -0,0 +1,143 @@
+"""Codificação de cada slide como um segmento de imagem estática usando o ffmpeg.
+
+Em vez de desenhar o mesmo quadro 24 vezes por segundo em Python (moviepy), cada
+slide vira um pequeno MP4 gerado diretamente pelo ffmpeg com ajustes para conteúdo
+estático. Os segmentos são depois unidos com o demuxer ``concat`` sem recodificação
+e recebem a trilha de áudio montada por ``utils.trilha_audio``.
+"""
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import imageio_ffmpeg
+
+from utils import metricas
+
+FPS = 24
+
+
+def caminho_ffmpeg():
+    """Retorna o executável do ffmpeg distribuído com o imageio-ffmpeg."""
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def executar_ffmpeg(argumentos, ao_progredir=None):
+    """Executa o ffmpeg e levanta RuntimeError com o final do log em caso de falha.
+
+    Com ``ao_progredir``, o ffmpeg informa o andamento por ``-progress`` e a função é
+    chamada com os segundos de mídia já escritos na saída.
+    """
+    comando = [caminho_ffmpeg(), "-hide_banner", "-loglevel", "error", "-y"]
+    if ao_progredir:
+        comando += ["-progress", "pipe:1", "-nostats"]
+    comando += argumentos
+
+    processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if ao_progredir:
+        for linha in processo.stdout:
+            chave, _, valor = linha.decode("ascii", errors="replace").strip().partition("=")
+            if chave == "out_time_us" and valor.isdigit():
+                ao_progredir(int(valor) / 1_000_000)
+    _, stderr = processo.communicate()
+    if processo.returncode != 0:
+        erro = stderr.decode("utf-8", errors="replace")[-2000:]
+        raise RuntimeError(f"ffmpeg falhou ({processo.returncode}): {erro}")
+
+
+def quadros_segmento(duracao, fps=FPS):
+    """Quadros do segmento de um slide com ``duracao`` segundos."""
+    return max(1, round(duracao * fps))
+
+
+def renderizar_segmento(slide_path, destino, tamanho, duracao, transition_duration=0.1, fps=FPS):
+    """Gera o MP4 (só vídeo) de um slide, equivalente a ``create_fade_transition(create_slide(...))``.
+
+    A imagem é centralizada sobre fundo preto no ``tamanho`` final, com fade de/para
+    preto de ``transition_duration`` segundos. O áudio da aula inteira é adicionado
+    uma única vez em ``concatenar_segmentos``.
+    """
+    largura, altura = tamanho
+    quadros = quadros_segmento(duracao, fps)
+    fim = quadros / fps
+    executar_ffmpeg([
+        # A imagem entra a 1 quadro/s, sem limite, e o filtro fps repete o quadro já
+        # convertido: decodificar e converter o PNG 24 vezes por segundo custava mais que
+        # codificar. A saída é cortada no número exato de quadros (``-frames:v``): cortar
+        # a entrada por tempo perdia até um segundo no fim de cada segmento.
+        "-loop", "1", "-framerate", "1", "-i", slide_path,
+        "-vf",
+        f"pad={largura}:{altura}:(ow-iw)/2:(oh-ih)/2:black,format=yuv420p,fps={fps},"
+        f"fade=t=in:st=0:d={transition_duration},"
+        f"fade=t=out:st={max(fim - transition_duration, 0):.6f}:d={transition_duration}",
+        "-frames:v", str(quadros),
+        "-r", str(fps),
+        # Ajustes para imagem parada: quadros quase idênticos viram P-skip baratos.
+        # Uma thread por segmento mantém a saída idêntica com ou sem paralelismo.
+        "-c:v", "libx264", "-preset", "ultrafast", "-tune", "stillimage",
+        "-g", str(fps * 10), "-pix_fmt", "yuv420p", "-threads", "1",
+        "-an", destino,
+    ])
+    return destino
+
+
+def _renderizar_cronometrado(tarefa):
+    """``(caminho, segundos)``: a duração é medida no processo que codificou o segmento."""
+    inicio = time.perf_counter()
+    destino = renderizar_segmento(**tarefa)
+    return destino, time.perf_counter() - inicio
+
+
+def renderizar_segmentos(tarefas, workers=1, ao_concluir=None):
+    """Renderiza vários segmentos, opcionalmente em paralelo, e devolve os caminhos na ordem dos slides.
+
+    ``tarefas`` é uma lista de dicionários com os argumentos de ``renderizar_segmento``.
+    ``ao_concluir(indice, caminho, concluidos)`` é chamado a cada segmento finalizado.
+    """
+    resultados = [None] * len(tarefas)
+    if workers <= 1:
+        for indice, tarefa in enumerate(tarefas):
+            resultados[indice], segundos = _renderizar_cronometrado(tarefa)
+            metricas.observar("ffmpeg_segmento_segundos", segundos)
+            if ao_concluir:
+                ao_concluir(indice, resultados[indice], indice + 1)
+        return resultados
+
+    # "spawn": a fila de renderização chama daqui de dentro do servidor do Streamlit, cheio de
+    # threads; um fork copiaria travas que estivessem seguras naquele instante
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        futuros = {executor.submit(_renderizar_cronometrado, tarefa): indice for indice, tarefa in enumerate(tarefas)}
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            indice = futuros[futuro]
+            resultados[indice], segundos = futuro.result()
+            metricas.observar("ffmpeg_segmento_segundos", segundos)
+            if ao_concluir:
+                ao_concluir(indice, resultados[indice], concluidos)
+    return resultados
+
+
+def concatenar_segmentos(segmentos, output_path, trilha_path=None, ao_progredir=None):
+    """Une os segmentos na ordem recebida sem recodificar (demuxer concat do ffmpeg).
+
+    Se ``trilha_path`` for informado, a trilha de áudio da aula é codificada em AAC e
+    multiplexada na mesma passada. ``ao_progredir(segundos)`` acompanha a gravação.
+    """
+    lista_path = f"{output_path}.lista.txt"
+    with open(lista_path, "w", encoding="utf-8") as lista:
+        for segmento in segmentos:
+            caminho = os.path.abspath(segmento).replace("'", r"'\''")
+            lista.write(f"file '{caminho}'\n")
+    try:
+        argumentos = ["-f", "concat", "-safe", "0", "-i", lista_path]
+        if trilha_path:
+            argumentos += [
+                "-i", trilha_path, "-map", "0:v", "-map", "1:a",
+                "-c:a", "aac", "-b:a", "128k", "-shortest",
+            ]
+        with metricas.medir("ffmpeg_concatenacao"):
+            executar_ffmpeg(argumentos + ["-c:v", "copy", "-movflags", "+faststart", output_path], ao_progredir)
+    finally:
+        os.remove(lista_path)
+    return output_path
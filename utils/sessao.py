@@ -0,0 +1,20 @@
+"""Identificação da sessão do usuário nas páginas do Streamlit."""
+import re
+import uuid
+
+import streamlit as st
+
+
+def id_sessao():
+    """Identificador do espaço de trabalho da sessão.
+
+    Fica na URL (``?sessao=...``): recarregar a página ou abrir outra página do
+    aplicativo mantém o mesmo espaço, e cada aba nova do navegador recebe o seu.
+    """
+    if "sessao" not in st.session_state:
+        sessao = st.experimental_get_query_params().get("sessao", [""])[0]
+        if not re.fullmatch(r"[0-9a-f]{32}", sessao):
+            sessao = uuid.uuid4().hex
+        st.session_state["sessao"] = sessao
+    st.experimental_set_query_params(sessao=st.session_state["sessao"])
+    return st.session_state["sessao"]
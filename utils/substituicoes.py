@@ -0,0 +1,193 @@
+"""Substituições de pronúncia aplicadas ao texto antes da narração.
+
+As regras ficam em ``substituicoes.json`` (na raiz do projeto), compartilhado pelas
+abas de teoria e de questões. O texto é percorrido uma vez, da esquerda para a direita:
+
+- cada trecho é trocado no máximo uma vez (o texto já substituído não é reprocessado
+  por regras seguintes);
+- no ponto em que alguma regra casa vale a mais longa, qualquer que seja o tipo dela
+  ("Obs.:" ganha de "obs." em "Obs.: ver");
+- se duas regras casam o mesmo trecho (mesmo texto, uma diferenciando maiúsculas e a
+  outra não), vale a que diferencia; regras repetidas valem a última do arquivo;
+- por padrão uma regra só vale para a palavra inteira ("CF" não é trocado dentro de
+  "CFO"); ``ignorar_maiusculas`` aceita "Art." e "ART." na regra "art.".
+
+Com poucas regras (o caso do arquivo padrão) cada uma é procurada com ``str.find``,
+o que é mais rápido que uma expressão regular; acima de ``LIMITE_BUSCA_DIRETA`` as
+regras são compiladas numa única expressão regular (árvore de prefixos), cujo custo
+não cresce com o número de regras. Os dois caminhos dão o mesmo resultado.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "substituicoes.json")
+# Até este número de regras a busca direta (uma ``str.find`` por regra) é mais rápida
+LIMITE_BUSCA_DIRETA = 64
+
+
+def _palavra(caractere):
+    """Se o caractere casa com ``\\w`` (letra, número ou sublinhado)."""
+    return caractere.isalnum() or caractere == "_"
+
+
+def _minuscula(caractere):
+    minuscula = caractere.lower()
+    return minuscula if len(minuscula) == 1 else caractere
+
+
+class _No:
+    """Nó da árvore de prefixos; os filhos são indexados pelo caractere em minúscula."""
+
+    def __init__(self):
+        self.filhos = {}
+        self.caracteres = set()  # caracteres aceitos na aresta que chega a este nó
+        self.regras = []  # regras que terminam neste nó
+        self.exige_inicio = True  # todas as regras abaixo exigem fronteira no início
+
+
+class Substituidor:
+    def __init__(self, regras, limite_busca_direta=LIMITE_BUSCA_DIRETA):
+        """``regras`` é uma lista de dicionários com ``de``, ``para`` e, opcionalmente,
+        ``palavra_inteira`` (padrão True) e ``ignorar_maiusculas`` (padrão False)."""
+        unicas = {}
+        for regra in regras:
+            if regra["de"]:
+                ignorar = regra.get("ignorar_maiusculas", False)
+                chave = (regra["de"].lower() if ignorar else regra["de"], ignorar)
+                unicas.pop(chave, None)
+                unicas[chave] = regra
+        # (de, para, fronteira no início, fronteira no fim, ignorar maiúsculas), na ordem de
+        # preferência: mais longas primeiro e, no empate, a que diferencia maiúsculas
+        self._regras = []
+        for regra in sorted(unicas.values(), key=lambda regra: (-len(regra["de"]), regra.get("ignorar_maiusculas", False))):
+            de = regra["de"]
+            inteira = regra.get("palavra_inteira", True)
+            # A fronteira só faz sentido no lado em que a regra começa/termina com letra ou número
+            self._regras.append((de, regra["para"], inteira and _palavra(de[0]), inteira and _palavra(de[-1]),
+                                 regra.get("ignorar_maiusculas", False)))
+        self._busca_direta = len(self._regras) <= limite_busca_direta
+        # Para a busca direta: (texto procurado, para, início, fim, ignorar, prioridade),
+        # com o texto em minúsculas nas regras que ignoram maiúsculas
+        buscas = [(de.lower() if ignorar else de, para, inicio, fim, ignorar, prioridade)
+                  for prioridade, (de, para, inicio, fim, ignorar) in enumerate(self._regras)]
+        self._diferenciando = [busca for busca in buscas if not busca[4]]
+        self._ignorando = [busca for busca in buscas if busca[4]]
+        self._trocas = [None]  # grupo de captura -> texto novo
+        self.padrao = self._compilar() if self._regras else None
+
+    def _compilar(self):
+        # Uma única árvore para todas as regras. Os ramos de um nó não se sobrepõem (cada um
+        # aceita uma letra, nas duas caixas se alguma regra daquele ramo ignora maiúsculas) e
+        # as regras que terminam no nó vêm depois deles: a primeira alternativa que casa é a
+        # regra mais longa. Cada regra termina num grupo vazio que indica o texto novo.
+        raiz = _No()
+        for regra in sorted(self._regras, key=lambda regra: regra[4]):
+            de, _, inicio, _, ignorar = regra
+            no = raiz
+            for caractere in de:
+                no = no.filhos.setdefault(_minuscula(caractere), _No())
+                no.caracteres.add(caractere)
+                if ignorar:
+                    no.caracteres |= {variante for variante in (caractere.lower(), caractere.upper()) if len(variante) == 1}
+                no.exige_inicio = no.exige_inicio and inicio
+            no.regras.append(regra)
+
+        alternativas = []
+        for filho in (raiz.filhos[chave] for chave in sorted(raiz.filhos)):
+            # A fronteira do início, quando vale para todo o ramo, é verificada logo depois do
+            # primeiro caractere: a maioria das posições candidatas é descartada ali
+            fronteira = r"(?<!\w.)" if filho.exige_inicio else ""
+            # Um ramo para cada caixa do primeiro caractere: o ``re`` descarta pelo primeiro
+            # caractere literal as alternativas que não podem começar na posição
+            for inicial in sorted(filho.caracteres):
+                alternativas.append(re.escape(inicial) + fronteira + self._padrao_no(filho, not fronteira, len(filho.caracteres) == 1))
+        return re.compile("|".join(alternativas))
+
+    @staticmethod
+    def _aresta(no):
+        caracteres = sorted(no.caracteres)
+        if len(caracteres) == 1:
+            return re.escape(caracteres[0])
+        return "[" + "".join(re.escape(caractere) for caractere in caracteres) + "]"
+
+    def _padrao_no(self, no, verificar_inicio, exato):
+        alternativas = [self._aresta(filho) + self._padrao_no(filho, verificar_inicio, exato and len(filho.caracteres) == 1)
+                        for filho in (no.filhos[chave] for chave in sorted(no.filhos))]
+        for de, para, inicio, fim, ignorar in no.regras:
+            condicoes = ""
+            if not ignorar and not exato:
+                # O caminho aceitou as duas caixas por causa de outra regra: confere a grafia
+                condicoes += f"(?<={re.escape(de)})"
+            if inicio and verificar_inicio:
+                condicoes += rf"(?<!\w[\s\S]{{{len(de)}}})"
+            if fim:
+                condicoes += r"(?!\w)"
+            alternativas.append(condicoes + "()")
+            self._trocas.append(para)
+        if len(alternativas) == 1:
+            return alternativas[0]
+        return "(?:" + "|".join(alternativas) + ")"
+
+    def _trocar(self, encontrado):
+        return self._trocas[encontrado.lastindex]
+
+    def _aplicar_direto(self, texto):
+        presentes = [regra for regra in self._diferenciando if regra[0] in texto]
+        minusculo = texto
+        if self._ignorando:
+            minusculo = texto.lower()
+            if len(minusculo) != len(texto):
+                # Algum caractere muda de tamanho em minúscula: as posições não batem
+                return self.padrao.sub(self._trocar, texto)
+            presentes += [regra for regra in self._ignorando if regra[0] in minusculo]
+        if not presentes:
+            return texto
+        ocorrencias = []
+        for busca, para, inicio, fim, ignorar, prioridade in presentes:
+            alvo = minusculo if ignorar else texto
+            tamanho = len(busca)
+            posicao = alvo.find(busca)
+            while posicao >= 0:
+                final = posicao + tamanho
+                if not (inicio and posicao and _palavra(texto[posicao - 1])) and not (fim and final < len(texto) and _palavra(texto[final])):
+                    ocorrencias.append((posicao, -tamanho, prioridade, final, para))
+                posicao = alvo.find(busca, posicao + 1)
+        # Da esquerda para a direita; na mesma posição, a regra preferida; trechos sobrepostos
+        # a uma troca já feita são descartados, como na expressão regular
+        ocorrencias.sort()
+        partes = []
+        atual = 0
+        for posicao, _, _, final, para in ocorrencias:
+            if posicao >= atual:
+                partes.append(texto[atual:posicao])
+                partes.append(para)
+                atual = final
+        if not partes:
+            return texto
+        partes.append(texto[atual:])
+        return "".join(partes)
+
+    def aplicar(self, texto):
+        if self.padrao is None or not texto:
+            return texto
+        if self._busca_direta:
+            return self._aplicar_direto(texto)
+        return self.padrao.sub(self._trocar, texto)
+
+
+def carregar_regras(caminho=ARQUIVO_PADRAO):
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    return dados["regras"] if isinstance(dados, dict) else dados
+
+
+@lru_cache(maxsize=8)
+def _substituidor(caminho, versao):
+    return Substituidor(carregar_regras(caminho))
+
+
+def carregar_substituidor(caminho=ARQUIVO_PADRAO):
+    """Substituidor compilado do arquivo de regras; recompila só quando o arquivo muda."""
+    return _substituidor(caminho, os.stat(caminho).st_mtime_ns)
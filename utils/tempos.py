@@ -0,0 +1,31 @@
+"""Medição do tempo de parede de cada etapa da geração de um vídeo."""
+import json
+import time
+from contextlib import contextmanager
+
+
+class Cronometro:
+    def __init__(self, etapas=None):
+        self.etapas = dict(etapas or {})
+
+    @contextmanager
+    def etapa(self, nome):
+        """Soma ao total da etapa ``nome`` o tempo gasto dentro do bloco."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def total(self):
+        return sum(self.etapas.values())
+
+    def relatorio(self, **extras):
+        return {"etapas": {nome: round(segundos, 3) for nome, segundos in self.etapas.items()},
+                "total": round(self.total(), 3), **extras}
+
+    def salvar(self, caminho, **extras):
+        """Grava o relatório em JSON (ex.: ao lado do MP4 gerado)."""
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.relatorio(**extras), arquivo, ensure_ascii=False, indent=2)
+        return caminho
@@ -0,0 +1,104 @@
+"""Montagem da trilha de áudio completa da aula com NumPy.
+
+Cada MP3 de narração é decodificado uma única vez pelo ffmpeg para um array,
+recebe fade in/out vetorizado e é gravado em sequência num único WAV (PCM 16 bits),
+junto com o silêncio de cada slide. O resultado é uma trilha para a aula inteira e a
+tabela de início/fim de cada slide, que define a duração dos trechos de vídeo.
+"""
+import json
+import math
+import os
+import subprocess
+import wave
+
+import imageio_ffmpeg
+import numpy as np
+
+TAXA_AMOSTRAGEM = 44100
+CANAIS = 2
+# Quantidade de amostras de silêncio gravadas por vez (limita a memória)
+BLOCO_SILENCIO = TAXA_AMOSTRAGEM * 10
+
+
+def decodificar_audio(audio_path, taxa=TAXA_AMOSTRAGEM):
+    """Decodifica um arquivo de áudio para um array float32 (amostras, canais)."""
+    comando = [
+        imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+        "-i", audio_path, "-f", "f32le", "-acodec", "pcm_f32le",
+        "-ac", str(CANAIS), "-ar", str(taxa), "-",
+    ]
+    resultado = subprocess.run(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if resultado.returncode != 0:
+        erro = resultado.stderr.decode("utf-8", errors="replace")[-2000:]
+        raise RuntimeError(f"Erro ao decodificar {audio_path}: {erro}")
+    return np.frombuffer(resultado.stdout, dtype=np.float32).reshape(-1, CANAIS).copy()
+
+
+def aplicar_fades(amostras, fade_duration, taxa=TAXA_AMOSTRAGEM):
+    """Fade in e fade out lineares, iguais a ``audio_fadein``/``audio_fadeout`` do moviepy."""
+    n = min(int(fade_duration * taxa), len(amostras))
+    if n:
+        rampa = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)[:, None]
+        amostras[:n] *= rampa
+        amostras[len(amostras) - n:] *= rampa[::-1]
+    return amostras
+
+
+def _gravar(saida, amostras):
+    saida.writeframes((np.clip(amostras, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+
+
+def _gravar_silencio(saida, quantidade):
+    while quantidade > 0:
+        bloco = min(quantidade, BLOCO_SILENCIO)
+        saida.writeframes(bytes(bloco * CANAIS * 2))
+        quantidade -= bloco
+
+
+def gerar_trilha(slides, destino, audio_delay, extra_duration, fade_duration=0.2,
+                 additional_silent_time=1, fps=24, taxa=TAXA_AMOSTRAGEM, ao_concluir_slide=None):
+    """Grava a trilha da aula em ``destino`` (WAV) e devolve a tabela de tempos dos slides.
+
+    ``slides`` é uma lista de ``(numero_do_slide, [caminhos dos áudios])``. Cada slide
+    dura a soma das narrações + ``audio_delay`` + ``extra_duration`` +
+    ``additional_silent_time``, arredondada para um número inteiro de quadros, e a
+    narração começa após ``extra_duration + audio_delay`` (mesma regra de ``create_slide``).
+    A tabela também é gravada em JSON ao lado da trilha. ``ao_concluir_slide(numero, fim)``
+    é chamado depois de cada slide gravado.
+    """
+    tabela = []
+    quadros_acumulados = 0
+    amostras_gravadas = 0
+    with wave.open(destino, "wb") as saida:
+        saida.setnchannels(CANAIS)
+        saida.setsampwidth(2)
+        saida.setframerate(taxa)
+
+        for numero, audio_paths in slides:
+            inicio = quadros_acumulados / fps
+            atraso = int(round((extra_duration + audio_delay) * taxa))
+            _gravar_silencio(saida, atraso)
+            amostras_gravadas += atraso
+
+            duracao_narracao = 0.0
+            for audio_path in audio_paths:
+                amostras = aplicar_fades(decodificar_audio(audio_path, taxa), fade_duration, taxa)
+                _gravar(saida, amostras)
+                amostras_gravadas += len(amostras)
+                duracao_narracao += len(amostras) / taxa
+                del amostras
+
+            duracao = duracao_narracao + audio_delay + extra_duration + additional_silent_time
+            quadros_acumulados += math.ceil(duracao * fps - 1e-6)
+            fim = quadros_acumulados / fps
+            # Completa com silêncio até o fim do slide, sem acumular erro de arredondamento
+            _gravar_silencio(saida, int(round(fim * taxa)) - amostras_gravadas)
+            amostras_gravadas = int(round(fim * taxa))
+
+            tabela.append({"slide": numero, "inicio": inicio, "fim": fim, "duracao": fim - inicio})
+            if ao_concluir_slide:
+                ao_concluir_slide(numero, fim)
+
+    with open(f"{os.path.splitext(destino)[0]}.json", "w", encoding="utf-8") as arquivo:
+        json.dump(tabela, arquivo, indent=2)
+    return tabela
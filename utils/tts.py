@@ -0,0 +1,311 @@
+"""Geração concorrente das narrações com limite de requisições.
+
+O motor envia várias partes ao mesmo tempo para o serviço de voz, respeitando um
+limitador do tipo *token bucket*, e grava cada MP3 de forma atômica com o nome
+``{slide}.{parte}_narracao_slide.mp3``. O serviço de voz é plugável: qualquer objeto
+com os métodos ``gerar(texto) -> bytes`` e ``assinatura() -> dict`` (o que identifica a
+voz no cache) serve, o que permite testar e medir o motor com o ``TTSFalso`` (latência
+simulada e respostas 429) em vez da API da ElevenLabs.
+
+Falhas passageiras (429, erros de rede, 5xx) são reenviadas com espera exponencial e
+*jitter*; com um ``ManifestoNarracao``, cada parte concluída é registrada assim que
+gravada, e uma execução interrompida continua exatamente de onde parou.
+"""
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils import metricas
+from utils.manifesto_narracao import CONCLUIDA, ERRO
+
+MODELO_PADRAO = "eleven_multilingual_v2"
+CONFIG_VOZ_PADRAO = dict(stability=1.0, similarity_boost=0.70, style=0.0, use_speaker_boost=True)
+# Status devolvidos pela ElevenLabs quando há requisições demais ao mesmo tempo (HTTP 429)
+STATUS_LIMITE = ("too_many_concurrent_requests", "system_busy", "429")
+STATUS_TRANSITORIOS = ("500", "502", "503", "504")
+NOME_PARTE = re.compile(r"^(\d+)\.(\d+)_narracao_slide\.mp3$")
+
+
+class ErroLimiteTaxa(Exception):
+    """O serviço pediu para diminuir o ritmo (HTTP 429); a parte pode ser reenviada."""
+
+
+class ErroTransitorio(Exception):
+    """Falha passageira (rede, erro 5xx do serviço); a parte pode ser reenviada."""
+
+
+class CreditosEsgotados(Exception):
+    """Os créditos da conta acabaram; continuar exige trocar a chave da API."""
+
+
+class ElevenLabsTTS:
+    def __init__(self, api_key, voice_id, model=MODELO_PADRAO, config_voz=None):
+        self.api_key = api_key
+        self.voice_id = voice_id
+        self.model = model
+        self.config_voz = dict(CONFIG_VOZ_PADRAO, **(config_voz or {}))
+
+    def assinatura(self):
+        return {"voice_id": self.voice_id, "model": self.model, "settings": self.config_voz}
+
+    def gerar(self, texto):
+        import requests
+        from elevenlabs import generate, Voice, VoiceSettings, RateLimitError, APIError
+
+        try:
+            return generate(
+                text=texto,
+                api_key=self.api_key,
+                voice=Voice(voice_id=self.voice_id, settings=VoiceSettings(**self.config_voz)),
+                model=self.model
+            )
+        except RateLimitError as e:
+            raise CreditosEsgotados(str(e)) from e
+        except APIError as e:
+            if e.status in STATUS_LIMITE:
+                raise ErroLimiteTaxa(str(e)) from e
+            if e.status in STATUS_TRANSITORIOS:
+                raise ErroTransitorio(str(e)) from e
+            raise
+        except requests.HTTPError as e:
+            # Erros 5xx que o cliente não converte em APIError (ex.: do proxy ou balanceador)
+            if e.response is not None and e.response.status_code >= 500:
+                raise ErroTransitorio(str(e)) from e
+            raise
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise ErroTransitorio(str(e)) from e
+
+
+class TTSFalso:
+    """Serviço de voz simulado para testes e benchmarks, sem acesso à rede.
+
+    Cada chamada demora ``latencia`` segundos (± ``variacao``) e, com probabilidade
+    ``taxa_429``, responde como se o limite de requisições tivesse sido atingido; com
+    probabilidade ``taxa_falha``, simula uma falha de rede.
+    """
+
+    def __init__(self, latencia=0.5, variacao=0.2, taxa_429=0.0, taxa_falha=0.0, semente=None):
+        self.latencia = latencia
+        self.variacao = variacao
+        self.taxa_429 = taxa_429
+        self.taxa_falha = taxa_falha
+        self.aleatorio = random.Random(semente)
+        self.chamadas = 0
+        self.respostas_429 = 0
+        self.falhas = 0
+        self._trava = threading.Lock()
+
+    def assinatura(self):
+        return {"voice_id": "falso", "model": "falso"}
+
+    def gerar(self, texto):
+        with self._trava:
+            self.chamadas += 1
+            espera = max(0.0, self.latencia + self.aleatorio.uniform(-self.variacao, self.variacao))
+            sorteio = self.aleatorio.random()
+            limite = sorteio < self.taxa_429
+            falha = not limite and sorteio < self.taxa_429 + self.taxa_falha
+            self.respostas_429 += limite
+            self.falhas += falha
+        time.sleep(espera)
+        if limite:
+            raise ErroLimiteTaxa("429 simulado")
+        if falha:
+            raise ErroTransitorio("falha de rede simulada")
+        return f"MP3 falso: {texto}".encode("utf-8")
+
+
+class LimitadorTaxa:
+    """Token bucket: no máximo ``taxa`` requisições por segundo, com rajadas de ``capacidade``."""
+
+    def __init__(self, taxa, capacidade=None):
+        self.taxa = taxa
+        self.capacidade = capacidade or max(1.0, taxa)
+        self.fichas = self.capacidade
+        self.atualizado = time.monotonic()
+        self.pausado_ate = 0.0
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        """Bloqueia até haver uma ficha disponível e a consome."""
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado) * self.taxa)
+                self.atualizado = agora
+                if agora >= self.pausado_ate and self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                espera = max(self.pausado_ate - agora, (1 - self.fichas) / self.taxa)
+            time.sleep(espera)
+
+    def pausar(self, segundos):
+        """Suspende todas as requisições por ``segundos`` (após uma resposta 429)."""
+        with self._trava:
+            self.pausado_ate = max(self.pausado_ate, time.monotonic() + segundos)
+            self.fichas = 0
+
+
+def gravar_atomico(caminho, dados):
+    """Grava num arquivo temporário e renomeia: um MP3 incompleto nunca fica com o nome final."""
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
+
+
+def nome_arquivo_parte(slide, parte):
+    return f"{slide}.{parte}_narracao_slide.mp3"
+
+
+def partes_narracao(documento, audio_dir):
+    """Partes de ``ler_documento`` numeradas por slide, cada uma com o MP3 de destino."""
+    return [
+        {"slide": slide["slide"], "parte": numero, "texto": texto,
+         "arquivo": os.path.join(audio_dir, nome_arquivo_parte(slide["slide"], numero))}
+        for slide in documento["slides"]
+        for numero, texto in enumerate(slide["partes"], start=1)
+    ]
+
+
+def ler_nome_parte(nome):
+    """Inverso de ``nome_arquivo_parte``: ``(slide, parte)`` ou None se o nome não segue o padrão."""
+    encontrado = NOME_PARTE.match(nome)
+    return (int(encontrado.group(1)), int(encontrado.group(2))) if encontrado else None
+
+
+def espera_backoff(tentativa, base=1.0, maximo=60.0, aleatorio=random):
+    """Espera exponencial com *jitter*: metade fixa e metade sorteada, até ``maximo``."""
+    espera = min(maximo, base * 2 ** tentativa)
+    return espera / 2 + aleatorio.uniform(0, espera / 2)
+
+
+def gerar_audio(backend, limitador, texto, tentativas=6, parar=None):
+    """Sintetiza um texto, reenviando após 429 e falhas passageiras.
+
+    Um 429 também pausa o ``limitador``, para que as outras threads diminuam o ritmo.
+    ``parar`` (``threading.Event``) interrompe a espera entre as tentativas.
+    """
+    servico = type(backend).__name__
+    for tentativa in range(tentativas + 1):
+        if limitador:
+            with metricas.medir("tts_espera_limitador"):
+                limitador.aguardar()
+        try:
+            with metricas.medir("tts_requisicao", servico=servico):
+                return backend.gerar(texto)
+        except (ErroLimiteTaxa, ErroTransitorio) as e:
+            metricas.contar("tts_reenvios_total", servico=servico,
+                            motivo="limite_taxa" if isinstance(e, ErroLimiteTaxa) else "transitorio")
+            if tentativa == tentativas:
+                raise
+            espera = espera_backoff(tentativa)
+            if limitador and isinstance(e, ErroLimiteTaxa):
+                limitador.pausar(espera)
+            if parar is None:
+                time.sleep(espera)
+            elif parar.wait(espera):
+                raise
+
+
+def gerar_partes(partes, backend, paralelismo=4, limitador=None, ao_concluir=None, cache=None,
+                 manifesto=None, ao_falhar=None):
+    """Gera as partes com até ``paralelismo`` requisições simultâneas.
+
+    ``partes`` é uma lista de dicionários com ``slide``, ``parte``, ``texto`` e
+    ``arquivo``. ``ao_concluir(parte)`` é chamado na thread que chamou esta função,
+    na ordem em que as partes terminam (seguro para atualizar o Streamlit); a parte
+    recebe ``cache=True`` quando o áudio veio do ``cache`` (``CacheTTS``).
+
+    Com cache, textos já narrados com a mesma voz não geram requisições e textos
+    repetidos dentro do lote são sintetizados uma única vez.
+
+    Uma parte que continua falhando depois das tentativas é marcada com erro no
+    ``manifesto`` e passada a ``ao_falhar(parte, erro)``, sem interromper as outras.
+    ``CreditosEsgotados`` e interrupções (ex.: o botão de parar do Streamlit) encerram a
+    execução; as requisições em andamento terminam e são registradas antes disso.
+    """
+    concluidas = []
+    parar = threading.Event()
+
+    def concluir(parte):
+        concluidas.append(parte)
+        metricas.contar("tts_partes_total", origem="cache" if parte.get("cache") else "servico")
+        if ao_concluir:
+            ao_concluir(parte)
+
+    def gravar(chave, grupo, audio):
+        # Executado na thread de trabalho: o áudio pago nunca se perde se a execução parar
+        resultado = []
+        for n, parte in enumerate(grupo):
+            if cache:
+                if n == 0:
+                    cache.guardar(chave, audio)
+                if not cache.materializar(chave, parte["arquivo"]):
+                    gravar_atomico(parte["arquivo"], audio)
+            else:
+                gravar_atomico(parte["arquivo"], audio)
+            if manifesto:
+                manifesto.marcar(parte, CONCLUIDA)
+            resultado.append(dict(parte, cache=n > 0))
+        return resultado
+
+    def processar(chave, grupo):
+        if parar.is_set():
+            raise InterruptedError("Execução interrompida")
+        return gravar(chave, grupo, gerar_audio(backend, limitador, grupo[0]["texto"], parar=parar))
+
+    # Agrupa as partes pelo texto a sintetizar: cada grupo vira uma única requisição
+    grupos = {}
+    for parte in partes:
+        if cache:
+            chave = cache.chave(parte["texto"], backend.assinatura())
+            if chave in grupos:
+                # Repetido no lote: não consome créditos, como um acerto do cache
+                cache.contar_acerto(parte["texto"])
+            elif cache.obter(chave, parte["texto"]):
+                if cache.materializar(chave, parte["arquivo"]):
+                    if manifesto:
+                        manifesto.marcar(parte, CONCLUIDA)
+                    concluir(dict(parte, cache=True))
+                    continue
+                # Removido do cache por outra sessão entre a consulta e a cópia: narra de novo
+                cache.desfazer_acerto(parte["texto"])
+        else:
+            chave = len(grupos)
+        grupos.setdefault(chave, []).append(parte)
+
+    with ThreadPoolExecutor(max_workers=max(1, paralelismo)) as executor:
+        futuros = {executor.submit(processar, chave, grupo): chave for chave, grupo in grupos.items()}
+        try:
+            for futuro in as_completed(futuros):
+                try:
+                    resultado = futuro.result()
+                except (CreditosEsgotados, InterruptedError):
+                    raise
+                except Exception as e:
+                    metricas.contar("tts_partes_total", len(grupos[futuros[futuro]]), origem="erro")
+                    for parte in grupos[futuros[futuro]]:
+                        if manifesto:
+                            manifesto.marcar(parte, ERRO, str(e))
+                        if ao_falhar:
+                            ao_falhar(parte, e)
+                    continue
+                for parte in resultado:
+                    concluir(parte)
+        except BaseException:
+            # Créditos esgotados ou execução interrompida: as partes que ainda não
+            # começaram são canceladas e as esperas entre tentativas, abortadas
+            parar.set()
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+        finally:
+            if cache:
+                cache.salvar_indice()
+            if manifesto:
+                manifesto.salvar()
+    return concluidas
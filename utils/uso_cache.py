@@ -0,0 +1,53 @@
+"""Trava entre processos para os caches de vídeo compartilhados em disco.
+
+Cada renderização segura a trava em modo compartilhado enquanto usa imagens e
+segmentos do cache. A remoção por limite de tamanho só acontece com a trava
+exclusiva, pedida sem esperar no fim da renderização: se outro trabalho (outra
+thread da fila ou outra aula do ``pipeline.py --aulas-paralelas``) ainda estiver
+usando o cache, a limpeza fica para a próxima renderização.
+
+Sem ``fcntl`` (Windows) vale só a proteção dentro do processo feita por
+``CacheSegmentos``.
+"""
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ARQUIVO_TRAVA = ".uso_cache.lock"
+
+
+class UsoCache:
+    def __init__(self, cache_dir):
+        self.caminho = os.path.join(cache_dir, ARQUIVO_TRAVA)
+        self._arquivo = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        # Um descritor por uso: as travas do flock valem também entre threads do mesmo processo
+        self._arquivo = open(self.caminho, "a")
+        if fcntl:
+            fcntl.flock(self._arquivo, fcntl.LOCK_SH)
+        return self
+
+    def tentar_exclusivo(self):
+        """Troca para a trava exclusiva se ninguém mais usa o cache; não espera.
+
+        A trava compartilhada é solta antes: só deve ser chamada quando os arquivos do
+        cache já não são necessários para esta renderização.
+        """
+        if not fcntl:
+            return True
+        fcntl.flock(self._arquivo, fcntl.LOCK_UN)
+        try:
+            fcntl.flock(self._arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def __exit__(self, tipo, valor, rastro):
+        self._arquivo.close()
+        self._arquivo = None
+        return False